@@ -0,0 +1,225 @@
+import os
+import sys
+import glob
+import shutil
+from dataclasses import dataclass
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.logger import logging
+from src.exception import CustomException
+from src.instrumentation import span
+
+
+EXTENSIONS = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+    "csv": ".csv",
+}
+
+
+@dataclass
+class ArtifactStoreConfig:
+    root: str = 'artifacts'
+    format: str = "parquet"
+    # zstd for Parquet; Arrow IPC files stay uncompressed so they can be memory-mapped zero-copy
+    compression: str = "zstd"
+    row_group_size: int = 100_000
+
+
+def _filter_columns(filters):
+    """:return: column names referenced by pyarrow filters, flat ([(col, op, val), ...]) or DNF ([[...], ...])"""
+    groups = filters if filters and isinstance(filters[0], list) else [filters]
+    return [name for group in groups for name, _, _ in group]
+
+
+class ArtifactStore:
+    """
+    Typed, columnar storage for the DataFrames handed between pipeline stages.
+
+    Artifacts are addressed by name (e.g. "raw_ingested") and written as Parquet
+    or Arrow IPC, so dtypes survive the round trip. Reads memory-map the file and
+    can prune columns and row groups; CSV stays available through export_csv.
+    """
+
+    def __init__(self, config: ArtifactStoreConfig = None):
+        self.config = config or ArtifactStoreConfig()
+
+    def path(self, name, fmt=None):
+        fmt = fmt or self.config.format
+        if fmt not in EXTENSIONS:
+            raise ValueError(f"Unsupported artifact format: {fmt}")
+        return os.path.join(self.config.root, f"{name}{EXTENSIONS[fmt]}")
+
+    def exists(self, name, fmt=None):
+        return os.path.exists(self.path(name, fmt))
+
+    def write(self, df: pd.DataFrame, name, columns=None, fmt=None):
+        """
+        Writes df (optionally only `columns`) as artifact `name`.
+
+        :return: path of the written file
+        """
+        fmt = fmt or self.config.format
+        path = self.path(name, fmt)
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            if columns is not None:
+                df = df[list(columns)]
+
+            with span("artifact_write", artifact=name, format=fmt, rows=len(df)) as write_span:
+                if fmt == "csv":
+                    df.to_csv(path, index=False)
+                else:
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                    if fmt == "parquet":
+                        pq.write_table(table, path, compression=self.config.compression,
+                                       row_group_size=self.config.row_group_size)
+                    else:
+                        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                            writer.write_table(table, max_chunksize=self.config.row_group_size)
+                write_span.set(bytes_written=os.path.getsize(path))
+
+            logging.info(f"Artifact '{name}' written to {path} ({len(df)} rows, {df.shape[1]} columns)")
+            return path
+
+        except Exception as e:
+            logging.error(f"Error writing artifact '{name}': {e}")
+            raise CustomException(e, sys)
+
+    def read_table(self, name, columns=None, filters=None, row_groups=None, fmt=None) -> pa.Table:
+        """
+        Memory-maps artifact `name` and returns only what was asked for.
+
+        :param columns: column subset to read
+        :param filters: pyarrow filters, e.g. [("churn", "==", 1)]; Parquet skips row groups whose statistics exclude them
+        :param row_groups: explicit row group (Parquet) / record batch (Arrow) indices to read
+        """
+        fmt = fmt or self.config.format
+        path = self.path(name, fmt)
+        # Without pushdown, rows are filtered before projecting, so filters may use unselected columns
+        read_columns = columns
+        if columns is not None and filters is not None:
+            read_columns = list(dict.fromkeys([*columns, *_filter_columns(filters)]))
+        try:
+            with span("artifact_read", artifact=name, format=fmt) as read_span:
+                if fmt == "csv":
+                    table = pa.Table.from_pandas(pd.read_csv(path, usecols=read_columns), preserve_index=False)
+                elif fmt == "parquet" and row_groups is None:
+                    table = pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+                    filters = None  # already pushed down
+                elif fmt == "parquet":
+                    table = pq.ParquetFile(path, memory_map=True).read_row_groups(row_groups, columns=read_columns)
+                else:
+                    reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+                    indices = range(reader.num_record_batches) if row_groups is None else row_groups
+                    table = pa.Table.from_batches([reader.get_batch(i) for i in indices], schema=reader.schema)
+                    if read_columns is not None:
+                        table = table.select(read_columns)  # zero-copy on the memory map
+
+                if filters is not None:
+                    table = table.filter(pq.filters_to_expression(filters))
+                if columns is not None:
+                    table = table.select(columns)
+                # Bytes materialised after column/row-group pruning, not the file size
+                read_span.set(rows=table.num_rows, bytes_read=table.nbytes)
+            return table
+
+        except Exception as e:
+            logging.error(f"Error reading artifact '{name}': {e}")
+            raise CustomException(e, sys)
+
+    def read(self, name, columns=None, filters=None, row_groups=None, fmt=None) -> pd.DataFrame:
+        return self.read_table(name, columns=columns, filters=filters, row_groups=row_groups, fmt=fmt).to_pandas()
+
+    def writer(self, name, fmt=None):
+        """:return: ArtifactWriter that builds artifact `name` from a stream of DataFrames"""
+        return ArtifactWriter(self, name, fmt)
+
+    def export_csv(self, df: pd.DataFrame, path):
+        """Writes a plain CSV copy of df for consumers that still expect one."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        df.to_csv(path, index=False)
+        logging.info(f"CSV export written to: {path}")
+        return path
+
+
+class ArtifactWriter:
+    """
+    Streams DataFrames into one artifact without holding more than a batch in memory.
+
+    Each write() lands in its own Parquet part, so a column that is all-null in early
+    batches does not fix its type; close() unifies the parts' schemas (null promotes to
+    the type seen later, int to float, ...) and rewrites them part by part into the
+    artifact file. If the stream fails or is abandoned, the previous artifact is kept.
+    """
+
+    def __init__(self, store: ArtifactStore, name, fmt=None):
+        self.store = store
+        self.name = name
+        self.fmt = fmt or store.config.format
+        self.path = store.path(name, self.fmt)
+        self.parts_dir = f"{self.path}.parts"
+        self.rows = 0
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+        os.makedirs(self.parts_dir)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            shutil.rmtree(self.parts_dir, ignore_errors=True)
+        return False
+
+    def write(self, df: pd.DataFrame):
+        part = os.path.join(self.parts_dir, f"part-{len(os.listdir(self.parts_dir)):06d}.parquet")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # An all-null column says nothing about its type (reindex fills float NaN); leave it untyped
+        for i, name in enumerate(table.column_names):
+            if len(table) and table.column(i).null_count == len(table):
+                table = table.set_column(i, pa.field(name, pa.null()), pa.nulls(len(table)))
+        pq.write_table(table, part)
+        self.rows += len(df)
+
+    def close(self):
+        """Merges the parts into the artifact file; :return: its path"""
+        try:
+            parts = sorted(glob.glob(os.path.join(self.parts_dir, "part-*.parquet")))
+            if not parts:
+                raise ValueError(f"No batches were written to artifact '{self.name}'")
+            # pandas metadata describes a single part's columns, so drop it from the merged schema
+            schema = pa.unify_schemas([pq.read_schema(part).remove_metadata() for part in parts],
+                                      promote_options="permissive")
+            tmp_path = f"{self.path}.tmp"
+            config = self.store.config
+            if self.fmt == "parquet":
+                with pq.ParquetWriter(tmp_path, schema, compression=config.compression) as out:
+                    for part in parts:
+                        out.write_table(self._read_part(part, schema), row_group_size=config.row_group_size)
+            elif self.fmt == "arrow":
+                with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, schema) as out:
+                    for part in parts:
+                        out.write_table(self._read_part(part, schema), max_chunksize=config.row_group_size)
+            else:
+                for i, part in enumerate(parts):
+                    self._read_part(part, schema).to_pandas().to_csv(
+                        tmp_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            os.replace(tmp_path, self.path)
+            shutil.rmtree(self.parts_dir, ignore_errors=True)
+            logging.info(f"Artifact '{self.name}' streamed to {self.path} ({self.rows} rows, {len(parts)} parts)")
+            return self.path
+
+        except Exception as e:
+            logging.error(f"Error finishing streamed artifact '{self.name}': {e}")
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def _read_part(part, schema):
+        table = pq.read_table(part).replace_schema_metadata(None)
+        # Parts may lack columns others have, or order them differently
+        columns = [table.column(f.name) if f.name in table.column_names else pa.nulls(len(table), f.type)
+                   for f in schema]
+        return pa.Table.from_arrays([column.cast(f.type) for f, column in zip(schema, columns)], schema=schema)
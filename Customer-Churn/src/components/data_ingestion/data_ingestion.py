@@ -4,7 +4,10 @@ import snowflake.connector
 from dataclasses import dataclass
 from src.logger import logging
 from src.exception import CustomException
+from src.artifact_store import ArtifactStore
+from src.instrumentation import span
 import sys
+from itertools import chain
 from prefect import flow
 
 
@@ -12,12 +15,38 @@ from prefect import flow
 @dataclass
 class DataIngestionConfig:
     raw_data_path: str = os.path.join('artifacts', "data.csv")
+    csv_path: str = r'D:\Ml-Projects\Customer-Churn\notebook\data\customerChurn.csv'
+    output_csv_path: str = r"D:\Ml-Projects\Customer-Churn\notebook\data\raw_ingested.csv"
+    artifact_name: str = "raw_ingested"
+    # Also write output_csv_path alongside the typed artifact
+    export_csv: bool = False
+    # Streaming mode: rows per batch and the hard ceiling on a single batch's in-memory size
+    batch_size: int = 50_000
+    max_batch_memory_mb: float = 256.0
+    # Rows read first to measure bytes per row, so no full-size batch is fetched before it is sized
+    probe_rows: int = 1_000
+    # How the pipeline ingests, every mode but "full" in bounded batches: "incremental" appends only
+    # new rows to the raw store (IncrementalIngestion) and reads its latest row per customer, "stream"
+    # re-reads both sources straight into the artifact (call_stream), "full" holds both in memory (call)
+    mode: str = "incremental"
 
 
 class DataIngestion:
     def __init__(self):
         self.ingestion_config = DataIngestionConfig()
 
+    def get_snowflake_connection(self):
+        return snowflake.connector.connect(
+            user='SHAHHUSSAIN',
+            password='Shahid22Sherin',
+            account='TIQIOCR-KY36542',
+            database='PROJECT',
+            schema='PUBLIC',
+            session_parameters={
+                'QUERY_TAG': 'EndOfMonthFinancials',
+            }
+        )
+
     def fetch_data_from_snowflake(self,query):
         """
         Connects to a Snowflake database using environment variables,
@@ -28,24 +57,15 @@ class DataIngestion:
         """
         try:
 
-            # Load Snowflake credentials from environment variables
-            conn = snowflake.connector.connect(
-                user='SHAHHUSSAIN',
-                password='Shahid22Sherin',
-                account='TIQIOCR-KY36542',
-                database='PROJECT',
-                schema='PUBLIC',
-                session_parameters={
-                    'QUERY_TAG': 'EndOfMonthFinancials',
-                }
-)
+            with span("snowflake_fetch") as fetch_span:
+                conn = self.get_snowflake_connection()
 
 
-            # Execute the query and load results into a DataFrame
-            df = pd.read_sql_query(query, conn)
+                # Execute the query and load results into a DataFrame
+                df = pd.read_sql_query(query, conn)
+                fetch_span.set(rows=len(df), bytes_read=int(df.memory_usage(deep=True).sum()))
 
-            logging.info(f"Successfully fetched {df.shape[0]} records from Snowflake.")
-            logging.info(f" {df.head(2)} ")
+            logging.info(f"Successfully fetched {df.shape[0]} records ({df.shape[1]} columns) from Snowflake.")
             
             
             # Close the connection
@@ -62,7 +82,6 @@ class DataIngestion:
             if os.path.exists(file_path):
                 df = pd.read_csv(file_path)
                 logging.info(f"CSV file loaded successfully from '{file_path}', shape: {df.shape}")
-                logging.info(f"{df.head(2)}")
                 return df
             else:
                 logging.error(f"File not found: {file_path}")
@@ -77,6 +96,148 @@ class DataIngestion:
             logging.error(f"Unexpected error while loading CSV: {e}")
             raise CustomException(e, sys)
 
+    def _max_batch_bytes(self):
+        return int(self.ingestion_config.max_batch_memory_mb * 1024 * 1024)
+
+    def _next_batch_size(self, batch, batch_size):
+        """Shrinks the next read so a batch of rows like this one stays under the memory ceiling."""
+        if len(batch) == 0:
+            return batch_size
+        bytes_per_row = batch.memory_usage(deep=True, index=False).sum() / len(batch)
+        # Leave headroom for rows with longer strings than this batch's average
+        return max(1, min(batch_size, int(0.9 * self._max_batch_bytes() // max(bytes_per_row, 1))))
+
+    def _split_to_ceiling(self, batch):
+        """Yields batch in slices that each fit under max_batch_memory_mb."""
+        batch_bytes = batch.memory_usage(deep=True, index=False).sum()
+        max_bytes = self._max_batch_bytes()
+        if batch_bytes <= max_bytes:
+            yield batch
+            return
+
+        rows_per_slice = int(len(batch) * max_bytes // batch_bytes)
+        if rows_per_slice < 1:
+            raise ValueError(
+                f"A single row exceeds the {self.ingestion_config.max_batch_memory_mb} MB batch memory ceiling")
+        for start in range(0, len(batch), rows_per_slice):
+            # Row sizes vary, so re-check each slice rather than trusting the average
+            yield from self._split_to_ceiling(batch.iloc[start:start + rows_per_slice])
+
+    def stream_data_from_snowflake(self, query, batch_size=None, conn=None, params=None):
+        """
+        Executes query and yields the result as DataFrames of at most batch_size rows,
+        fetched with cursor.fetchmany so the full result set is never held in memory.
+
+        :param query: SQL query as a string
+        :param batch_size: rows per batch, defaults to the config batch_size
+        :param conn: optional DB-API connection; a Snowflake connection is opened (and closed) when omitted
+        :param params: bound parameters for the query's placeholders (in the driver's paramstyle)
+        :return: generator of Pandas DataFrames
+        """
+        batch_size = batch_size or self.ingestion_config.batch_size
+        owns_connection = conn is None
+        try:
+            if owns_connection:
+                conn = self.get_snowflake_connection()
+            cursor = conn.cursor()
+            try:
+                if params is None:
+                    cursor.execute(query)
+                else:
+                    cursor.execute(query, params)
+                columns = [column[0] for column in cursor.description]
+                fetch_size = min(batch_size, self.ingestion_config.probe_rows)
+                total = 0
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    batch = pd.DataFrame.from_records(rows, columns=columns)
+                    fetch_size = self._next_batch_size(batch, batch_size)
+                    total += len(batch)
+                    yield from self._split_to_ceiling(batch)
+                logging.info(f"Streamed {total} records from Snowflake.")
+            finally:
+                cursor.close()
+                if owns_connection:
+                    conn.close()
+
+        except CustomException:
+            raise
+        except Exception as e:
+            logging.error(f"Error streaming data from Snowflake: {e}")
+            raise CustomException(e, sys)
+
+    def stream_csv_data(self, file_path, batch_size=None):
+        """
+        Yields the CSV at file_path as DataFrames of at most batch_size rows.
+
+        :param file_path: path to the CSV file
+        :param batch_size: rows per batch, defaults to the config batch_size
+        :return: generator of Pandas DataFrames (empty if the file does not exist)
+        """
+        batch_size = batch_size or self.ingestion_config.batch_size
+        if not os.path.exists(file_path):
+            logging.error(f"File not found: {file_path}")
+            return
+        try:
+            total = 0
+            with pd.read_csv(file_path, chunksize=batch_size) as reader:
+                read_size = min(batch_size, self.ingestion_config.probe_rows)
+                while True:
+                    try:
+                        batch = reader.get_chunk(read_size)
+                    except StopIteration:
+                        break
+                    read_size = self._next_batch_size(batch, batch_size)
+                    total += len(batch)
+                    yield from self._split_to_ceiling(batch)
+            logging.info(f"Streamed {total} records from '{file_path}'")
+        except CustomException:
+            raise
+        except pd.errors.EmptyDataError:
+            logging.error("CSV file is empty.")
+            raise CustomException("CSV file is empty.", sys)
+        except pd.errors.ParserError:
+            logging.error("Error parsing CSV file.")
+            raise CustomException("Error parsing CSV file.", sys)
+        except Exception as e:
+            logging.error(f"Unexpected error while streaming CSV: {e}")
+            raise CustomException(e, sys)
+
+    def scheduled_ingestion_stream(self, csv_path, query, conn=None, batch_size=None):
+        """
+        Streaming counterpart of scheduled_ingestion: yields CSV batches followed by
+        warehouse batches, all standardized and aligned to the union of both schemas.
+        """
+        try:
+            csv_columns = []
+            if os.path.exists(csv_path):
+                csv_columns = list(pd.read_csv(csv_path, nrows=0).columns.str.strip().str.lower())
+
+            # Peek at the first warehouse batch to learn its schema without reading the rest
+            db_batches = self.stream_data_from_snowflake(query, batch_size=batch_size, conn=conn)
+            first_db_batch = next(db_batches, None)
+            db_columns = []
+            if first_db_batch is not None:
+                db_columns = list(first_db_batch.columns.str.strip().str.lower())
+                db_batches = chain([first_db_batch], db_batches)
+
+            all_columns = list(dict.fromkeys(csv_columns + db_columns))
+            if not all_columns:
+                logging.error("No valid data found for ingestion.")
+                return
+
+            for batch in chain(self.stream_csv_data(csv_path, batch_size=batch_size), db_batches):
+                batch.columns = batch.columns.str.strip().str.lower()
+                yield batch.reindex(columns=all_columns, fill_value=None)
+
+        except CustomException:
+            raise
+        except Exception as e:
+            logging.error(f"Error during streaming ingestion: {e}")
+            raise CustomException(e, sys)
+
     def scheduled_ingestion(self, csv_path, data):
         try:
             df1 = self.ingest_csv_data(csv_path)  # Load CSV data
@@ -118,21 +279,43 @@ class DataIngestion:
             data = self.fetch_data_from_snowflake(sql_query)
 
             # File paths
-            csv_path = r'D:\Ml-Projects\Customer-Churn\notebook\data\customerChurn.csv'
+            csv_path = self.ingestion_config.csv_path
             # Load and combine data
             df = self.scheduled_ingestion(csv_path, data)
         
             if df is not None:
-                # Save DataFrame as CSV
-                output_csv_path = r"D:\Ml-Projects\Customer-Churn\notebook\data\raw_ingested.csv"
-                df.to_csv(output_csv_path, index=False)
-                logging.info(f"Final dataset saved to: {output_csv_path}")
+                # Save DataFrame as a typed columnar artifact
+                store = ArtifactStore()
+                artifact_path = store.write(df, self.ingestion_config.artifact_name)
+                if self.ingestion_config.export_csv:
+                    store.export_csv(df, self.ingestion_config.output_csv_path)
+                logging.info(f"Final dataset saved to: {artifact_path}")
                 return df  # Return the dataframe
 
         except Exception as e:
             logging.error(f"Critical error in data ingestion: {e}")
             return None
 
+    def call_stream(self, conn=None):
+        """
+        Streaming counterpart of call: yields aligned batches to the caller while
+        appending each one to the same typed artifact call() writes, so a full pass
+        never materialises the whole table. The artifact is replaced once the stream
+        has been consumed completely.
+        """
+        sql_query = "SELECT * FROM CUSTOMERCHURN;"
+        store = ArtifactStore()
+        output_csv_path = self.ingestion_config.output_csv_path
+        with store.writer(self.ingestion_config.artifact_name) as writer:
+            for batch_number, batch in enumerate(
+                    self.scheduled_ingestion_stream(self.ingestion_config.csv_path, sql_query, conn=conn)):
+                writer.write(batch)
+                if self.ingestion_config.export_csv:
+                    batch.to_csv(output_csv_path, mode='w' if batch_number == 0 else 'a',
+                                 header=batch_number == 0, index=False)
+                yield batch
+        logging.info(f"Streamed {writer.rows} rows to: {writer.path}")
+
 if __name__ == "__main__":
             obj = DataIngestion()
             obj.call()
\ No newline at end of file
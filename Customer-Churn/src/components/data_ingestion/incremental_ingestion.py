@@ -0,0 +1,312 @@
+import io
+import os
+import sys
+import json
+import shutil
+from datetime import datetime
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from src.components.data_ingestion.data_ingestion import DataIngestion
+from src.logger import logging
+from src.exception import CustomException
+
+
+@dataclass
+class IncrementalIngestionConfig:
+    store_path: str = os.path.join('artifacts', "raw_store")
+    state_path: str = os.path.join('artifacts', "ingestion_state.json")
+    table_name: str = "CUSTOMERCHURN"
+    # Monotonic column used as the warehouse high-water mark (customerid or a load timestamp)
+    watermark_column: str = "customerid"
+    # Placeholder style of the warehouse driver (DB-API paramstyle); Snowflake's connector defaults to pyformat
+    paramstyle: str = "pyformat"
+    # Identifies a customer across sources and runs; latest_view() keeps its most recent row
+    key_column: str = "customerid"
+
+
+# Stored column types, narrowest first; a column only ever moves right
+_TYPE_ORDER = ("null", "double", "string")
+_PLACEHOLDERS = {"qmark": "?", "numeric": ":1", "named": ":watermark", "format": "%s", "pyformat": "%(watermark)s"}
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of the next `length` bytes of an open file, so a reader cannot run past them."""
+
+    def __init__(self, f, length):
+        self.f = f
+        self.remaining = length
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.f.read(min(len(buffer), self.remaining))
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+def _complete_lines_end(f, start, end, block_size=1 << 16):
+    """:return: offset just past the last newline in [start, end), or start if there is none"""
+    position = end
+    while position > start:
+        block_start = max(start, position - block_size)
+        f.seek(block_start)
+        newline = f.read(position - block_start).rfind(b"\n")
+        if newline != -1:
+            return block_start + newline + 1
+        position = block_start
+    return start
+
+
+class IncrementalIngestion:
+    """
+    Ingests only what is new since the last run and appends it to a partitioned
+    Parquet store laid out as source=<name>/ingest_date=<YYYY-MM-DD>/part-*.parquet.
+
+    High-water marks live in state_path: the warehouse keeps the largest
+    watermark_column value seen, the CSV keeps the byte offset already read
+    (the file is append-only; a rewrite is detected and reloads that source).
+
+    Each column's stored type is the widest seen so far: all-null batches leave it
+    untyped, numbers make it float64, and any text widens it to string. The dataset
+    schema casts parts written under a narrower type when the store is scanned.
+    """
+
+    # Order in which run() appends sources, so later sources' rows are the more recent
+    SOURCES = ("csv", "snowflake")
+
+    def __init__(self, config: IncrementalIngestionConfig = None, ingestion: DataIngestion = None):
+        self.config = config or IncrementalIngestionConfig()
+        self.ingestion = ingestion or DataIngestion()
+
+    def load_state(self):
+        if os.path.exists(self.config.state_path):
+            with open(self.config.state_path) as f:
+                return json.load(f)
+        return {"sources": {}, "columns": []}
+
+    def save_state(self, state):
+        os.makedirs(os.path.dirname(self.config.state_path) or ".", exist_ok=True)
+        tmp_path = f"{self.config.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2, default=str)
+        os.replace(tmp_path, self.config.state_path)
+
+    @staticmethod
+    def _batch_type(column):
+        """:return: the narrowest stored type holding column's values"""
+        if column.isna().all():
+            return "null"
+        return "double" if pd.api.types.is_numeric_dtype(column) else "string"
+
+    def _register_columns(self, state, batch):
+        """Adds new columns to the store schema and widens known ones this batch does not fit."""
+        batch.columns = batch.columns.str.strip().str.lower()
+        known = {field["name"]: field for field in state["columns"]}
+        for col in batch.columns:
+            batch_type = self._batch_type(batch[col])
+            if col not in known:
+                state["columns"].append({"name": col, "type": batch_type})
+            elif _TYPE_ORDER.index(batch_type) > _TYPE_ORDER.index(known[col]["type"]):
+                logging.info(f"Widening stored column '{col}' from {known[col]['type']} to {batch_type}")
+                known[col]["type"] = batch_type
+        return batch
+
+    @staticmethod
+    def _to_arrow(batch, schema):
+        arrays = []
+        for field in schema:
+            column = batch[field.name]
+            if pa.types.is_null(field.type):
+                arrays.append(pa.nulls(len(batch)))
+            elif pa.types.is_string(field.type) and not pd.api.types.is_numeric_dtype(column):
+                arrays.append(pa.array(column.astype("string"), type=pa.string()))
+            else:
+                # Numbers stored as string are formatted by Arrow, as the scan casts older float64 parts
+                arrays.append(pa.array(column, from_pandas=True).cast(field.type))
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def _store_schema(self, state):
+        return pa.schema([pa.field(f["name"], pa.type_for_alias(f["type"])) for f in state["columns"]])
+
+    def _write_batches(self, state, source, batches, run_id):
+        """Appends batches under source=<source>; removes this run's parts if anything fails midway."""
+        partition_dir = os.path.join(self.config.store_path, f"source={source}",
+                                     f"ingest_date={datetime.utcnow().strftime('%Y-%m-%d')}")
+        written = []
+        rows = 0
+        try:
+            for batch in batches:
+                batch = self._register_columns(state, batch)
+                if batch.empty:
+                    continue
+                schema = self._store_schema(state)
+                batch = batch.reindex(columns=schema.names)
+                table = self._to_arrow(batch, schema)
+
+                os.makedirs(partition_dir, exist_ok=True)
+                part_path = os.path.join(partition_dir, f"part-{run_id}-{len(written):05d}.parquet")
+                pq.write_table(table, part_path, compression="snappy")
+                written.append(part_path)
+                rows += len(batch)
+                yield batch
+        except Exception:
+            for path in written:
+                os.remove(path)
+            raise
+        logging.info(f"Appended {rows} new rows from {source} in {len(written)} parts")
+
+    def _csv_delta(self, state, csv_path):
+        """Yields only the rows appended to csv_path since the stored byte offset."""
+        source_state = state["sources"].get("csv", {})
+        if not os.path.exists(csv_path):
+            logging.error(f"File not found: {csv_path}")
+            return
+
+        with open(csv_path, "rb") as f:
+            header = f.readline()
+            size = os.path.getsize(csv_path)
+            offset = source_state.get("offset", 0)
+            if source_state.get("header") != header.decode() or offset > size or offset < len(header):
+                if offset:
+                    logging.info(f"{csv_path} was rewritten; reloading the csv source")
+                    shutil.rmtree(os.path.join(self.config.store_path, "source=csv"), ignore_errors=True)
+                offset = len(header)
+
+            # Read up to the last complete line as of now: rows appended while reading, or a
+            # line still being written, are left for the next run instead of being read twice
+            end = _complete_lines_end(f, offset, size)
+            if offset < end:
+                f.seek(offset)
+                names = pd.read_csv(csv_path, nrows=0).columns
+                delta = io.BufferedReader(_ByteRange(f, end - offset))
+                for batch in pd.read_csv(delta, header=None, names=names,
+                                         chunksize=self.ingestion.ingestion_config.batch_size):
+                    yield from self.ingestion._split_to_ceiling(batch)
+
+        state["sources"]["csv"] = {"header": header.decode(), "offset": max(offset, end),
+                                   "updated_at": datetime.utcnow().isoformat()}
+
+    def _warehouse_delta(self, state, conn=None):
+        """Yields warehouse rows whose watermark column is above the stored high-water mark."""
+        column = self.config.watermark_column
+        source_state = state["sources"].get("snowflake", {})
+        watermark = source_state.get("watermark")
+
+        query = f"SELECT * FROM {self.config.table_name}"
+        params = None
+        if watermark is not None:
+            # Bound, never spliced into the SQL: the stored value round-trips through a JSON file
+            query += f" WHERE {column} > {_PLACEHOLDERS[self.config.paramstyle]}"
+            params = {"watermark": watermark} if self.config.paramstyle in ("named", "pyformat") else (watermark,)
+        query += f" ORDER BY {column};"
+
+        for batch in self.ingestion.stream_data_from_snowflake(query, conn=conn, params=params):
+            batch_max = batch[batch.columns[batch.columns.str.strip().str.lower() == column][0]].max()
+            if pd.notna(batch_max):
+                watermark = batch_max.item() if hasattr(batch_max, "item") else batch_max
+            yield batch
+
+        state["sources"]["snowflake"] = {"watermark": watermark, "updated_at": datetime.utcnow().isoformat()}
+
+    def merged_view(self):
+        """
+        Lazy union of every ingested partition. Nothing is read until the caller
+        scans it, e.g. view.to_table(columns=[...]) or view.to_batches(). A customer
+        ingested more than once appears once per ingestion; latest_view() dedupes.
+
+        :return: pyarrow.dataset.Dataset, or None if nothing has been ingested yet
+        """
+        state = self.load_state()
+        if not state["columns"] or not os.path.exists(self.config.store_path):
+            return None
+        return ds.dataset(self.config.store_path, format="parquet", partitioning="hive",
+                          schema=self._dataset_schema(state))
+
+    def fingerprint(self):
+        """:return: the stored high-water marks; they change exactly when a run appends rows"""
+        sources = self.load_state()["sources"]
+        marks = {source: {key: value for key, value in entry.items() if key != "updated_at"}
+                 for source, entry in sources.items()}
+        return json.dumps(marks, sort_keys=True, default=str)
+
+    def _dataset_schema(self, state):
+        return (self._store_schema(state).append(pa.field("source", pa.string()))
+                .append(pa.field("ingest_date", pa.string())))
+
+    def _ingestion_order(self, path):
+        """Sort key of a part: its run, then the order run() appends sources, then its part number."""
+        source = os.path.basename(os.path.dirname(os.path.dirname(path))).split("=", 1)[1]
+        run_id, part = os.path.splitext(os.path.basename(path))[0].split("-")[1:]
+        return run_id, self.SOURCES.index(source) if source in self.SOURCES else len(self.SOURCES), int(part)
+
+    def latest_view(self, columns=None):
+        """
+        Upserted view of the store: one row per key_column, the most recently ingested
+        (later runs win, and within a run the warehouse row wins over the CSV row).
+        Rows with no key are all kept.
+
+        :param columns: column subset to return, defaults to every ingested column
+        :return: pyarrow.Table, or None if nothing has been ingested yet
+        """
+        view = self.merged_view()
+        if view is None:
+            return None
+        if columns is None:
+            # The source/ingest_date partition fields describe the store, not the customers
+            columns = [field["name"] for field in self.load_state()["columns"]]
+        key = self.config.key_column
+        read_columns = list(dict.fromkeys([*columns, key]))
+        paths = sorted(view.files, key=self._ingestion_order)
+        ordered = ds.dataset(paths, format="parquet", schema=view.schema,
+                             partitioning=ds.partitioning(flavor="hive"),
+                             partition_base_dir=self.config.store_path)
+        table = ordered.to_table(columns=read_columns)
+
+        position = pa.array(np.arange(table.num_rows))
+        keyed = pa.table({key: table[key], "position": position}).filter(pc.is_valid(table[key]))
+        last = keyed.group_by(key).aggregate([("position", "max")])["position_max"].to_numpy()
+        unkeyed = np.flatnonzero(table[key].is_null().to_numpy(zero_copy_only=False))
+        table = table.take(np.sort(np.concatenate([last, unkeyed])))
+        return table.select(columns)
+
+    def run(self, conn=None):
+        """
+        Appends the CSV and warehouse deltas to the store and advances both high-water marks.
+
+        :param conn: optional DB-API connection standing in for Snowflake
+        :return: dict of new rows per source
+        """
+        try:
+            state = self.load_state()
+            run_id = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+            new_rows = {}
+
+            deltas = {"csv": lambda: self._csv_delta(state, self.ingestion.ingestion_config.csv_path),
+                      "snowflake": lambda: self._warehouse_delta(state, conn)}
+            for source in self.SOURCES:
+                new_rows[source] = sum(len(b) for b in self._write_batches(state, source, deltas[source](), run_id))
+                # Persist after each source so a later failure never re-appends this one
+                self.save_state(state)
+
+            logging.info(f"Incremental ingestion added {new_rows}")
+            return new_rows
+
+        except Exception as e:
+            logging.error(f"Error during incremental ingestion: {e}")
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    obj = IncrementalIngestion()
+    obj.run()
+    view = obj.merged_view()
+    if view is not None:
+        logging.info(f"Merged view holds {view.count_rows()} rows, "
+                     f"{obj.latest_view(columns=[obj.config.key_column]).num_rows} distinct customers")
@@ -0,0 +1,243 @@
+import sys
+import numpy as np
+import pandas as pd
+import joblib
+from src.components.data_validation.quality_engine import KLLSketch
+from src.logger import logging
+from src.exception import CustomException
+from src.instrumentation import span
+
+
+class ChurnPreprocessor:
+    """
+    Fitted form of DataPreparation's cleaning steps: median/mode imputation, one
+    category map per categorical column and standard scaling.
+
+    fit_transform() is used once on training data; transform() only applies the learned
+    statistics, so scoring reproduces training features exactly. Pickles with the model.
+    """
+
+    def __init__(self, id_column="customerid", target_column="churn", sketch_k=400):
+        self.id_column = id_column
+        self.target_column = target_column
+        self.sketch_k = sketch_k
+        self._stats = None
+        self._lookup = None
+
+    def _cast(self, df):
+        df = df.copy()  # Avoid modifying the original DataFrame
+        # Converting float columns to int where applicable
+        for col in df.select_dtypes(include=['float64']).columns:
+            df[col] = df[col].astype('int', errors='ignore')
+        if self.target_column in df.columns:
+            # Convert churn column to object type (string labels)
+            df[self.target_column] = df[self.target_column].map({0: 'False', 1: 'True'})
+        return df
+
+    def _impute(self, df):
+        for col in self.cat_cols_:
+            df[col] = df[col].fillna(self.modes_[col])
+        df[self.num_cols_] = df[self.num_cols_].fillna(self.medians_)
+        return df
+
+    def _encode_and_scale(self, df):
+        for col in self.cat_cols_:
+            codes = self.categories_[col].get_indexer(df[col].astype(str))
+            unseen = codes == -1
+            if unseen.any():
+                # Categories never seen in training score as the training mode
+                logging.warning(f"{int(unseen.sum())} unseen values in '{col}' mapped to '{self.modes_[col]}'")
+                codes = np.where(unseen, self.categories_[col].get_loc(str(self.modes_[col])), codes)
+            df[col] = codes.astype('int64')
+        values = df[self.num_cols_].to_numpy(dtype=float)
+        df[self.num_cols_] = (values - self.mean_) / self.scale_
+        return df
+
+    def _column_kinds(self, df):
+        # Identify numerical and categorical columns
+        num_cols = list(df.select_dtypes(include=['number']).columns.drop(self.id_column, errors='ignore'))
+        cat_cols = list(df.select_dtypes(include=['object', 'string', 'category']).columns
+                        .drop(self.target_column, errors='ignore'))
+        return num_cols, cat_cols
+
+    def _select_columns(self, df):
+        self.num_cols_, self.cat_cols_ = self._column_kinds(df)
+
+    def _check_columns(self, chunk):
+        """
+        Raises if a chunk's columns differ from the ones partial_fit fixed on the first chunk.
+        A column that is entirely null in a chunk carries no dtype and matches either kind.
+        """
+        num_cols, cat_cols = self._column_kinds(chunk)
+        empty = set(chunk.columns[chunk.isna().all()])
+        fitted = self.num_cols_ + self.cat_cols_
+        missing = [col for col in fitted if col not in chunk.columns]
+        added = [col for col in num_cols + cat_cols if col not in fitted]
+        changed = [col for col in self.num_cols_ if col in cat_cols and col not in empty] + \
+                  [col for col in self.cat_cols_ if col in num_cols and col not in empty]
+        if missing or added or changed:
+            raise ValueError(f"Chunk columns differ from the first chunk: missing {missing}, "
+                             f"unexpected {added}, numeric/categorical changed {changed}")
+
+    def partial_fit(self, chunk: pd.DataFrame):
+        """
+        Pass one of out-of-core fitting: folds a chunk into mergeable statistics (a KLL
+        sketch per column for medians, category counts for modes, and per-column
+        count/mean/M2 merged with Chan's parallel form of Welford's update). Every chunk
+        must have the first chunk's columns, each still numeric or categorical; anything
+        else raises ValueError rather than being silently dropped.
+        """
+        chunk = self._cast(chunk)
+        if self._stats is not None:
+            self._check_columns(chunk)
+        else:
+            self._select_columns(chunk)
+            self._stats = {
+                "rows": 0,
+                "sketches": {col: KLLSketch(self.sketch_k, seed=i) for i, col in enumerate(self.num_cols_)},
+                "counts": {col: {} for col in self.cat_cols_},
+                "n": np.zeros(len(self.num_cols_)),
+                "mean": np.zeros(len(self.num_cols_)),
+                "m2": np.zeros(len(self.num_cols_)),
+            }
+        stats = self._stats
+        stats["rows"] += len(chunk)
+
+        for col in self.cat_cols_:
+            counts = stats["counts"][col]
+            for value, count in chunk[col].value_counts(dropna=True).items():
+                if count:  # categoricals also list unobserved categories
+                    counts[value] = counts.get(value, 0) + int(count)
+
+        values = chunk[self.num_cols_].to_numpy(dtype=float)
+        for i, col in enumerate(self.num_cols_):
+            stats["sketches"][col].update(values[:, i])
+        present = ~np.isnan(values)
+        n_chunk = present.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_chunk = np.where(n_chunk > 0, np.nansum(values, axis=0) / n_chunk, 0.0)
+            m2_chunk = np.nansum((values - mean_chunk) ** 2, axis=0)
+        stats["n"], stats["mean"], stats["m2"] = self._combine_moments(
+            stats["n"], stats["mean"], stats["m2"], n_chunk, mean_chunk, m2_chunk)
+        return self
+
+    @staticmethod
+    def _combine_moments(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(n > 0, mean_a + delta * n_b / n, 0.0)
+            m2 = np.where(n > 0, m2_a + m2_b + delta ** 2 * n_a * n_b / n, 0.0)
+        return n, mean, m2
+
+    def finalize(self):
+        """Turns the statistics gathered by partial_fit into the fitted state used by transform()."""
+        stats = self._stats
+        self.medians_ = pd.Series([stats["sketches"][col].quantiles([0.5])[0] for col in self.num_cols_],
+                                  index=self.num_cols_)
+        self.modes_ = {col: max(counts, key=counts.get) for col, counts in stats["counts"].items()}
+        self.categories_ = {col: pd.Index(np.sort(np.array([str(v) for v in counts], dtype=object)))
+                            for col, counts in stats["counts"].items()}
+
+        # Nulls are imputed with the median before scaling, so fold them in as a zero-variance group
+        nulls = stats["rows"] - stats["n"]
+        n, mean, m2 = self._combine_moments(stats["n"], stats["mean"], stats["m2"],
+                                            nulls, self.medians_.to_numpy(), np.zeros(len(nulls)))
+        self.mean_ = mean
+        scale = np.sqrt(np.where(n > 0, m2 / np.maximum(n, 1), 0.0))
+        self.scale_ = np.where(scale == 0, 1.0, scale)
+        self._stats = None
+        self._lookup = None
+        return self
+
+    def fit_transform(self, df: pd.DataFrame, drop_duplicates=True) -> pd.DataFrame:
+        """Learns imputation, encoding and scaling statistics from df and returns it prepared."""
+        try:
+            df = self._cast(df)
+            self._select_columns(df)
+            self._lookup = None
+
+            # Spans only on the fitting path; transform() also serves single requests
+            with span("imputation", rows=len(df)):
+                self.modes_ = {col: df[col].mode(dropna=True).iloc[0] for col in self.cat_cols_}
+                self.medians_ = df[self.num_cols_].median()
+                df = self._impute(df)
+
+            if drop_duplicates:
+                df.drop_duplicates(inplace=True)
+                df.reset_index(drop=True, inplace=True)
+
+            # Sorted classes, so codes match what a per-column LabelEncoder would assign
+            with span("encoding_and_scaling", rows=len(df)):
+                self.categories_ = {col: pd.Index(np.sort(df[col].astype(str).unique())) for col in self.cat_cols_}
+                values = df[self.num_cols_].to_numpy(dtype=float)
+                self.mean_ = values.mean(axis=0)
+                scale = values.std(axis=0)
+                self.scale_ = np.where(scale == 0, 1.0, scale)
+                return self._encode_and_scale(df)
+
+        except Exception as e:
+            logging.error(f"Error fitting preprocessor: {e}")
+            raise CustomException(e, sys)
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Applies the fitted statistics; rows are never dropped."""
+        try:
+            return self._encode_and_scale(self._impute(self._cast(df)))
+        except Exception as e:
+            logging.error(f"Error applying preprocessor: {e}")
+            raise CustomException(e, sys)
+
+    def _serving_lookup(self):
+        """Fitted statistics as arrays and per-column code maps, built once per fit (or unpickle)."""
+        if getattr(self, "_lookup", None) is None:
+            codes = {col: {value: code for code, value in enumerate(self.categories_[col])} for col in self.cat_cols_}
+            self._lookup = {
+                "medians": self.medians_[self.num_cols_].to_numpy(dtype=float),
+                "codes": codes,
+                "mode_codes": [codes[col][str(self.modes_[col])] for col in self.cat_cols_],
+            }
+        return self._lookup
+
+    def transform_arrays(self, numeric, categorical, truncate=None):
+        """
+        Array form of transform() for serving: imputes, encodes and scales in one vectorised
+        pass without building or copying a DataFrame.
+
+        :param numeric: float array with one column per num_cols_, NaN where missing
+        :param categorical: object array with one column per cat_cols_, None/NaN where missing
+        :param truncate: bool per num_cols_, whether the column is float64 and so cast to int
+            like _cast does; defaults to every column
+        :return: (scaled float array, int64 category codes)
+        """
+        lookup = self._serving_lookup()
+        finite = np.isfinite(numeric)
+        # _cast's astype('int') only succeeds, and truncates, for columns with no NaN/inf in the batch
+        cast = finite.all(axis=0) if truncate is None else finite.all(axis=0) & truncate
+        values = np.where(cast, np.trunc(numeric), numeric)
+        values = np.where(np.isnan(values), lookup["medians"], values)
+        scaled = (values - self.mean_) / self.scale_
+
+        codes = np.empty(categorical.shape, dtype=np.int64)
+        for j, col in enumerate(self.cat_cols_):
+            col_codes, mode_code = lookup["codes"][col], lookup["mode_codes"][j]
+            unseen = 0
+            for i, value in enumerate(categorical[:, j]):
+                if pd.isna(value):
+                    codes[i, j] = mode_code
+                    continue
+                code = col_codes.get(str(value))
+                if code is None:
+                    code, unseen = mode_code, unseen + 1
+                codes[i, j] = code
+            if unseen:
+                logging.warning(f"{unseen} unseen values in '{col}' mapped to '{self.modes_[col]}'")
+        return scaled, codes
+
+    def save(self, path):
+        joblib.dump(self, path)
+        return path
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
@@ -0,0 +1,141 @@
+import os
+import re
+import sys
+import time
+import importlib
+from dataclasses import dataclass
+import pandas as pd
+from src.logger import logging
+from src.exception import CustomException
+
+
+PLACEHOLDERS = {
+    "qmark": "?",
+    "format": "%s",
+    "pyformat": "%s",
+}
+
+
+@dataclass
+class BulkLoaderConfig:
+    table_name: str = "CustomerChurnData"
+    chunk_size: int = 100_000
+    stage_dir: str = os.path.join('artifacts', "bulk_stage")
+    compression: str = "snappy"
+    # "auto" picks "copy" for Snowflake connections and "executemany" otherwise
+    method: str = "auto"
+    paramstyle: str = None
+
+
+def sql_column_name(column):
+    """Maps a DataFrame column ('Usage Frequency', 'usage frequency') to its table column (USAGE_FREQUENCY)."""
+    return re.sub(r"\W+", "_", str(column).strip()).upper()
+
+
+class BulkLoader:
+    """
+    Writes a DataFrame into a table in fixed-size chunks over any DB-API 2.0 connection.
+
+    Snowflake connections stage each chunk as a compressed Parquet file and load it
+    with PUT + COPY INTO. Every other connection (sqlite3, duckdb, ...) gets one
+    parameterized executemany per chunk, which is what the local stand-ins use.
+    """
+
+    def __init__(self, conn, config: BulkLoaderConfig = None):
+        self.conn = conn
+        self.config = config or BulkLoaderConfig()
+
+    def _connection_module(self):
+        return type(self.conn).__module__.split(".")[0]
+
+    def _method(self):
+        if self.config.method != "auto":
+            return self.config.method
+        return "copy" if self._connection_module() == "snowflake" else "executemany"
+
+    def _placeholder(self):
+        paramstyle = self.config.paramstyle
+        if paramstyle is None:
+            try:
+                paramstyle = importlib.import_module(self._connection_module()).paramstyle
+            except (ImportError, AttributeError):
+                paramstyle = "qmark"
+        if paramstyle not in PLACEHOLDERS:
+            raise ValueError(f"Unsupported paramstyle: {paramstyle}")
+        return PLACEHOLDERS[paramstyle]
+
+    def _chunks(self, df):
+        chunk_size = max(1, int(self.config.chunk_size))
+        for start in range(0, len(df), chunk_size):
+            chunk = df.iloc[start:start + chunk_size]
+            chunk.columns = [sql_column_name(col) for col in chunk.columns]
+            yield chunk
+
+    def _load_executemany(self, cursor, chunk):
+        columns = ", ".join(chunk.columns)
+        values = ", ".join([self._placeholder()] * len(chunk.columns))
+        insert_sql = f"INSERT INTO {self.config.table_name} ({columns}) VALUES ({values})"
+
+        # object dtype hands the driver plain Python scalars and None for missing values
+        rows = chunk.astype(object).where(chunk.notna(), None)
+        cursor.executemany(insert_sql, list(rows.itertuples(index=False, name=None)))
+
+    def _load_copy(self, cursor, chunk, chunk_number):
+        os.makedirs(self.config.stage_dir, exist_ok=True)
+        file_name = f"{self.config.table_name.lower()}_{os.getpid()}_{chunk_number:05d}.parquet"
+        file_path = os.path.abspath(os.path.join(self.config.stage_dir, file_name))
+
+        chunk.to_parquet(file_path, compression=self.config.compression, index=False)
+        try:
+            stage = f"@%{self.config.table_name}"
+            cursor.execute(f"PUT 'file://{file_path.replace(os.sep, '/')}' {stage} AUTO_COMPRESS=FALSE OVERWRITE=TRUE")
+            cursor.execute(
+                f"COPY INTO {self.config.table_name} FROM {stage} FILES = ('{file_name}') "
+                f"FILE_FORMAT = (TYPE = PARQUET) MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE PURGE = TRUE"
+            )
+        finally:
+            os.remove(file_path)
+
+    def load(self, df: pd.DataFrame) -> dict:
+        """
+        Loads df into config.table_name, one bulk statement per chunk.
+
+        :param df: DataFrame whose columns map onto the table via sql_column_name
+        :return: dict with rows, chunks, seconds and rows_per_second
+        """
+        try:
+            method = self._method()
+            start = time.perf_counter()
+            rows = 0
+            chunks = 0
+
+            cursor = self.conn.cursor()
+            try:
+                for chunk_number, chunk in enumerate(self._chunks(df)):
+                    if method == "copy":
+                        self._load_copy(cursor, chunk, chunk_number)
+                    else:
+                        self._load_executemany(cursor, chunk)
+                    rows += len(chunk)
+                    chunks += 1
+                    logging.info(f"Loaded chunk {chunk_number} ({len(chunk)} rows) into {self.config.table_name}")
+            finally:
+                cursor.close()
+            self.conn.commit()
+
+            seconds = time.perf_counter() - start
+            stats = {
+                "rows": rows,
+                "chunks": chunks,
+                "seconds": round(seconds, 3),
+                "rows_per_second": round(rows / seconds, 1) if seconds > 0 else float(rows),
+            }
+            logging.info(
+                f"Bulk load into {self.config.table_name} via {method}: {rows} rows in {chunks} chunks, "
+                f"{stats['seconds']}s ({stats['rows_per_second']} rows/s)"
+            )
+            return stats
+
+        except Exception as e:
+            logging.error(f"Error during bulk load into {self.config.table_name}: {e}")
+            raise CustomException(e, sys)
@@ -1,7 +1,10 @@
 from dataclasses import dataclass
 import numpy as np 
 import pandas as pd
-from src.components.data_validation.data_preparation import DataPreparation
+from src.components.data_preparation.data_preparation import DataPreparation
+from src.components.data_transformation.bulk_loader import BulkLoader, BulkLoaderConfig
+from src.components.data_transformation.feature_registry import FEATURES
+from src.artifact_store import ArtifactStore
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import Paragraph, SimpleDocTemplate
 import os
@@ -9,22 +12,19 @@ from google.cloud import secretmanager
 import json
 import snowflake.connector
 from prefect import flow
-import logging
+from src.logger import logging
 
-logging.basicConfig(
-    filename="prep.log",
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filemode='w'
-)
-
-log = logging.getLogger()
-log.setLevel(logging.INFO)  # Set the logging level to INFO
+log = logging.getLogger(__name__)
 
 
 
 @dataclass
 class DataTransformationConfig:
     raw_data_path: str = os.path.join('artifacts', "data.csv")
+    artifact_name: str = "customer_data_transformed"
+    output_csv_path: str = r"D:\Ml-Projects\Customer-Churn\notebook\data\customer_data_transformed.csv"
+    # Also write output_csv_path alongside the typed artifact
+    export_csv: bool = False
 
 
 
@@ -32,41 +32,52 @@ class DataTransformation:
     def __init__(self):
         self.config = DataTransformationConfig()
 
-    def transformedData(self,df):
-        # Feature Engineering
-        df["Avg Spend Per Tenure"] = df["total spend"] / df["tenure"].replace(0, 1)  # Avoid division by zero
-
-        # Convert 'Last Interaction' to a relative recency score (higher means more recent)
-        df["Recency Score"] = df["last interaction"].max() - df["last interaction"]
+    @staticmethod
+    def add_features(df, last_interaction_max=None, features=None):
+        """
+        Adds engineered columns from the feature registry to df in place; shared by training and scoring.
 
-        #Churn Risk Score (Higher risk if more support calls, delays, and lower tenure)
-        df['Churn Risk Score'] = (df['support calls'] * 0.3) + (df['payment delay'] * 0.5) - (df['tenure'] * 0.2)
+        :param last_interaction_max: reference for Recency Score, defaults to the max within df
+        :param features: names of registered features to compute, defaults to all of them
+        """
+        return FEATURES.plan(features).apply(df, {"last_interaction_max": last_interaction_max})
 
-        #Customer Lifetime Value (CLV) Approximation
-        df['CLV'] = df['total spend'] / df['tenure']
-        output_csv_path = r"D:\Ml-Projects\Customer-Churn\notebook\data\customer_data_transformed.csv"
-        df.to_csv(output_csv_path, index=False)
+    def transformedData(self,df):
+        df = self.add_features(df)
+        store = ArtifactStore()
+        store.write(df, self.config.artifact_name)
+        if self.config.export_csv:
+            store.export_csv(df, self.config.output_csv_path)
         return df
 
-    def datastore(self,df):
-        
-        client=secretmanager.SecretManagerServiceClient()
-        secret_id="SnowflakeConnection"
-        project_id="Personal"
-        request={"name":f"projects/597348541614/secrets/SnowflakeConnection/versions/3"}
-        response=client.access_secret_version(request)
-        secret_string=response.payload.data
-        sec=json.loads(secret_string)
-        conn = snowflake.connector.connect(
-                user='SHAHHUSSAIN',
-                password='Shahid22Sherin',
-                account='TIQIOCR-KY36542',
-                database='PROJECT',
-                schema='PUBLIC',
-                session_parameters={
-                    'QUERY_TAG': 'EndOfMonthFinancials',
-                }
-)
+    def datastore(self, df, conn=None, chunk_size=None):
+        """
+        Bulk-loads the transformed frame into CustomerChurnData.
+
+        :param df: output of transformedData
+        :param conn: optional DB-API connection (e.g. sqlite3/duckdb in tests); Snowflake is used when omitted
+        :param chunk_size: rows per staged chunk, defaults to BulkLoaderConfig.chunk_size
+        :return: load statistics including rows_per_second
+        """
+        owns_connection = conn is None
+        if owns_connection:
+            client=secretmanager.SecretManagerServiceClient()
+            secret_id="SnowflakeConnection"
+            project_id="Personal"
+            request={"name":f"projects/597348541614/secrets/SnowflakeConnection/versions/3"}
+            response=client.access_secret_version(request)
+            secret_string=response.payload.data
+            sec=json.loads(secret_string)
+            conn = snowflake.connector.connect(
+                    user='SHAHHUSSAIN',
+                    password='Shahid22Sherin',
+                    account='TIQIOCR-KY36542',
+                    database='PROJECT',
+                    schema='PUBLIC',
+                    session_parameters={
+                        'QUERY_TAG': 'EndOfMonthFinancials',
+                    }
+    )
 
         cursor = conn.cursor()
 
@@ -89,20 +100,16 @@ class DataTransformation:
             CLV                   FLOAT
         );
         """)
-        for index, row in df.iterrows():
-            cursor.execute(f"""
-                INSERT INTO CustomerChurn VALUES (
-                    {row['CustomerID']}, {row['Age']}, '{row['Gender']}', {row['Tenure']},
-                    {row['Usage Frequency']}, {row['Support Calls']}, {row['Payment Delay']},
-                    '{row['Subscription Type']}', '{row['Contract Length']}', {row['Total Spend']},
-                    {row['Last Interaction']}, '{row['Churn']}', {row['Avg Spend Per Tenure']},
-                    {row['Recency Score']}, {row['Churn Risk Score']}, {row['CLV']}
-                );
-            """)
-
-        conn.commit()
         cursor.close()
-        conn.close()
+
+        loader_config = BulkLoaderConfig(table_name="CustomerChurnData")
+        if chunk_size is not None:
+            loader_config.chunk_size = chunk_size
+        try:
+            return BulkLoader(conn, loader_config).load(df)
+        finally:
+            if owns_connection:
+                conn.close()
 
     def call(self):
         prep_obj = DataPreparation()
@@ -110,12 +117,9 @@ class DataTransformation:
         trans_obj=DataTransformation()
         trans=trans_obj.transformedData(cleaned_data)
         if trans is not None:
-            logging.info("Data ingestion successful! Here are the first few rows:")
-            logging.info(trans.head())  # logging.info sample data
-            logging.info(trans.shape)
-            logging.info("success")
+            log.info(f"Data Transformation Successful: {trans.shape[0]} rows, {trans.shape[1]} columns")
         else:
-            logging.info("Data ingestion failed.")
+            log.info("Data ingestion failed.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,184 @@
+import sys
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+from src.logger import logging
+from src.exception import CustomException
+
+try:
+    import numexpr
+except ImportError:  # NumPy evaluates the same expressions, with temporaries
+    numexpr = None
+
+
+@dataclass(frozen=True)
+class Feature:
+    """
+    A derived column defined as an arithmetic expression.
+
+    :param expression: numexpr/NumPy expression over the aliases in inputs and aggregates
+    :param inputs: alias -> source column (a prepared column or another feature)
+    :param aggregates: alias -> (reduction, column) computed over the whole training frame,
+        e.g. {"last_interaction_max": ("max", "last interaction")}; serving passes them in
+    """
+    name: str
+    expression: str
+    inputs: dict
+    aggregates: dict = field(default_factory=dict)
+
+
+_REDUCTIONS = {
+    "max": (np.nanmax, max),
+    "min": (np.nanmin, min),
+}
+
+
+def _normalise(name):
+    return " ".join(str(name).replace("_", " ").split()).lower()
+
+
+class FeatureRegistry:
+    def __init__(self, features=()):
+        self.features = {}
+        for feature in features:
+            self.register(feature)
+
+    def register(self, feature: Feature):
+        for reduction, _ in feature.aggregates.values():
+            if reduction not in _REDUCTIONS:
+                raise ValueError(f"Unsupported aggregate '{reduction}' in feature '{feature.name}'")
+        self.features[feature.name] = feature
+        return feature
+
+    def plan(self, names=None):
+        """:return: FeaturePlan computing `names` (default: every registered feature)"""
+        return FeaturePlan(self, list(self.features) if names is None else list(names))
+
+
+class FeaturePlan:
+    """
+    Evaluation plan for a subset of features: resolves dependencies between features,
+    reads each source column once, and evaluates every expression in one fused
+    vectorised pass (numexpr when available). Works on whole frames or per chunk.
+    """
+
+    def __init__(self, registry: FeatureRegistry, names):
+        self.registry = registry
+        self.order = []
+        visiting = set()
+
+        def visit(name):
+            if name in self.order:
+                return
+            if name in visiting:
+                raise ValueError(f"Cyclic feature definition at '{name}'")
+            if name not in registry.features:
+                raise KeyError(f"Unknown feature '{name}'")
+            visiting.add(name)
+            for column in registry.features[name].inputs.values():
+                if column in registry.features:
+                    visit(column)
+            visiting.discard(name)
+            self.order.append(name)
+
+        for name in names:
+            visit(name)
+        self.requested = list(names)
+        features = [registry.features[name] for name in self.order]
+        self.source_columns = sorted({column for f in features for column in f.inputs.values()
+                                      if column not in registry.features})
+        self.aggregates = {alias: spec for f in features for alias, spec in f.aggregates.items()}
+
+    @staticmethod
+    def resolve(columns, column):
+        """Finds column among columns ignoring case, spacing and underscores (e.g. 'Total Spend' vs 'total_spend')."""
+        if column in columns:
+            return column
+        lookup = {_normalise(c): c for c in columns}
+        try:
+            return lookup[_normalise(column)]
+        except KeyError:
+            raise KeyError(f"Column '{column}' required by the feature plan is not in the frame")
+
+    def compute_aggregates(self, df):
+        """:return: aggregate values over df, e.g. the training reference for Recency Score"""
+        return {alias: _REDUCTIONS[reduction][0](df[self.resolve(df.columns, column)].to_numpy(dtype=float))
+                for alias, (reduction, column) in self.aggregates.items()}
+
+    def merge_aggregates(self, left, right):
+        """Combines aggregates computed on two chunks."""
+        if not left:
+            return dict(right)
+        return {alias: _REDUCTIONS[self.aggregates[alias][0]][1](left[alias], right[alias]) for alias in left}
+
+    def compute(self, df, aggregates=None):
+        """
+        :param aggregates: precomputed aggregate values; missing ones are computed from df
+        :return: DataFrame with one column per requested feature, aligned to df's index
+        """
+        try:
+            values = {}
+            if self.aggregates:
+                given = aggregates or {}
+                missing = {alias for alias in self.aggregates if given.get(alias) is None}
+                values.update(self.compute_aggregates(df) if missing else {})
+                values.update({alias: value for alias, value in given.items() if value is not None})
+            sources = {column: df[self.resolve(df.columns, column)].to_numpy(dtype=float)
+                       for column in self.source_columns}
+            return pd.DataFrame(self.compute_arrays(sources, values), index=df.index)
+
+        except Exception as e:
+            logging.error(f"Error computing features {self.requested}: {e}")
+            raise CustomException(e, sys)
+
+    def compute_arrays(self, sources, aggregates=None):
+        """
+        Array form of compute() for callers already holding the source columns, e.g. serving.
+
+        :param sources: source column -> float array
+        :param aggregates: precomputed aggregate values; missing ones are reduced from sources
+        :return: dict of requested feature -> array
+        """
+        values = {alias: value for alias, value in (aggregates or {}).items() if value is not None}
+        for alias, (reduction, column) in self.aggregates.items():
+            if alias not in values:
+                values[alias] = _REDUCTIONS[reduction][0](sources[column])
+
+        results = {}
+        for name in self.order:
+            feature = self.registry.features[name]
+            local = {alias: results[column] if column in results else sources[column]
+                     for alias, column in feature.inputs.items()}
+            local.update({alias: np.float64(values[alias]) for alias in feature.aggregates})
+            if numexpr is not None:
+                results[name] = numexpr.evaluate(feature.expression, local_dict=local)
+            else:
+                results[name] = eval(feature.expression, {"__builtins__": {}, "where": np.where}, local)
+        return {name: results[name] for name in self.requested}
+
+    def apply(self, df, aggregates=None):
+        """Adds the requested features to df in place and returns it."""
+        features = self.compute(df, aggregates)
+        for name in features.columns:
+            df[name] = features[name]
+        return df
+
+    def apply_chunks(self, chunks, aggregates):
+        """Per-chunk evaluation; aggregates must cover the whole data (e.g. from a first pass or the model bundle)."""
+        for chunk in chunks:
+            yield self.apply(chunk, aggregates)
+
+
+FEATURES = FeatureRegistry([
+    Feature("Avg Spend Per Tenure", "total_spend / where(tenure == 0, 1, tenure)",  # Avoid division by zero
+            {"total_spend": "total spend", "tenure": "tenure"}),
+    # Relative recency (higher means more recent) against the latest interaction in the training data
+    Feature("Recency Score", "last_interaction_max - last_interaction",
+            {"last_interaction": "last interaction"},
+            {"last_interaction_max": ("max", "last interaction")}),
+    # Higher risk with more support calls and payment delays, and with lower tenure
+    Feature("Churn Risk Score", "support_calls * 0.3 + payment_delay * 0.5 - tenure * 0.2",
+            {"support_calls": "support calls", "payment_delay": "payment delay", "tenure": "tenure"}),
+    # Customer Lifetime Value (CLV) Approximation
+    Feature("CLV", "total_spend / tenure", {"total_spend": "total spend", "tenure": "tenure"}),
+])
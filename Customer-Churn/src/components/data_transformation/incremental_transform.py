@@ -0,0 +1,171 @@
+import os
+import sys
+import json
+import glob
+from datetime import datetime, timezone
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from src.components.data_transformation.feature_registry import FEATURES, FeatureRegistry
+from src.caching import entity_key
+from src.logger import logging
+from src.exception import CustomException
+
+
+@dataclass
+class IncrementalTransformConfig:
+    store_path: str = os.path.join('artifacts', "transformed_store")
+    state_path: str = os.path.join('artifacts', "transform_state.json")
+    key_column: str = "customerid"
+    # Fold the delta parts back into one file once there are more than this many
+    max_parts: int = 64
+
+
+class IncrementalTransformer:
+    """
+    Daily transforms in time proportional to the delta.
+
+    Only aggregate-free features (e.g. CLV) are computed for incoming rows and stored,
+    as append-only Parquet parts where the latest part wins per customer. Features that
+    depend on whole-table aggregates (e.g. Recency Score on max(last interaction)) are
+    finished when the table is read, from aggregates tracked in the state file, so an
+    aggregate shift never forces a rewrite of existing rows.
+
+    For each max/min aggregate the state also keeps the customers currently holding it,
+    so it is maintained from the delta alone; only when an update lowers the sole holder
+    is the single source column rescanned.
+    """
+
+    def __init__(self, config: IncrementalTransformConfig = None, registry: FeatureRegistry = FEATURES):
+        self.config = config or IncrementalTransformConfig()
+        self.registry = registry
+        dependent = [name for name in registry.features if self._uses_aggregates(name)]
+        self.stored_plan = registry.plan([name for name in registry.features if name not in dependent])
+        self.dependent_plan = registry.plan(dependent) if dependent else None
+
+    def _uses_aggregates(self, name):
+        feature = self.registry.features[name]
+        return bool(feature.aggregates) or any(
+            column in self.registry.features and self._uses_aggregates(column) for column in feature.inputs.values())
+
+    def load_state(self):
+        if not os.path.exists(self.config.state_path):
+            return {"aggregates": {}, "holders": {}, "next_part": 0}
+        with open(self.config.state_path) as f:
+            return json.load(f)
+
+    def save_state(self, state):
+        os.makedirs(os.path.dirname(self.config.state_path) or ".", exist_ok=True)
+        tmp_path = f"{self.config.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.config.state_path)
+
+    def _parts(self):
+        return sorted(glob.glob(os.path.join(self.config.store_path, "part-*.parquet")))
+
+    def _read_latest(self, columns=None):
+        """Latest row per customer across all parts."""
+        parts = self._parts()
+        if not parts:
+            return pd.DataFrame()
+        if columns is not None:
+            columns = list(dict.fromkeys([self.config.key_column, "_part", *columns]))
+        df = pd.concat([pd.read_parquet(path, columns=columns) for path in parts], ignore_index=True)
+        keys = df[self.config.key_column].map(entity_key)
+        latest = df.assign(_key=keys).sort_values("_part", kind="stable").drop_duplicates("_key", keep="last")
+        return latest.drop(columns=["_key", "_part"]).sort_index().reset_index(drop=True)
+
+    def _update_aggregate(self, alias, state, delta, keys):
+        """Maintains one max/min aggregate and its holders from the delta; returns True if a rescan is needed."""
+        reduction, column = self.dependent_plan.aggregates[alias]
+        better = np.greater if reduction == "max" else np.less
+        values = delta[self.dependent_plan.resolve(delta.columns, column)].to_numpy(dtype=float)
+        current = state["aggregates"].get(alias)
+        holders = set(state["holders"].get(alias, []))
+
+        # Updated customers that held the aggregate lose it unless they still match it
+        for key, value in zip(keys, values):
+            if key in holders and value != current:
+                holders.discard(key)
+        valid = ~np.isnan(values)
+        if valid.any():
+            best = np.nanmax(values) if reduction == "max" else np.nanmin(values)
+            if current is None or better(best, current):
+                current, holders = float(best), set()
+            holders.update(key for key, value in zip(keys, values) if value == current)
+
+        state["aggregates"][alias] = current
+        state["holders"][alias] = sorted(holders)
+        return current is not None and not holders
+
+    def _rescan(self, alias, state):
+        reduction, column = self.dependent_plan.aggregates[alias]
+        latest = self._read_latest(columns=[column])
+        values = latest[column].to_numpy(dtype=float)
+        current = float(np.nanmax(values) if reduction == "max" else np.nanmin(values)) if len(values) else None
+        state["aggregates"][alias] = current
+        state["holders"][alias] = sorted(latest.loc[values == current, self.config.key_column].map(entity_key))
+        logging.info(f"Rescanned '{column}' for {alias}: {current}")
+
+    def apply_delta(self, delta: pd.DataFrame):
+        """
+        :param delta: new or changed customers, already prepared (e.g. with the fitted preprocessor)
+        :return: dict of run statistics
+        """
+        try:
+            state = self.load_state()
+            delta = delta.drop_duplicates(self.config.key_column, keep="last").reset_index(drop=True)
+            delta = self.stored_plan.apply(delta.copy())
+            keys = delta[self.config.key_column].map(entity_key).tolist()
+
+            os.makedirs(self.config.store_path, exist_ok=True)
+            part = state["next_part"]
+            path = os.path.join(self.config.store_path, f"part-{part:06d}.parquet")
+            delta.assign(_part=part).to_parquet(f"{path}.tmp", index=False)
+            os.replace(f"{path}.tmp", path)
+            state["next_part"] = part + 1
+
+            rescanned = []
+            if self.dependent_plan is not None:
+                for alias in self.dependent_plan.aggregates:
+                    if self._update_aggregate(alias, state, delta, keys):
+                        self._rescan(alias, state)
+                        rescanned.append(alias)
+
+            compacted = len(self._parts()) > self.config.max_parts
+            if compacted:
+                self.compact()
+            state["updated_at"] = datetime.now(timezone.utc).isoformat()
+            self.save_state(state)
+
+            stats = {"delta_rows": len(delta), "part": path, "aggregates": state["aggregates"],
+                     "rescanned": rescanned, "compacted": compacted}
+            logging.info(f"Incremental transform: {stats}")
+            return stats
+
+        except Exception as e:
+            logging.error(f"Error in incremental transform: {e}")
+            raise CustomException(e, sys)
+
+    def compact(self):
+        """Rewrites the latest row per customer into a single part."""
+        parts = self._parts()
+        latest = self._read_latest()
+        path = os.path.join(self.config.store_path, "part-compacted.tmp")
+        latest.assign(_part=-1).to_parquet(path, index=False)
+        for old in parts:
+            os.remove(old)
+        # Sorts before every numbered part, so later deltas still win
+        os.replace(path, os.path.join(self.config.store_path, "part-000000-compacted.parquet"))
+
+    def read(self):
+        """:return: the full transformed table with every registered feature, as transformedData would produce"""
+        state = self.load_state()
+        df = self._read_latest()
+        if df.empty:
+            return df
+        if self.dependent_plan is not None:
+            df = self.dependent_plan.apply(df, state["aggregates"])
+        inputs = [c for c in df.columns if c not in self.registry.features]
+        return df[inputs + [name for name in self.registry.features if name in df.columns]]
@@ -1,119 +1,110 @@
+import os
 from dataclasses import dataclass
 import numpy as np 
 import pandas as pd
 from src.components.data_ingestion.data_ingestion import DataIngestion
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, landscape
+from src.components.data_validation.quality_engine import DataQualityAccumulator, frame_quality_report
+from src.components.data_validation.validation_rules import RuleValidator
+from src.components.data_validation.report_renderer import get_report_renderer, render_pdf, to_serialisable, write_report_json
 from src.logger import logging
 from src.exception import CustomException
-from prefect import flow
+
+
+@dataclass
+class DataValidationConfig:
+    report_json_path: str = os.path.join('artifacts', "data_quality_report.json")
+
+
+def _merge_rule_results(report, result):
+    # Types, ranges, categories, uniqueness and null budgets all come from the declarative rules
+    report["Incorrect Data Types"] = result.incorrect_types()
+    report["Rule Violations"] = {f"{v['column']} ({v['check']}{', blocking' if v['blocking'] else ''})": v["violations"]
+                                 for v in result.violations.values()}
+    return report
 
 
 # Data Quality Report Function
-def generate_data_quality_report(df):
-    report = {}
-
-    # Missing Values Check
-    missing_values = df.isnull().sum()
-    report["Missing Values (%)"] = (missing_values / len(df)) * 100
-
-    # Data Type Validation
-    expected_types = {
-        "customerid": "int64",
-        "age": "int64",  
-        "gender": "object",
-        "tenure": "int64",
-        "usage frequency": "int64",
-        "support calls": "int64",
-        "payment delay": "int64",
-        "subscription type": "object",
-        "contract length": "object",
-        "total spend": "int64",
-        "last interaction": "int64",
-        "churn": "object",
-    }
-
-    actual_types = df.dtypes
-    report["Incorrect Data Types"] = {col: str(actual_types[col]) for col in expected_types if str(actual_types[col]) != expected_types[col]}
-
-    # Outlier Detection (Numeric Fields)
-    numeric_cols = df.select_dtypes(include=['number']).columns
-
-    # Exclude CustomerID
-    numeric_cols = numeric_cols.drop('customerid', errors='ignore')
-
-
-    outliers = {}
-    for col in numeric_cols:
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        outlier_count = ((df[col] < (Q1 - 1.5 * IQR)) | (df[col] > (Q3 + 1.5 * IQR))).sum()
-        if outlier_count > 0:
-            outliers[col] = outlier_count
-    report["Outliers Detected"] = outliers
-
-    # Duplicate Records Check
-    duplicate_count = df.duplicated().sum()
-    report["Duplicate Records"] = duplicate_count
+def generate_data_quality_report(df, rules=None):
+    """
+    Missing values, IQR outliers (CustomerID excluded) and duplicate rows, computed with
+    batched, vectorised scans, plus the results of the compiled validation rules.
+
+    :param rules: rule spec, defaults to validation_rules.VALIDATION_RULES
+    """
+    return validate_data_quality(df, rules)[0]
+
+
+def validate_data_quality(df, rules=None):
+    """
+    generate_data_quality_report that also returns the rule results, so callers can
+    reject a load with ValidationResult.raise_for_blocking().
+
+    :return: (report, ValidationResult)
+    """
+    result = RuleValidator(rules).validate(df)
+    report = _merge_rule_results(frame_quality_report(df), result)
 
     # Logging Report
     logging.info("\nData Quality Report Generated")
     logging.info(report)
 
-    return report
+    return report, result
+
+
+def generate_data_quality_report_stream(chunks, rules=None, fail_fast=True):
+    """
+    Same report for data that does not fit in memory, built chunk by chunk from mergeable
+    sketches (KLL quartiles, HyperLogLog distinct rows); outlier and duplicate counts are estimates.
+
+    :param chunks: iterable of DataFrames, e.g. DataIngestion.call_stream()
+    :param fail_fast: stop reading at the first blocking rule violation
+    :return: (report, ValidationResult)
+    """
+    accumulator = DataQualityAccumulator()
+
+    def profiled(chunks):
+        for chunk in chunks:
+            accumulator.update(chunk)
+            yield chunk
+
+    result = RuleValidator(rules).validate_stream(profiled(chunks), fail_fast=fail_fast)
+    report = _merge_rule_results(accumulator.report(), result)
+
+    logging.info(f"\nData Quality Report Generated from {accumulator.rows} streamed rows"
+                 f"{' (stopped at a blocking violation)' if result.stopped_early else ''}")
+    logging.info(report)
+
+    return report, result
 
-@flow
 # PDF Export Function
 def export_data_quality_report_to_pdf(report, file_name="data_quality_report.pdf"):
-    doc = SimpleDocTemplate(file_name, pagesize=A4)
-    elements = []
-    styles = getSampleStyleSheet()
-
-    # Title
-    elements.append(Paragraph("Data Quality Report", styles['Title']))
-
-    # Add report details
-    for section, data in report.items():
-        elements.append(Paragraph(f"<b>{section}</b>", styles['Heading2']))
-
-        # Handle dictionary data (e.g., Incorrect Data Types or Outliers)
-        if isinstance(data, dict):
-            table_data = [["Column", "Details"]] + list(data.items())
-        else:
-            table_data = [[section, data]]
-
-        # Table Formatting
-        table = Table(table_data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige)
-        ]))
-        elements.append(table)
-
-    # Build PDF
-    doc.build(elements)
+    """Synchronous PDF export; pipelines should prefer publish_data_quality_report."""
+    render_pdf(to_serialisable(report), file_name)
     logging.info(f"Data Quality Report successfully exported to '{file_name}'")
 
 
+def publish_data_quality_report(report, renderer=None):
+    """
+    Writes the structured JSON report and hands PDF/HTML rendering to a background worker.
+
+    :return: (json path, Future resolving to the rendered paths)
+    """
+    json_path = write_report_json(report, DataValidationConfig().report_json_path)
+    future = (renderer or get_report_renderer()).submit(json_path)
+    logging.info(f"Data Quality Report written to '{json_path}'; rendering in the background")
+    return json_path, future
+
 
 if __name__ == "__main__":
     ingestion_obj = DataIngestion()
     combined_data = ingestion_obj.call()  # Call the function
 
     if combined_data is not None:
-        logging.info("Data ingestion successful! Here are the first few rows:")
-        logging.info(combined_data.head())  # logging.info sample data
-        logging.info(combined_data.shape)
+        logging.info(f"Data ingestion successful: {combined_data.shape[0]} rows, {combined_data.shape[1]} columns")
     else:
         logging.info("Data ingestion failed.")
 # Run Validation
     data_quality_report = generate_data_quality_report(combined_data)
-    export_data_quality_report_to_pdf(data_quality_report)
+    _, rendered = publish_data_quality_report(data_quality_report)
+    rendered.result()
 
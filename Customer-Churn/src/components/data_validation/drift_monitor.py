@@ -0,0 +1,223 @@
+import os
+import sys
+import json
+from datetime import datetime, timezone
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+from src.components.data_validation.quality_engine import KLLSketch
+from src.logger import logging
+from src.exception import CustomException
+
+
+@dataclass
+class DriftMonitorConfig:
+    reference_path: str = os.path.join('artifacts', "drift", "reference_profile.json")
+    history_path: str = os.path.join('artifacts', "drift", "drift_history.jsonl")
+    exclude_columns: tuple = ("customerid", "churn")
+    # PSI bins come from reference deciles; KS is evaluated on the reference percentile grid
+    psi_bins: int = 10
+    ks_grid: int = 100
+    psi_warning: float = 0.1
+    psi_alert: float = 0.25
+    ks_alert: float = 0.1
+    sketch_k: int = 400
+
+
+def _psi(expected, actual, epsilon=1e-4):
+    expected = np.clip(np.asarray(expected, dtype=float), epsilon, None)
+    actual = np.clip(np.asarray(actual, dtype=float), epsilon, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def build_reference_profile(chunks, config: DriftMonitorConfig = None):
+    """
+    Compact per-feature profile of the training data, built in one streamed pass.
+
+    Numeric columns keep decile bin edges with their reference proportions and a
+    percentile grid with its CDF (from a KLL sketch); categoricals keep a frequency table.
+
+    :param chunks: a DataFrame or an iterable of DataFrames
+    :return: JSON-serialisable profile dict
+    """
+    config = config or DriftMonitorConfig()
+    try:
+        if isinstance(chunks, pd.DataFrame):
+            chunks = [chunks]
+        sketches, frequencies, rows = {}, {}, 0
+        for chunk in chunks:
+            rows += len(chunk)
+            for col in chunk.columns.drop(list(config.exclude_columns), errors="ignore"):
+                if is_numeric_dtype(chunk[col].dtype):
+                    sketches.setdefault(col, KLLSketch(config.sketch_k, seed=len(sketches))).update(chunk[col].to_numpy())
+                else:
+                    counts = frequencies.setdefault(col, {})
+                    for value, count in chunk[col].value_counts(dropna=False).items():
+                        key = "null" if pd.isna(value) else str(value)
+                        counts[key] = counts.get(key, 0) + int(count)
+
+        numeric = {}
+        for col, sketch in sketches.items():
+            if sketch.n == 0:
+                continue
+            edges = np.unique(sketch.quantiles(np.linspace(0, 1, config.psi_bins + 1)[1:-1]))
+            cdf_at_edges = np.concatenate([[0.0], sketch.cdf(edges), [1.0]])
+            grid = np.unique(sketch.quantiles(np.linspace(0, 1, config.ks_grid + 1)))
+            numeric[col] = {
+                "edges": edges.tolist(),
+                "proportions": np.diff(cdf_at_edges).tolist(),
+                "grid": grid.tolist(),
+                "cdf": sketch.cdf(grid).tolist(),
+            }
+
+        categorical = {col: {value: count / sum(counts.values()) for value, count in counts.items()}
+                       for col, counts in frequencies.items()}
+        return {"created_at": datetime.now(timezone.utc).isoformat(), "rows": rows,
+                "numeric": numeric, "categorical": categorical}
+
+    except Exception as e:
+        logging.error(f"Error building drift reference profile: {e}")
+        raise CustomException(e, sys)
+
+
+class DriftAccumulator:
+    """
+    Constant-memory comparison of a new batch against a reference profile: each chunk only
+    adds to per-bin counts, so PSI/KS can be read off at any point of a long stream.
+    """
+
+    def __init__(self, profile, config: DriftMonitorConfig = None):
+        self.profile = profile
+        self.config = config or DriftMonitorConfig()
+        self.rows = 0
+        self.bin_counts = {col: np.zeros(len(ref["proportions"]), dtype=np.int64)
+                           for col, ref in profile["numeric"].items()}
+        self.grid_counts = {col: np.zeros(len(ref["grid"]), dtype=np.int64)
+                            for col, ref in profile["numeric"].items()}
+        self.totals = {col: 0 for col in profile["numeric"]}
+        self.frequencies = {col: {} for col in profile["categorical"]}
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for col, ref in self.profile["numeric"].items():
+            if col not in chunk.columns:
+                continue
+            values = pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=float)
+            values = np.sort(values[~np.isnan(values)])
+            self.totals[col] += len(values)
+            # Bin i holds edges[i-1] < v <= edges[i], matching the reference CDF taken at the edges
+            bins = np.searchsorted(ref["edges"], values, side="left")
+            self.bin_counts[col] += np.bincount(bins, minlength=len(ref["proportions"]))
+            # Number of values <= each grid point, read straight off the sorted chunk
+            self.grid_counts[col] += np.searchsorted(values, ref["grid"], side="right")
+        for col, counts in self.frequencies.items():
+            if col not in chunk.columns:
+                continue
+            for value, count in chunk[col].value_counts(dropna=False).items():
+                key = "null" if pd.isna(value) else str(value)
+                counts[key] = counts.get(key, 0) + int(count)
+        return self
+
+    def _status(self, psi, ks=None):
+        if psi >= self.config.psi_alert or (ks is not None and ks >= self.config.ks_alert):
+            return "alert"
+        return "warning" if psi >= self.config.psi_warning else "ok"
+
+    def statistics(self):
+        """:return: column -> {"psi", "ks" (numeric only), "status"}"""
+        results = {}
+        for col, ref in self.profile["numeric"].items():
+            total = self.totals[col]
+            if not total:
+                continue
+            psi = _psi(ref["proportions"], self.bin_counts[col] / total)
+            ks = float(np.max(np.abs(self.grid_counts[col] / total - np.asarray(ref["cdf"]))))
+            results[col] = {"psi": round(psi, 5), "ks": round(ks, 5), "status": self._status(psi, ks)}
+        for col, ref in self.profile["categorical"].items():
+            counts = self.frequencies[col]
+            total = sum(counts.values())
+            if not total:
+                continue
+            categories = sorted(set(ref) | set(counts))
+            psi = _psi([ref.get(c, 0.0) for c in categories], [counts.get(c, 0) / total for c in categories])
+            results[col] = {"psi": round(psi, 5), "status": self._status(psi)}
+        return results
+
+
+class DriftMonitor:
+    """Stores the reference profile of each training run and records drift of new batches as a JSONL time series."""
+
+    def __init__(self, config: DriftMonitorConfig = None):
+        self.config = config or DriftMonitorConfig()
+
+    def save_reference(self, chunks):
+        profile = build_reference_profile(chunks, self.config)
+        os.makedirs(os.path.dirname(self.config.reference_path), exist_ok=True)
+        tmp_path = f"{self.config.reference_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(profile, f)
+        os.replace(tmp_path, self.config.reference_path)
+        logging.info(f"Saved drift reference profile ({profile['rows']} rows) to {self.config.reference_path}")
+        return profile
+
+    def load_reference(self):
+        if not os.path.exists(self.config.reference_path):
+            return None
+        with open(self.config.reference_path) as f:
+            return json.load(f)
+
+    def check(self, chunks, batch_id=None):
+        """
+        Compares a batch (a DataFrame or iterable of chunks) with the stored reference
+        and appends the result to the drift history.
+
+        :return: history record, or None if no reference profile exists yet
+        """
+        try:
+            profile = self.load_reference()
+            if profile is None:
+                logging.info("No drift reference profile yet; skipping drift check")
+                return None
+            if isinstance(chunks, pd.DataFrame):
+                chunks = [chunks]
+
+            accumulator = DriftAccumulator(profile, self.config)
+            for chunk in chunks:
+                accumulator.update(chunk)
+            features = accumulator.statistics()
+
+            record = {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "batch_id": batch_id,
+                "reference_created_at": profile["created_at"],
+                "rows": accumulator.rows,
+                "features": features,
+                "alerts": sorted(col for col, stats in features.items() if stats["status"] == "alert"),
+            }
+            os.makedirs(os.path.dirname(self.config.history_path), exist_ok=True)
+            with open(self.config.history_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+            if record["alerts"]:
+                logging.warning(f"Drift alert on {record['alerts']} for batch {batch_id}")
+            else:
+                logging.info(f"No drift alerts for batch {batch_id} ({accumulator.rows} rows)")
+            return record
+
+        except Exception as e:
+            logging.error(f"Error checking drift: {e}")
+            raise CustomException(e, sys)
+
+    def history(self):
+        """:return: drift time series as a long DataFrame (one row per batch and feature)"""
+        if not os.path.exists(self.config.history_path):
+            return pd.DataFrame(columns=["timestamp", "batch_id", "feature", "psi", "ks", "status"])
+        rows = []
+        with open(self.config.history_path) as f:
+            for line in f:
+                record = json.loads(line)
+                for feature, stats in record["features"].items():
+                    rows.append({"timestamp": record["timestamp"], "batch_id": record["batch_id"],
+                                 "feature": feature, **stats})
+        return pd.DataFrame(rows)
@@ -0,0 +1,218 @@
+import numpy as np
+import pandas as pd
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch (KLL). Keeps O(k log(n/k)) values however many are added;
+    rank error is roughly 1.7/k. Items at level h stand for 2**h original values.
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.RandomState(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                items = np.sort(items)
+                # An odd item out stays behind so total weight is preserved exactly
+                keep, items = (items[:1], items[1:]) if len(items) % 2 else (items[:0], items)
+                promoted = items[self._rng.randint(2)::2]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                # Capacities shrink as the sketch grows taller, so re-check from the bottom
+                level = 0
+                continue
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.n += len(values)
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        """:return: approximate values at each quantile in qs (NaN if the sketch is empty)"""
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        items, cumulative = self._weighted()
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side="left")
+        return items[np.minimum(positions, len(items) - 1)]
+
+    def cdf(self, points):
+        """:return: approximate fraction of values <= each point"""
+        if self.n == 0:
+            return np.full(len(points), np.nan)
+        items, cumulative = self._weighted()
+        upto = np.searchsorted(items, np.asarray(points, dtype=float), side="right")
+        return np.where(upto > 0, cumulative[np.maximum(upto - 1, 0)], 0) / cumulative[-1]
+
+    def count_outside(self, low, high):
+        """:return: estimated number of values < low or > high"""
+        if self.n == 0:
+            return 0
+        items, cumulative = self._weighted()
+        total = cumulative[-1]
+        below = np.searchsorted(items, low, side="left")
+        upto = np.searchsorted(items, high, side="right")
+        weight_below = cumulative[below - 1] if below else 0
+        weight_above = total - (cumulative[upto - 1] if upto else 0)
+        return int(round((weight_below + weight_above) * self.n / total))
+
+
+class HyperLogLog:
+    """Mergeable distinct-count estimate over 64-bit hashes; standard error about 1.04/sqrt(2**p)."""
+
+    def __init__(self, p=14):
+        self.p = p
+        self.registers = np.zeros(2 ** p, dtype=np.uint8)
+
+    def update_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        # Rank = leading zeros + 1 of the remaining bits; the top 32 of them convert to float exactly
+        rest = ((hashes << np.uint64(self.p)) >> np.uint64(32)).astype(np.float64)
+        with np.errstate(divide="ignore"):
+            rank = np.where(rest > 0, 32 - np.floor(np.log2(rest)), 33).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(float)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+
+def _outlier_bounds(q1, q3):
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+
+def _dtype_mismatches(observed, expected_types):
+    """:param observed: column -> set of dtype names seen"""
+    mismatches = {}
+    for col, expected in (expected_types or {}).items():
+        wrong = sorted(dtype for dtype in observed.get(col, ()) if dtype != expected)
+        if wrong:
+            mismatches[col] = ", ".join(wrong)
+    return mismatches
+
+
+def _report(missing, rows, mismatches, outliers, duplicates):
+    return {
+        "Missing Values (%)": (missing / rows * 100) if rows else missing.astype(float),
+        "Incorrect Data Types": mismatches,
+        "Outliers Detected": {col: count for col, count in outliers.items() if count > 0},
+        "Duplicate Records": duplicates,
+    }
+
+
+def frame_quality_report(df, expected_types=None, exclude_outliers=("customerid",)):
+    """
+    Exact report for an in-memory frame: one null scan, one batched quantile call and
+    one vectorised bounds check over all numeric columns, and one row-hash pass for duplicates.
+    """
+    missing = df.isnull().sum()
+    mismatches = _dtype_mismatches({col: {str(dtype)} for col, dtype in df.dtypes.items()}, expected_types)
+
+    numeric = df.select_dtypes(include=["number"]).drop(columns=list(exclude_outliers), errors="ignore")
+    outliers = {}
+    if len(numeric.columns):
+        quartiles = numeric.quantile([0.25, 0.75])
+        low, high = _outlier_bounds(quartiles.loc[0.25], quartiles.loc[0.75])
+        outliers = ((numeric < low) | (numeric > high)).sum().to_dict()
+
+    duplicates = int(pd.util.hash_pandas_object(df, index=False).duplicated().sum())
+    return _report(missing, len(df), mismatches, outliers, duplicates)
+
+
+class DataQualityAccumulator:
+    """
+    Streaming counterpart of frame_quality_report: update() with each chunk, merge()
+    accumulators built in parallel, then report(). Memory is bounded by the sketches,
+    not the data, so quartiles/outliers and duplicates are estimates.
+    """
+
+    def __init__(self, expected_types=None, exclude_outliers=("customerid",), k=200, hll_precision=14):
+        self.expected_types = expected_types
+        self.exclude_outliers = set(exclude_outliers)
+        self.k = k
+        self.rows = 0
+        self.missing = pd.Series(dtype="int64")
+        self.observed_types = {}
+        self.sketches = {}
+        self.distinct = HyperLogLog(hll_precision)
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        self.missing = self.missing.add(chunk.isnull().sum(), fill_value=0).astype("int64")
+        for col, dtype in chunk.dtypes.items():
+            self.observed_types.setdefault(col, set()).add(str(dtype))
+
+        numeric = chunk.select_dtypes(include=["number"])
+        for col in numeric.columns:
+            if col not in self.exclude_outliers:
+                self.sketches.setdefault(col, KLLSketch(self.k, seed=len(self.sketches))).update(numeric[col].to_numpy())
+
+        self.distinct.update_hashes(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.missing = self.missing.add(other.missing, fill_value=0).astype("int64")
+        for col, dtypes in other.observed_types.items():
+            self.observed_types.setdefault(col, set()).update(dtypes)
+        for col, sketch in other.sketches.items():
+            if col in self.sketches:
+                self.sketches[col].merge(sketch)
+            else:
+                self.sketches[col] = sketch
+        self.distinct.merge(other.distinct)
+        return self
+
+    def report(self):
+        outliers = {}
+        for col, sketch in self.sketches.items():
+            q1, q3 = sketch.quantiles([0.25, 0.75])
+            outliers[col] = sketch.count_outside(*_outlier_bounds(q1, q3))
+        duplicates = max(self.rows - self.distinct.count(), 0)
+        missing = self.missing.reindex(list(self.observed_types), fill_value=0)
+        return _report(missing, self.rows, _dtype_mismatches(self.observed_types, self.expected_types),
+                       outliers, duplicates)
@@ -0,0 +1,207 @@
+import os
+import json
+import html
+import time
+import atexit
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from src.logger import logging
+
+
+@dataclass
+class ReportRendererConfig:
+    output_dir: str = 'artifacts'
+    formats: tuple = ("pdf", "html")
+    timings_path: str = os.path.join('artifacts', "report_render_times.jsonl")
+    # "thread" keeps rendering in-process; "process" moves it off the GIL entirely
+    executor: str = "thread"
+
+
+def to_serialisable(value):
+    """Report values (Series, numpy scalars, nested dicts) -> plain JSON types."""
+    if isinstance(value, pd.Series):
+        value = value.to_dict()
+    if isinstance(value, dict):
+        return {str(key): to_serialisable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_serialisable(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def write_report_json(report, path):
+    """Writes the structured report atomically; this is the validation stage's only blocking output."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(to_serialisable(report), f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def render_pdf(report, file_name):
+    doc = SimpleDocTemplate(file_name, pagesize=A4)
+    elements = []
+    styles = getSampleStyleSheet()
+
+    # Title
+    elements.append(Paragraph("Data Quality Report", styles['Title']))
+
+    # Add report details
+    for section, data in report.items():
+        elements.append(Paragraph(f"<b>{section}</b>", styles['Heading2']))
+
+        # Handle dictionary data (e.g., Incorrect Data Types or Outliers)
+        if isinstance(data, dict):
+            table_data = [["Column", "Details"]] + list(data.items())
+        else:
+            table_data = [[section, data]]
+
+        # Table Formatting
+        table = Table(table_data)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige)
+        ]))
+        elements.append(table)
+
+    # Build PDF
+    doc.build(elements)
+    return file_name
+
+
+def render_html(report, file_name):
+    parts = ["<!DOCTYPE html><html><head><meta charset='utf-8'><title>Data Quality Report</title></head><body>",
+             "<h1>Data Quality Report</h1>"]
+    for section, data in report.items():
+        parts.append(f"<h2>{html.escape(str(section))}</h2><table border='1'>")
+        rows = data.items() if isinstance(data, dict) else [(section, data)]
+        if isinstance(data, dict):
+            parts.append("<tr><th>Column</th><th>Details</th></tr>")
+        parts.extend(f"<tr><td>{html.escape(str(key))}</td><td>{html.escape(str(value))}</td></tr>"
+                     for key, value in rows)
+        parts.append("</table>")
+    parts.append("</body></html>")
+    with open(file_name, "w") as f:
+        f.write("".join(parts))
+    return file_name
+
+
+_RENDERERS = {"pdf": render_pdf, "html": render_html}
+
+
+def render_report(json_path, formats, output_dir, timings_path):
+    """
+    Renders a JSON report to each format and appends one timing record per format.
+    Module-level so it can run in a worker process.
+
+    :return: dict of format -> output path
+    """
+    with open(json_path) as f:
+        report = json.load(f)
+    stem = os.path.splitext(os.path.basename(json_path))[0]
+    os.makedirs(output_dir, exist_ok=True)
+
+    outputs, timings = {}, []
+    for fmt in formats:
+        path = os.path.join(output_dir, f"{stem}.{fmt}")
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            outputs[fmt] = _RENDERERS[fmt](report, path)
+        except Exception as e:
+            status = f"error: {e}"
+        timings.append({"timestamp": datetime.now(timezone.utc).isoformat(), "report": json_path,
+                        "format": fmt, "path": path, "seconds": round(time.perf_counter() - start, 4),
+                        "status": status})
+
+    os.makedirs(os.path.dirname(timings_path) or ".", exist_ok=True)
+    with open(timings_path, "a") as f:
+        f.writelines(json.dumps(timing) + "\n" for timing in timings)
+    failed = [t for t in timings if t["status"] != "ok"]
+    if failed:
+        raise RuntimeError(f"Rendering failed for {json_path}: {failed}")
+    return outputs
+
+
+class ReportRenderer:
+    """
+    Background worker that turns structured JSON reports into PDF/HTML.
+
+    submit() returns immediately with a Future, so validation and the stages after it
+    never wait on ReportLab. Renders run one at a time on a single worker.
+    """
+
+    def __init__(self, config: ReportRendererConfig = None):
+        self.config = config or ReportRendererConfig()
+        if self.config.executor not in ("thread", "process"):
+            raise ValueError(f"Unsupported executor: {self.config.executor}")
+        self._executor = None
+        self._futures = []
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            pool_class = ThreadPoolExecutor if self.config.executor == "thread" else ProcessPoolExecutor
+            self._executor = pool_class(max_workers=1)
+        return self._executor
+
+    def _on_done(self, json_path):
+        def callback(future):
+            if future.exception() is not None:
+                logging.error(f"Report rendering failed for {json_path}: {future.exception()}")
+            else:
+                logging.info(f"Rendered {json_path} to {future.result()}")
+        return callback
+
+    def submit(self, json_path, formats=None):
+        """:return: Future resolving to a dict of format -> output path"""
+        with self._lock:
+            future = self._pool().submit(render_report, json_path, tuple(formats or self.config.formats),
+                                         self.config.output_dir, self.config.timings_path)
+            future.add_done_callback(self._on_done(json_path))
+            self._futures.append(future)
+        return future
+
+    def wait(self, timeout=None):
+        """Blocks until every submitted render has finished (e.g. before the process exits)."""
+        with self._lock:
+            futures, self._futures = self._futures, []
+        for future in futures:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass  # already logged by the done callback
+
+    def close(self):
+        self.wait()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+_default_renderer = None
+_default_renderer_lock = threading.Lock()
+
+
+def get_report_renderer():
+    """Process-wide renderer, drained at interpreter exit so no report is lost."""
+    global _default_renderer
+    with _default_renderer_lock:
+        if _default_renderer is None:
+            _default_renderer = ReportRenderer()
+            atexit.register(_default_renderer.close)
+    return _default_renderer
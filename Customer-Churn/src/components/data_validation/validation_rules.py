@@ -0,0 +1,235 @@
+import sys
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_string_dtype, is_bool_dtype
+from src.logger import logging
+from src.exception import CustomException
+
+
+# Declarative rule spec, one entry per column; plain data so it can also come from JSON/YAML.
+#   type: "integer" (integral values, any numeric dtype), "number" or "string"
+#   min/max: inclusive numeric range; allowed: permitted values; unique: no repeats across the load
+#   max_null_fraction: null budget over the whole load (a zero budget fails on the first null);
+#   required: a missing column is a violation
+#   severity: "blocking" violations reject the load, "warning" ones are only reported
+VALIDATION_RULES = [
+    {"column": "customerid", "type": "integer", "min": 0, "unique": True, "max_null_fraction": 0.0},
+    {"column": "age", "type": "integer", "min": 18, "max": 100, "max_null_fraction": 0.01},
+    {"column": "gender", "type": "string", "allowed": ["Male", "Female"], "max_null_fraction": 0.01},
+    {"column": "tenure", "type": "integer", "min": 0, "max_null_fraction": 0.01},
+    {"column": "usage frequency", "type": "integer", "min": 0, "max_null_fraction": 0.01},
+    {"column": "support calls", "type": "integer", "min": 0, "max_null_fraction": 0.01},
+    {"column": "payment delay", "type": "integer", "min": 0, "max_null_fraction": 0.01},
+    {"column": "subscription type", "type": "string", "allowed": ["Basic", "Standard", "Premium"],
+     "max_null_fraction": 0.01},
+    {"column": "contract length", "type": "string", "allowed": ["Monthly", "Quarterly", "Annual"],
+     "max_null_fraction": 0.01},
+    {"column": "total spend", "type": "number", "min": 0, "max_null_fraction": 0.01},
+    {"column": "last interaction", "type": "integer", "min": 0, "max_null_fraction": 0.01},
+    {"column": "churn", "type": "integer", "allowed": [0, 1], "max_null_fraction": 0.0},
+]
+
+
+@dataclass
+class ValidationResult:
+    rows_checked: int = 0
+    chunks_checked: int = 0
+    stopped_early: bool = False
+    # (column, check) -> {"column", "check", "violations", "blocking", "detail"}
+    violations: dict = field(default_factory=dict)
+
+    @property
+    def blocking(self):
+        return [v for v in self.violations.values() if v["blocking"]]
+
+    @property
+    def passed(self):
+        return not self.blocking
+
+    def to_frame(self):
+        return pd.DataFrame(list(self.violations.values()),
+                            columns=["column", "check", "violations", "blocking", "detail"])
+
+    def incorrect_types(self):
+        """:return: column -> observed dtype, for columns failing their type rule"""
+        return {v["column"]: v["detail"] for v in self.violations.values() if v["check"] == "type"}
+
+    def raise_for_blocking(self):
+        if not self.passed:
+            summary = "; ".join(f"{v['column']} {v['check']}: {v['detail']}" for v in self.blocking)
+            raise ValueError(f"Blocking validation failures after {self.rows_checked} rows: {summary}")
+
+
+class _State:
+    """Running totals a compiled check needs across chunks."""
+
+    def __init__(self):
+        self.rows = 0
+        self.nulls = {}
+        self.seen = {}
+
+
+def _type_check(column, expected):
+    def check(series, state):
+        if expected == "string":
+            dtype = series.dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                dtype = dtype.categories.dtype
+            ok = is_string_dtype(dtype) and not is_numeric_dtype(dtype)
+            return (0 if ok else int(series.notna().sum())), str(series.dtype)
+        if not is_numeric_dtype(series.dtype) or is_bool_dtype(series.dtype):
+            return int(series.notna().sum()), str(series.dtype)
+        if expected == "integer" and series.dtype.kind == "f":
+            values = series.to_numpy()
+            return int(np.count_nonzero(np.mod(values[~np.isnan(values)], 1))), f"{series.dtype} with fractions"
+        return 0, str(series.dtype)
+    return check
+
+
+def _range_check(column, minimum, maximum):
+    def check(series, state):
+        if not is_numeric_dtype(series.dtype):
+            return 0, "not numeric"  # reported by the type check
+        bad = np.zeros(len(series), dtype=bool)
+        if minimum is not None:
+            bad |= (series < minimum).to_numpy()
+        if maximum is not None:
+            bad |= (series > maximum).to_numpy()
+        return int(bad.sum()), f"outside [{minimum}, {maximum}]"
+    return check
+
+
+def _allowed_check(column, allowed):
+    allowed = pd.Index(allowed)
+
+    def check(series, state):
+        bad = series.notna() & ~series.isin(allowed)
+        return int(bad.sum()), f"values outside {list(allowed)}: {series[bad].unique()[:5].tolist()}"
+    return check
+
+
+def _unique_check(column):
+    # Exact: the hashes seen so far are one sorted uint64 array (8 bytes per distinct value) that
+    # each chunk is merged into in O(seen + chunk). A HyperLogLog would bound memory, but could
+    # only estimate how many values repeat, not flag them.
+    def check(series, state):
+        hashes = pd.util.hash_pandas_object(series.dropna(), index=False).to_numpy()
+        seen = state.seen.get(column, np.empty(0, dtype=np.uint64))
+        values, counts = np.unique(hashes, return_counts=True)
+        positions = np.searchsorted(seen, values)
+        known = positions < len(seen)
+        known[known] = seen[positions[known]] == values[known]
+        # All but the first occurrence within the chunk repeat, and the first too if seen before
+        repeated = int((counts - 1).sum() + known.sum())
+        state.seen[column] = np.insert(seen, positions[~known], values[~known])
+        return repeated, "duplicate values"
+    return check
+
+
+def _null_budget_check(column, budget):
+    # Only counts per chunk: a fraction of a prefix says nothing about the whole load, so the
+    # budget is judged once the stream ends (RuleValidator._check_budgets). A zero budget is
+    # the exception, since its first null already breaks it.
+    def check(series, state):
+        nulls = int(series.isna().sum())
+        state.nulls[column] = state.nulls.get(column, 0) + nulls
+        return (nulls if budget == 0 else 0), "null in a column with no null budget"
+    return check
+
+
+class RuleValidator:
+    """
+    Compiles a declarative rule spec into vectorised per-column checks and runs them in
+    one pass over a frame, or chunk by chunk over a stream with optional fail-fast.
+    """
+
+    def __init__(self, rules=None):
+        self.rules = VALIDATION_RULES if rules is None else rules
+        self.checks = self._compile(self.rules)
+        self.budgets = [(rule["column"], rule.get("severity", "blocking") == "blocking", rule["max_null_fraction"])
+                        for rule in self.rules if rule.get("max_null_fraction") is not None]
+
+    @staticmethod
+    def _compile(rules):
+        checks = []
+        for rule in rules:
+            column = rule["column"]
+            blocking = rule.get("severity", "blocking") == "blocking"
+            compiled = []
+            if "type" in rule:
+                compiled.append(("type", _type_check(column, rule["type"])))
+            if rule.get("min") is not None or rule.get("max") is not None:
+                compiled.append(("range", _range_check(column, rule.get("min"), rule.get("max"))))
+            if rule.get("allowed") is not None:
+                compiled.append(("allowed", _allowed_check(column, rule["allowed"])))
+            if rule.get("unique"):
+                compiled.append(("unique", _unique_check(column)))
+            if rule.get("max_null_fraction") is not None:
+                compiled.append(("nulls", _null_budget_check(column, rule["max_null_fraction"])))
+            checks.append((column, rule.get("required", True), blocking, compiled))
+        return checks
+
+    def _check_chunk(self, chunk, state, result):
+        state.rows += len(chunk)
+        result.rows_checked = state.rows
+        result.chunks_checked += 1
+        for column, required, blocking, compiled in self.checks:
+            if column not in chunk.columns:
+                if required:
+                    previous = result.violations.get((column, "missing"), {}).get("violations", 0)
+                    result.violations[(column, "missing")] = {
+                        "column": column, "check": "missing", "violations": previous + len(chunk),
+                        "blocking": blocking, "detail": "column not present"}
+                continue
+            series = chunk[column]
+            for name, check in compiled:
+                count, detail = check(series, state)
+                key = (column, name)
+                if count:
+                    previous = result.violations.get(key, {}).get("violations", 0)
+                    result.violations[key] = {"column": column, "check": name, "violations": previous + count,
+                                              "blocking": blocking, "detail": detail}
+
+    def _check_budgets(self, state, result):
+        """Judges the null budgets on the whole load's totals; replaces any mid-stream finding."""
+        for column, blocking, budget in self.budgets:
+            result.violations.pop((column, "nulls"), None)
+            nulls = state.nulls.get(column)
+            if nulls is None:
+                continue  # column absent, reported as missing
+            fraction = nulls / state.rows if state.rows else 0.0
+            if fraction > budget:
+                result.violations[(column, "nulls")] = {
+                    "column": column, "check": "nulls", "violations": nulls, "blocking": blocking,
+                    "detail": f"{fraction:.2%} null (budget {budget:.2%})"}
+
+    def validate(self, df):
+        """:return: ValidationResult for an in-memory frame"""
+        return self.validate_stream([df], fail_fast=False)
+
+    def validate_stream(self, chunks, fail_fast=True):
+        """
+        :param chunks: iterable of DataFrames
+        :param fail_fast: stop reading as soon as a blocking rule is violated
+        :return: ValidationResult; stopped_early is set if the stream was abandoned
+        """
+        try:
+            state, result = _State(), ValidationResult()
+            iterator = iter(chunks)
+            for chunk in iterator:
+                self._check_chunk(chunk, state, result)
+                if fail_fast and not result.passed:
+                    result.stopped_early = True
+                    if hasattr(iterator, "close"):
+                        iterator.close()  # release the underlying reader/cursor
+                    logging.warning(f"Validation stopped after {result.rows_checked} rows: "
+                                    f"{len(result.blocking)} blocking violations")
+                    break
+            else:
+                self._check_budgets(state, result)
+            return result
+
+        except Exception as e:
+            logging.error(f"Error running validation rules: {e}")
+            raise CustomException(e, sys)
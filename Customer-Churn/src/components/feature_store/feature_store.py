@@ -1,23 +1,22 @@
+import sys
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
 import snowflake.connector
-import pandas as pd
 from prefect import flow
-import logging
+from src.caching import TTLCache, entity_key
+from src.logger import logging
+from src.exception import CustomException
 
-logging.basicConfig(
-    filename="prep.log",
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filemode='w'
-)
+log = logging.getLogger(__name__)
 
-log = logging.getLogger()
-log.setLevel(logging.INFO)  # Set the logging level to INFO
 
+class SnowflakeBackend:
+    placeholder = "%s"
 
-
-
-def get_customer_features(customer_id):
-    """Fetch features for a given customer from Snowflake."""
-    conn = snowflake.connector.connect(
+    def connect(self):
+        return snowflake.connector.connect(
                 user='SHAHHUSSAIN',
                 password='Shahid22Sherin',
                 account='TIQIOCR-KY36542',
@@ -26,15 +25,180 @@ def get_customer_features(customer_id):
                 session_parameters={
                     'QUERY_TAG': 'EndOfMonthFinancials',
                 })
-    query = f"SELECT * FROM CUSTOMERCHURNTRANSFORMED WHERE CustomerID = '{customer_id}';"
-    
-    df = pd.read_sql(query, conn)
-    conn.close()
-    
-    return df.to_dict(orient='records')
+
+
+class SQLiteBackend:
+    """Local file stand-in for Snowflake (tests, offline development)."""
+    placeholder = "?"
+
+    def __init__(self, path):
+        self.path = path
+
+    def connect(self):
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+
+class DuckDBBackend:
+    placeholder = "?"
+
+    def __init__(self, path):
+        self.path = path
+
+    def connect(self):
+        import duckdb
+        return duckdb.connect(self.path, read_only=True)
+
+
+class ConnectionPool:
+    """Keeps up to max_size open connections and hands them out one caller at a time."""
+
+    def __init__(self, backend, max_size=4):
+        self.backend = backend
+        self.max_size = max_size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @property
+    def connections_created(self):
+        return self._created
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.max_size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    conn = self.backend.connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                conn = self._idle.get()
+
+        try:
+            yield conn
+        except Exception:
+            # The connection may be broken; drop it and let the next caller open a fresh one
+            with self._lock:
+                self._created -= 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+            raise
+        else:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+
+
+class FeatureStoreClient:
+    """
+    Reads customer features with pooled connections, one query per batch of ids,
+    and an in-process TTL/LRU cache in front of the backend.
+    """
+
+    def __init__(self, backend=None, table="CUSTOMERCHURNTRANSFORMED", key_column="CustomerID",
+                 pool_size=4, batch_size=500, cache_size=10_000, ttl_seconds=300):
+        self.backend = backend or SnowflakeBackend()
+        self.table = table
+        self.key_column = key_column
+        self.batch_size = batch_size
+        self.pool = ConnectionPool(self.backend, max_size=pool_size)
+        self.cache = TTLCache(maxsize=cache_size, ttl_seconds=ttl_seconds)
+        self.queries = 0
+
+    def _query(self, customer_ids):
+        placeholders = ", ".join([self.backend.placeholder] * len(customer_ids))
+        query = f"SELECT * FROM {self.table} WHERE {self.key_column} IN ({placeholders})"
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, list(customer_ids))
+                columns = [column[0] for column in cursor.description]
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        self.queries += 1
+
+        key_index = [c.lower() for c in columns].index(self.key_column.lower())
+        records = {}
+        for row in rows:
+            records.setdefault(entity_key(row[key_index]), []).append(dict(zip(columns, row)))
+        return records
+
+    def get_features(self, customer_ids):
+        """
+        :param customer_ids: iterable of customer ids
+        :return: dict of customer id -> list of feature records (empty if unknown)
+        """
+        try:
+            results, missing = {}, []
+            for customer_id in dict.fromkeys(customer_ids):
+                hit, records = self.cache.get(entity_key(customer_id))
+                if hit:
+                    results[customer_id] = records
+                else:
+                    missing.append(customer_id)
+
+            for start in range(0, len(missing), self.batch_size):
+                batch = missing[start:start + self.batch_size]
+                fetched = self._query(batch)
+                for customer_id in batch:
+                    records = fetched.get(entity_key(customer_id), [])
+                    self.cache.put(entity_key(customer_id), records)
+                    results[customer_id] = records
+            return results
+
+        except Exception as e:
+            log.error(f"Error fetching features for {len(missing)} customers: {e}")
+            raise CustomException(e, sys)
+
+    def get_customer_features(self, customer_id):
+        return self.get_features([customer_id])[customer_id]
+
+    def metrics(self):
+        return {
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "cache_hit_rate": round(self.cache.hit_rate, 4),
+            "queries": self.queries,
+            "connections_created": self.pool.connections_created,
+        }
+
+    def close(self):
+        self.pool.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_customer_features(customer_id):
+    """Fetch features for a given customer from Snowflake."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = FeatureStoreClient()
+    return _default_client.get_customer_features(customer_id)
 
 # Example Usage
 if __name__ == "__main__":
     customer_features = get_customer_features("1")
     log.info(customer_features)
+    log.info(_default_client.metrics())
     print(customer_features)
@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from dataclasses import dataclass
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from src.caching import TTLCache, entity_key
+from src.logger import logging
+from src.exception import CustomException
+
+
+@dataclass
+class MaterializedStoreConfig:
+    offline_path: str = os.path.join('artifacts', "feature_store", "offline")
+    online_path: str = os.path.join('artifacts', "feature_store", "online.db")
+    entity_column: str = "customerid"
+    timestamp_column: str = "feature_timestamp"
+    # Small in-process cache in front of the online file; 0 disables it
+    cache_size: int = 10_000
+    ttl_seconds: float = 60
+
+
+class OfflineFeatureStore:
+    """Append-only Parquet history of every materialized snapshot, partitioned by day."""
+
+    PARTITIONING = pa.schema([pa.field("snapshot_date", pa.string())])
+
+    def __init__(self, config: MaterializedStoreConfig):
+        self.config = config
+
+    def _dataset_schema(self, files):
+        """
+        Union of every snapshot's columns, so one file cannot fix the schema for the rest:
+        columns added later are kept (null in older snapshots) and int/float or all-null
+        columns widen to the type that holds every snapshot. Only Parquet footers are read.
+        """
+        schemas = [pq.read_schema(path).remove_metadata() for path in files]
+        return pa.unify_schemas([*schemas, self.PARTITIONING], promote_options="permissive")
+
+    def append(self, df: pd.DataFrame):
+        day = df[self.config.timestamp_column].iloc[0].strftime('%Y-%m-%d')
+        partition_dir = os.path.join(self.config.offline_path, f"snapshot_date={day}")
+        os.makedirs(partition_dir, exist_ok=True)
+        stamp = df[self.config.timestamp_column].iloc[0].strftime('%Y%m%dT%H%M%S%f')
+        path = os.path.join(partition_dir, f"part-{stamp}.parquet")
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path, compression="zstd")
+        return path
+
+    def read(self, columns=None, until=None):
+        """Snapshots taken at or before `until`, limited to `columns` (plus entity and timestamp)."""
+        if not os.path.exists(self.config.offline_path):
+            return pd.DataFrame(columns=[self.config.entity_column, self.config.timestamp_column])
+        files = ds.dataset(self.config.offline_path, format="parquet").files
+        dataset = ds.dataset(files, format="parquet", schema=self._dataset_schema(files),
+                             partitioning=ds.partitioning(self.PARTITIONING, flavor="hive"),
+                             partition_base_dir=self.config.offline_path)
+        if columns is not None:
+            columns = list(dict.fromkeys([self.config.entity_column, self.config.timestamp_column, *columns]))
+        expression = None
+        if until is not None:
+            expression = ds.field(self.config.timestamp_column) <= pa.scalar(until, pa.timestamp("us", tz="UTC"))
+        return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+class OnlineFeatureStore:
+    """
+    Latest features per customer in a local SQLite key-value file.
+
+    Reads are primary-key lookups on a long-lived connection (plus an optional
+    in-process cache), which keeps a single lookup well under a millisecond.
+    """
+
+    def __init__(self, config: MaterializedStoreConfig):
+        self.config = config
+        os.makedirs(os.path.dirname(config.online_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(config.online_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS online_features (
+                entity_key        TEXT PRIMARY KEY,
+                feature_timestamp TEXT NOT NULL,
+                payload           TEXT NOT NULL
+            ) WITHOUT ROWID""")
+            self._conn.commit()
+        self.cache = TTLCache(maxsize=config.cache_size, ttl_seconds=config.ttl_seconds) \
+            if config.cache_size else None
+
+    def upsert(self, df: pd.DataFrame):
+        """Writes one row per customer; an older snapshot never overwrites a newer one."""
+        timestamps = df[self.config.timestamp_column].map(lambda ts: ts.isoformat())
+        records = df.drop(columns=[self.config.timestamp_column]).to_dict(orient="records")
+        rows = [(entity_key(record[self.config.entity_column]), timestamp, json.dumps(record, default=str))
+                for record, timestamp in zip(records, timestamps)]
+        with self._lock:
+            self._conn.executemany("""
+                INSERT INTO online_features (entity_key, feature_timestamp, payload) VALUES (?, ?, ?)
+                ON CONFLICT(entity_key) DO UPDATE SET
+                    feature_timestamp = excluded.feature_timestamp,
+                    payload = excluded.payload
+                WHERE excluded.feature_timestamp >= online_features.feature_timestamp
+            """, rows)
+            self._conn.commit()
+        if self.cache is not None:
+            self.cache = TTLCache(maxsize=self.config.cache_size, ttl_seconds=self.config.ttl_seconds)
+        return len(rows)
+
+    def get(self, customer_id):
+        """:return: latest feature dict for customer_id, or None"""
+        key = entity_key(customer_id)
+        if self.cache is not None:
+            hit, value = self.cache.get(key)
+            if hit:
+                return value
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM online_features WHERE entity_key = ?", (key,)).fetchone()
+        value = json.loads(row[0]) if row else None
+        if self.cache is not None:
+            self.cache.put(key, value)
+        return value
+
+    def get_many(self, customer_ids):
+        """:return: dict of customer id -> feature dict (None if unknown), one query for all misses"""
+        results, missing = {}, []
+        for customer_id in dict.fromkeys(customer_ids):
+            hit, value = self.cache.get(entity_key(customer_id)) if self.cache is not None else (False, None)
+            if hit:
+                results[customer_id] = value
+            else:
+                missing.append(customer_id)
+
+        # SQLite caps bound parameters per statement, so look up misses in slices
+        for start in range(0, len(missing), 900):
+            batch = missing[start:start + 900]
+            keys = [entity_key(customer_id) for customer_id in batch]
+            with self._lock:
+                rows = dict(self._conn.execute(
+                    f"SELECT entity_key, payload FROM online_features WHERE entity_key IN ({', '.join('?' * len(keys))})",
+                    keys).fetchall())
+            for customer_id, key in zip(batch, keys):
+                value = json.loads(rows[key]) if key in rows else None
+                if self.cache is not None:
+                    self.cache.put(key, value)
+                results[customer_id] = value
+        return results
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class MaterializedFeatureStore:
+    """
+    Two-tier feature store fed by DataTransformation.transformedData.
+
+    materialize() appends a timestamped snapshot to the offline Parquet history and
+    pushes the latest row per customer into the online store. Serving reads the
+    online tier; training joins read the offline tier as of each event's timestamp.
+    """
+
+    def __init__(self, config: MaterializedStoreConfig = None):
+        self.config = config or MaterializedStoreConfig()
+        self.offline = OfflineFeatureStore(self.config)
+        self.online = OnlineFeatureStore(self.config)
+
+    def materialize(self, df: pd.DataFrame, timestamp=None):
+        """
+        :param df: transformed features, one row per customer
+        :param timestamp: as-of time of the snapshot, defaults to now (UTC)
+        :return: dict with rows written and the offline partition file
+        """
+        try:
+            timestamp = pd.Timestamp(timestamp or datetime.now(timezone.utc))
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.tz_localize("UTC")
+            snapshot = df.copy()
+            snapshot.columns = snapshot.columns.str.strip().str.lower()
+            snapshot = snapshot.drop_duplicates(self.config.entity_column, keep="last")
+            snapshot[self.config.timestamp_column] = timestamp
+
+            path = self.offline.append(snapshot)
+            rows = self.online.upsert(snapshot)
+            logging.info(f"Materialized {rows} customers as of {timestamp.isoformat()} (offline: {path})")
+            return {"rows": rows, "offline_path": path, "feature_timestamp": timestamp.isoformat()}
+
+        except Exception as e:
+            logging.error(f"Error materializing features: {e}")
+            raise CustomException(e, sys)
+
+    def get_online_features(self, customer_ids):
+        return self.online.get_many(customer_ids)
+
+    def close(self):
+        self.online.close()
+
+    def get_historical_features(self, entity_df: pd.DataFrame, features=None, event_timestamp_column="event_timestamp"):
+        """
+        Point-in-time join: each (customer, event time) row gets the latest snapshot taken
+        at or before that time, so training never sees features from the future.
+
+        :param entity_df: frame with the entity column and event_timestamp_column
+        :param features: feature columns to return, defaults to all
+        """
+        try:
+            entity_column, timestamp_column = self.config.entity_column, self.config.timestamp_column
+            events = entity_df.copy()
+            events[event_timestamp_column] = pd.to_datetime(events[event_timestamp_column], utc=True)
+
+            history = self.offline.read(columns=features, until=events[event_timestamp_column].max())
+            history = history.drop(columns=["snapshot_date"], errors="ignore")
+            history[timestamp_column] = pd.to_datetime(history[timestamp_column], utc=True)
+            history[entity_column] = history[entity_column].map(entity_key)
+
+            events["_entity_key"] = events[entity_column].map(entity_key)
+            events["_row"] = range(len(events))
+            joined = pd.merge_asof(
+                events.sort_values(event_timestamp_column),
+                history.rename(columns={entity_column: "_entity_key"}).sort_values(timestamp_column),
+                left_on=event_timestamp_column, right_on=timestamp_column,
+                by="_entity_key", direction="backward",
+            )
+            return joined.sort_values("_row").drop(columns=["_entity_key", "_row"]).reset_index(drop=True)
+
+        except Exception as e:
+            logging.error(f"Error building point-in-time training set: {e}")
+            raise CustomException(e, sys)
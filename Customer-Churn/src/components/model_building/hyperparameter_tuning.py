@@ -0,0 +1,172 @@
+import sys
+import math
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy.stats import loguniform, randint, uniform
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterSampler, StratifiedKFold, train_test_split
+from xgboost import XGBClassifier
+from src.logger import logging
+from src.exception import CustomException
+
+
+def default_search_spaces():
+    return {
+        "Logistic Regression": (LogisticRegression(max_iter=1000), {
+            "C": loguniform(1e-3, 1e2),
+        }),
+        "Random Forest": (RandomForestClassifier(random_state=42), {
+            "n_estimators": randint(100, 500),
+            "max_depth": [None, 6, 10, 16],
+            "min_samples_leaf": randint(1, 10),
+            "max_features": ["sqrt", "log2", 0.5],
+        }),
+        "XGBoost": (XGBClassifier(eval_metric='logloss', n_estimators=1000), {
+            "learning_rate": loguniform(0.01, 0.3),
+            "max_depth": randint(3, 10),
+            "subsample": uniform(0.6, 0.4),
+            "colsample_bytree": uniform(0.6, 0.4),
+            "min_child_weight": randint(1, 10),
+        }),
+    }
+
+
+@dataclass
+class HyperparameterTuningConfig:
+    # Any sklearn scorer name, e.g. "f1", "accuracy", "roc_auc"
+    scoring: str = "f1"
+    n_splits: int = 5
+    # Sampled configurations per model family in the first rung
+    n_candidates: int = 9
+    # Keep the best 1/eta candidates per rung and grow each survivor's training budget by eta
+    eta: int = 3
+    # Fraction of each fold's training rows given to the first rung
+    min_resource: float = 0.1
+    # XGBoost stops adding trees once a held-out slice of the fold's training rows stops improving
+    early_stopping_rounds: int = 30
+    early_stopping_fraction: float = 0.1
+    n_jobs: int = -1
+    random_state: int = 42
+    search_spaces: dict = field(default_factory=default_search_spaces)
+
+
+@dataclass
+class TuningResult:
+    best_name: str
+    best_params: dict
+    best_score: float
+    best_estimator: object
+    history: pd.DataFrame
+
+
+def _fit_and_score(estimator, X, y, train_idx, val_idx, resource, config, seed):
+    """Fits one candidate on a `resource` fraction of a fold's training rows and scores it on the fold."""
+    rng = np.random.RandomState(seed)
+    if resource < 1.0:
+        train_idx = rng.choice(train_idx, size=max(int(len(train_idx) * resource), 2 * config.n_splits),
+                               replace=False)
+
+    estimator = clone(estimator)
+    if "n_jobs" in estimator.get_params():
+        # Parallelism comes from running folds side by side, not from inside each fit
+        estimator.set_params(n_jobs=1)
+
+    X_train, y_train = X.iloc[train_idx], y.iloc[train_idx]
+    best_iteration = None
+    if isinstance(estimator, XGBClassifier):
+        X_fit, X_stop, y_fit, y_stop = train_test_split(
+            X_train, y_train, test_size=config.early_stopping_fraction, stratify=y_train, random_state=seed)
+        estimator.set_params(early_stopping_rounds=config.early_stopping_rounds)
+        estimator.fit(X_fit, y_fit, eval_set=[(X_stop, y_stop)], verbose=False)
+        best_iteration = estimator.best_iteration
+    else:
+        estimator.fit(X_train, y_train)
+
+    score = get_scorer(config.scoring)(estimator, X.iloc[val_idx], y.iloc[val_idx])
+    return score, best_iteration
+
+
+class HyperparameterTuner:
+    """
+    Successive-halving search over several model families with stratified k-fold CV.
+
+    Every sampled configuration starts on a small slice of each fold's training rows;
+    after each rung only the best 1/eta survive and their budget grows by eta, until
+    the finalists are cross-validated on full folds. Folds and candidates of a rung run
+    in parallel, and XGBoost fits stop early instead of running a fixed tree count.
+    """
+
+    def __init__(self, config: HyperparameterTuningConfig = None):
+        self.config = config or HyperparameterTuningConfig()
+
+    def _sample_candidates(self):
+        candidates = []
+        for name, (estimator, space) in self.config.search_spaces.items():
+            sampler = ParameterSampler(space, n_iter=self.config.n_candidates, random_state=self.config.random_state)
+            for params in sampler:
+                candidates.append((name, params, clone(estimator).set_params(**params)))
+        return candidates
+
+    def _rungs(self):
+        resources = [1.0]
+        while resources[-1] / self.config.eta >= self.config.min_resource:
+            resources.append(resources[-1] / self.config.eta)
+        return resources[::-1]
+
+    def fit(self, X, y):
+        """
+        :return: TuningResult with the best estimator refitted on all of X, y
+        """
+        try:
+            X, y = pd.DataFrame(X).reset_index(drop=True), pd.Series(y).reset_index(drop=True)
+            folds = list(StratifiedKFold(n_splits=self.config.n_splits, shuffle=True,
+                                         random_state=self.config.random_state).split(X, y))
+            candidates = self._sample_candidates()
+            history = []
+
+            with Parallel(n_jobs=self.config.n_jobs) as parallel:
+                for rung, resource in enumerate(self._rungs()):
+                    outcomes = parallel(
+                        delayed(_fit_and_score)(estimator, X, y, train_idx, val_idx, resource, self.config,
+                                                self.config.random_state + fold)
+                        for _, _, estimator in candidates
+                        for fold, (train_idx, val_idx) in enumerate(folds)
+                    )
+
+                    scored = []
+                    for i, (name, params, estimator) in enumerate(candidates):
+                        fold_outcomes = outcomes[i * len(folds):(i + 1) * len(folds)]
+                        scores = [score for score, _ in fold_outcomes]
+                        iterations = [it for _, it in fold_outcomes if it is not None]
+                        if iterations:
+                            # Record the early-stopped tree count. Later rungs early-stop again from the
+                            # sampled cap, since a count found on a smaller slice undercounts, so only the
+                            # final rung's count (on full folds) reaches the refit.
+                            params = {**params, "n_estimators": int(np.median(iterations)) + 1}
+                        scored.append((float(np.mean(scores)), name, params, estimator))
+                        history.append({"rung": rung, "resource": round(resource, 4), "model": name,
+                                        "params": params, "mean_score": np.mean(scores), "std_score": np.std(scores)})
+
+                    scored.sort(key=lambda item: item[0], reverse=True)
+                    keep = max(1, math.ceil(len(scored) / self.config.eta))
+                    logging.info(f"Rung {rung} ({resource:.3f} of rows): {len(scored)} candidates, "
+                                 f"best {self.config.scoring}={scored[0][0]:.4f} ({scored[0][1]})")
+                    candidates = [(name, params, estimator) for _, name, params, estimator in scored[:keep]]
+
+            best_score, best_name, best_params, best_estimator = scored[0]
+            best_estimator = clone(best_estimator).set_params(**best_params)
+            if isinstance(best_estimator, XGBClassifier):
+                best_estimator.set_params(early_stopping_rounds=None)
+            best_estimator.fit(X, y)
+
+            logging.info(f"Best model {best_name} {best_params}: CV {self.config.scoring}={best_score:.4f}")
+            return TuningResult(best_name, best_params, best_score, best_estimator, pd.DataFrame(history))
+
+        except Exception as e:
+            logging.error(f"Error during hyperparameter tuning: {e}")
+            raise CustomException(e, sys)
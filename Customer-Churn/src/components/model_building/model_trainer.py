@@ -7,29 +7,29 @@ from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
-from src.components.datatransformation.data_transformation import DataTransformation
-from src.components.data_validation.data_preparation import DataPreparation
+from src.components.model_building.training_engine import TrainingEngine, TrainingEngineConfig, evaluate_model, score_model, measure
+from src.components.model_building.hyperparameter_tuning import HyperparameterTuner, HyperparameterTuningConfig
+from src.components.data_transformation.data_transformation import DataTransformation
+from src.components.data_preparation.data_preparation import DataPreparation
 
 import joblib
 from prefect import flow
-import logging
 
-
-logging.basicConfig(
-    filename="prep.log",
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filemode='w'
-)
-
-log = logging.getLogger()
-log.setLevel(logging.INFO)  # Set the logging level to INFO
+log = logging.getLogger(__name__)
 
 
 
 @dataclass
 class modelBuildingConfig:
     raw_data_path: str = os.path.join('artifacts', "data.csv")
+    # Candidate models are fitted concurrently; None lets TrainingEngine size the pool from the CPU count
+    max_workers: int = None
+    threads_per_model: int = None
+    # Column of the metrics table used to pick the model that gets saved
+    selection_metric: str = "F1 Score"
+    # Also run the successive-halving CV search and enter its winner as a candidate
+    tune_hyperparameters: bool = False
+    tuning_scoring: str = "f1"
 
 
 
@@ -39,15 +39,57 @@ class modelBuilding:
 
     @staticmethod
     def evaluate_model(model, X_train, X_test, y_train, y_test):
-        model.fit(X_train, y_train)
-        y_pred = model.predict(X_test)
-
-        accuracy = accuracy_score(y_test, y_pred)
-        precision = precision_score(y_test, y_pred)
-        recall = recall_score(y_test, y_pred)
-        f1 = f1_score(y_test, y_pred)
+        return evaluate_model(model, X_train, X_test, y_train, y_test)
+
+    def train(self, df):
+        """
+        Fits and evaluates the candidate models on a prepared/transformed frame.
+
+        :param df: output of DataPreparation.prepare_data (+ DataTransformation.transformedData)
+        :return: (metrics DataFrame indexed by model name with timing/memory columns,
+                  best fitted model by config.selection_metric)
+        """
+        df = df.copy()
+        df['churn'] = df['churn'].map({'True': 1, 'False': 0}).astype(int)
+        X = df.drop(['customerid', 'churn'], axis=1)
+        y = df['churn']
+
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
+
+        # Models
+        models = {
+            "Logistic Regression": LogisticRegression(),
+            "Random Forest": RandomForestClassifier(n_estimators=100, random_state=42),
+            "XGBoost": XGBClassifier(use_label_encoder=False, eval_metric='logloss')
+        }
 
-        return accuracy, precision, recall, f1
+        # Model Evaluation, candidates fitted in parallel
+        engine = TrainingEngine(TrainingEngineConfig(max_workers=self.ingestion_config.max_workers,
+                                                     threads_per_model=self.ingestion_config.threads_per_model))
+        results_df, fitted = engine.run(models, X_train, X_test, y_train, y_test)
+
+        if self.ingestion_config.tune_hyperparameters:
+            # Measured in this process, so concurrent stages' allocations can add to the memory figure
+            (name, tuned_model), usage = measure(self.tune, X_train, y_train)
+            acc, prec, rec, f1 = score_model(tuned_model, X_test, y_test)
+            results_df.loc[name, ["Accuracy", "Precision", "Recall", "F1 Score", *usage]] = [
+                round(acc, 4), round(prec, 4), round(rec, 4), round(f1, 4), *usage.values()]
+            fitted[name] = tuned_model
+
+        logging.info(results_df)
+        best_name = results_df[self.ingestion_config.selection_metric].astype(float).idxmax()
+        logging.info(f"Selected {best_name} by {self.ingestion_config.selection_metric}")
+        return results_df, fitted[best_name]
+
+    def tune(self, X_train, y_train):
+        """
+        Cross-validated successive-halving search on the training split only.
+
+        :return: (row name for the metrics table, best estimator refitted on X_train)
+        """
+        tuner = HyperparameterTuner(HyperparameterTuningConfig(scoring=self.ingestion_config.tuning_scoring))
+        result = tuner.fit(X_train, y_train)
+        return f"{result.best_name} (tuned)", result.best_estimator
 
 if __name__ == "__main__":
     # Data Preparation
@@ -59,46 +101,19 @@ if __name__ == "__main__":
     trans = trans_obj.transformedData(cleaned_data)
 
     if trans is not None:
-        log.info("Data ingestion successful! Here are the first few rows:")
-        log.info(trans.head())  # logging.info sample data
-        log.info(trans.shape)
-        log.info("Success")
+        log.info(f"Data Transformation Successful: {trans.shape[0]} rows, {trans.shape[1]} columns")
     else:
         log.info("Data ingestion failed.")
 
-    # Model Training
-    df = cleaned_data
-    df['churn'] = df['churn'].map({'True': 1, 'False': 0}).astype(int)
-    X = df.drop(['customerid', 'churn'], axis=1)  
-    y = df['churn']
-
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-
-    # Models
-    models = {
-        "Logistic Regression": LogisticRegression(),
-        "Random Forest": RandomForestClassifier(n_estimators=100, random_state=42),
-        "XGBoost": XGBClassifier(use_label_encoder=False, eval_metric='logloss')
-    }
-
-    # Model Evaluation
-    results = {}
-    for name, model in models.items():
-        acc, prec, rec, f1 = modelBuilding.evaluate_model(model, X_train, X_test, y_train, y_test)
-        results[name] = {
-            "Accuracy": round(acc, 4),
-            "Precision": round(prec, 4),
-            "Recall": round(rec, 4),
-            "F1 Score": round(f1, 4)
-        }
+    # Model Training and Evaluation
+    results_df, model = modelBuilding().train(cleaned_data)  # best model by selection_metric
 
     # Display Results
-    results_df = pd.DataFrame(results).T
-    logging.info(results_df)
     print(results_df)
 
 
 
 
-    # Save the best model
-    joblib.dump(model, "customer_churn_model.pkl")
+    # Save the best model with the fitted preprocessor so scoring only calls transform
+    joblib.dump({"model": model, "preprocessor": prep_obj.preprocessor,
+                 "last_interaction_max": trans["last interaction"].max()}, "customer_churn_model.pkl")
@@ -0,0 +1,144 @@
+import os
+import sys
+import time
+import multiprocessing
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+import pandas as pd
+from threadpoolctl import threadpool_limits
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from src.logger import logging
+from src.exception import CustomException
+from src.instrumentation import span, RSSSampler
+
+
+@dataclass
+class TrainingEngineConfig:
+    # Concurrent candidate fits; defaults to one per candidate, capped at the CPU count
+    max_workers: int = None
+    # Threads each fit may use (n_jobs and BLAS/OpenMP pools); defaults to cpu_count // max_workers
+    threads_per_model: int = None
+
+
+def evaluate_model(model, X_train, X_test, y_train, y_test):
+    model.fit(X_train, y_train)
+    return score_model(model, X_test, y_test)
+
+
+def score_model(model, X_test, y_test):
+    y_pred = model.predict(X_test)
+
+    accuracy = accuracy_score(y_test, y_pred)
+    precision = precision_score(y_test, y_pred)
+    recall = recall_score(y_test, y_pred)
+    f1 = f1_score(y_test, y_pred)
+
+    return accuracy, precision, recall, f1
+
+
+def measure(fn, *args):
+    """
+    Runs fn(*args) and measures it like a candidate fit.
+
+    :return: (result, {"Wall Time (s)", "CPU Time (s)", "Peak Memory (MB)"})
+    """
+    sampler = RSSSampler()
+    started_tracing = sampler.baseline is None and not tracemalloc.is_tracing()
+    if sampler.baseline is not None:
+        sampler.start()
+    elif started_tracing:
+        tracemalloc.start()
+    else:
+        traced_before, peak_before = tracemalloc.get_traced_memory()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        result = fn(*args)
+    finally:
+        wall_seconds, cpu_seconds = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        # RSS growth over the call where /proc is available, otherwise the traced Python/NumPy heap peak
+        if sampler.baseline is not None:
+            peak_bytes = sampler.stop()
+        elif started_tracing:
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            # Someone else is tracing: leave it running with its peak intact. The call's peak is
+            # exact if it set a new one; otherwise fall back to its net heap growth
+            traced_after, peak_after = tracemalloc.get_traced_memory()
+            peak_bytes = max((peak_after if peak_after > peak_before else traced_after) - traced_before, 0)
+
+    return result, {
+        "Wall Time (s)": round(wall_seconds, 3),
+        "CPU Time (s)": round(cpu_seconds, 3),
+        "Peak Memory (MB)": round(peak_bytes / 1024 ** 2, 2),
+    }
+
+
+def _fit_candidate(name, model, X_train, X_test, y_train, y_test, n_threads):
+    """Fits and scores one candidate inside its own worker process under a thread budget."""
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=n_threads)
+
+    def fit():
+        with span("model_fit", rows=len(X_train), model=name, threads=n_threads), \
+                threadpool_limits(limits=n_threads):
+            return evaluate_model(model, X_train, X_test, y_train, y_test)
+
+    (acc, prec, rec, f1), usage = measure(fit)
+    metrics = {
+        "Accuracy": round(acc, 4),
+        "Precision": round(prec, 4),
+        "Recall": round(rec, 4),
+        "F1 Score": round(f1, 4),
+        **usage,
+    }
+    return name, metrics, model
+
+
+class TrainingEngine:
+    """
+    Fits candidate models concurrently across a process pool.
+
+    Each worker is limited to threads_per_model threads so the candidates together
+    never ask for more cores than the machine has.
+    """
+
+    def __init__(self, config: TrainingEngineConfig = None):
+        self.config = config or TrainingEngineConfig()
+
+    def _budget(self, n_candidates):
+        cpus = os.cpu_count() or 1
+        max_workers = self.config.max_workers or min(n_candidates, cpus)
+        threads_per_model = self.config.threads_per_model or max(1, cpus // max_workers)
+        return max_workers, threads_per_model
+
+    def run(self, models, X_train, X_test, y_train, y_test):
+        """
+        :param models: dict of name -> unfitted estimator
+        :return: (metrics DataFrame indexed by model name, dict of name -> fitted estimator)
+        """
+        try:
+            max_workers, threads_per_model = self._budget(len(models))
+            logging.info(f"Training {len(models)} candidates on {max_workers} workers, "
+                         f"{threads_per_model} thread(s) each")
+
+            results, fitted = {}, {}
+            # Training runs on a DagRunner thread: fork would copy locks other threads hold
+            # (logging, BLAS, tracemalloc), so workers are spawned fresh
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                futures = [pool.submit(_fit_candidate, name, model, X_train, X_test, y_train, y_test,
+                                       threads_per_model)
+                           for name, model in models.items()]
+                for future in as_completed(futures):
+                    name, metrics, model = future.result()
+                    results[name], fitted[name] = metrics, model
+                    logging.info(f"{name}: {metrics}")
+
+            # Keep the candidates in the order they were given
+            results_df = pd.DataFrame({name: results[name] for name in models}).T
+            return results_df, {name: fitted[name] for name in models}
+
+        except Exception as e:
+            logging.error(f"Error in parallel model training: {e}")
+            raise CustomException(e, sys)
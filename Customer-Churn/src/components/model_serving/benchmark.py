@@ -0,0 +1,93 @@
+import os
+import time
+import threading
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from src.components.model_serving.churn_scorer import ChurnScorer, ChurnScorerConfig, MicroBatcher
+from src.logger import logging
+
+
+@dataclass
+class BenchmarkConfig:
+    qps: float = 200.0
+    duration_seconds: float = 10.0
+    warmup_requests: int = 50
+    random_state: int = 42
+
+
+class StubFeatureSource:
+    """In-memory stand-in for the feature store: customer id -> customer record."""
+
+    def __init__(self, df: pd.DataFrame, id_column="customerid"):
+        self.records = df.drop_duplicates(id_column).set_index(id_column, drop=False).to_dict("index")
+        self.customer_ids = list(self.records)
+
+    def get(self, customer_id):
+        return self.records[customer_id]
+
+
+def run_benchmark(batcher: MicroBatcher, source: StubFeatureSource, config: BenchmarkConfig = None):
+    """
+    Open-loop load test: requests are issued on a fixed schedule at config.qps whether or
+    not earlier ones have finished, and latency is measured from each request's scheduled
+    send time so queueing delay is not hidden.
+
+    :return: dict with p50/p99/mean latency (ms), achieved QPS and mean batch size
+    """
+    config = config or BenchmarkConfig()
+    rng = np.random.RandomState(config.random_state)
+
+    for customer_id in rng.choice(source.customer_ids, size=config.warmup_requests):
+        batcher.submit(source.get(customer_id)).result()
+    batcher.batch_sizes.clear()
+
+    n_requests = max(1, int(config.qps * config.duration_seconds))
+    customer_ids = rng.choice(source.customer_ids, size=n_requests)
+    latencies = np.full(n_requests, np.nan)
+    all_done = threading.Event()
+    remaining = [n_requests]
+    lock = threading.Lock()
+
+    def record(index, scheduled):
+        def callback(future):
+            latencies[index] = time.perf_counter() - scheduled
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    all_done.set()
+        return callback
+
+    start = time.perf_counter()
+    for i, customer_id in enumerate(customer_ids):
+        scheduled = start + i / config.qps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        batcher.submit(source.get(customer_id)).add_done_callback(record(i, scheduled))
+    all_done.wait()
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = latencies * 1000
+    results = {
+        "target_qps": config.qps,
+        "achieved_qps": round(n_requests / elapsed, 1),
+        "requests": n_requests,
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+        "mean_ms": round(float(latencies_ms.mean()), 3),
+        "mean_batch_size": round(float(np.mean(batcher.batch_sizes)), 2),
+    }
+    logging.info(f"Scoring benchmark: {results}")
+    return results
+
+
+if __name__ == "__main__":
+    # The model bundle carries the fitted preprocessor, so the stub serves raw customer records
+    raw = pd.read_csv(os.path.join('notebook', 'data', 'customerChurn.csv'))
+    raw.columns = raw.columns.str.strip().str.lower()
+
+    scorer = ChurnScorer(ChurnScorerConfig())
+    source = StubFeatureSource(raw.drop(columns=['churn']).dropna())
+    with MicroBatcher(scorer) as batcher:
+        print(run_benchmark(batcher, source))
@@ -0,0 +1,216 @@
+import sys
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+import joblib
+import numpy as np
+import pandas as pd
+from src.components.data_transformation.data_transformation import DataTransformation
+from src.components.data_transformation.feature_registry import FEATURES, FeaturePlan
+from src.logger import logging
+from src.exception import CustomException
+
+
+@dataclass
+class ChurnScorerConfig:
+    model_path: str = "customer_churn_model.pkl"
+    # Adaptive batching: flush at max_batch_size, and wait at most max_wait_ms for a batch to fill
+    max_batch_size: int = 256
+    max_wait_ms: float = 5.0
+
+
+class ChurnScorer:
+    """
+    Loads the churn model once and scores customers with the training feature pipeline.
+
+    The pickle may be a bare estimator or a bundle dict with "model" and, optionally,
+    "preprocessor" (anything with transform(df), applied like prepare_data) and
+    "last_interaction_max" (the training reference for Recency Score).
+
+    With a ChurnPreprocessor and a model that records its feature names, features()
+    takes a compiled path: records go straight into NumPy arrays, are imputed, encoded
+    and scaled in one pass, and the registry's features are evaluated on those arrays.
+    """
+
+    def __init__(self, config: ChurnScorerConfig = None, preprocessor=None, last_interaction_max=None):
+        self.config = config or ChurnScorerConfig()
+        try:
+            artifact = joblib.load(self.config.model_path)
+        except Exception as e:
+            logging.error(f"Error loading model from {self.config.model_path}: {e}")
+            raise CustomException(e, sys)
+
+        bundle = artifact if isinstance(artifact, dict) else {"model": artifact}
+        self.model = bundle["model"]
+        self.preprocessor = preprocessor or bundle.get("preprocessor")
+        self.last_interaction_max = last_interaction_max if last_interaction_max is not None \
+            else bundle.get("last_interaction_max")
+        self.feature_names = list(getattr(self.model, "feature_names_in_", []))
+        self._compiled = self._compile()
+        logging.info(f"Loaded {type(self.model).__name__} from {self.config.model_path}")
+
+    @staticmethod
+    def _to_frame(customers):
+        if isinstance(customers, pd.DataFrame):
+            return customers.copy()
+        if isinstance(customers, dict):
+            customers = [customers]
+        return pd.DataFrame.from_records(customers)
+
+    def _compile(self):
+        """:return: column layout for the array path, or None when only the DataFrame path applies"""
+        if not self.feature_names or not hasattr(self.preprocessor, "transform_arrays"):
+            return None
+        num_cols, cat_cols = list(self.preprocessor.num_cols_), list(self.preprocessor.cat_cols_)
+        plan = FEATURES.plan([name for name in FEATURES.features if name in self.feature_names])
+        columns = num_cols + cat_cols + plan.requested
+        if not set(self.feature_names) <= set(columns):
+            return None
+        try:
+            sources = {column: num_cols.index(FeaturePlan.resolve(num_cols, column)) for column in plan.source_columns}
+        except KeyError:
+            return None
+        return {
+            "num_cols": num_cols,
+            "cat_cols": cat_cols,
+            "plan": plan,
+            "sources": sources,
+            "index": [columns.index(name) for name in self.feature_names],
+        }
+
+    def _arrays(self, customers):
+        """:return: (numeric, categorical, truncate) arrays of the preprocessor's input columns"""
+        num_cols, cat_cols = self._compiled["num_cols"], self._compiled["cat_cols"]
+        if isinstance(customers, pd.DataFrame):
+            lookup = {str(col).strip().lower(): col for col in customers.columns}
+            numeric = customers[[lookup[col] for col in num_cols]].to_numpy(dtype=float)
+            categorical = customers[[lookup[col] for col in cat_cols]].to_numpy(dtype=object)
+            truncate = np.array([customers[lookup[col]].dtype == np.float64 for col in num_cols], dtype=bool)
+            return numeric, categorical, truncate
+
+        if isinstance(customers, dict):
+            customers = [customers]
+        rows = [{str(key).strip().lower(): value for key, value in record.items()} for record in customers]
+        numeric = np.array([[row.get(col) for col in num_cols] for row in rows],
+                           dtype=float).reshape(len(rows), len(num_cols))
+        categorical = np.array([[row.get(col) for col in cat_cols] for row in rows],
+                               dtype=object).reshape(len(rows), len(cat_cols))
+        # Records build float64 columns, or int64 ones that truncation leaves unchanged
+        return numeric, categorical, None
+
+    def features(self, customers):
+        """Raw customer record(s) -> model input, mirroring prepare_data + transformedData."""
+        if self._compiled is not None:
+            scaled, codes = self.preprocessor.transform_arrays(*self._arrays(customers))
+            sources = {column: scaled[:, i] for column, i in self._compiled["sources"].items()}
+            features = self._compiled["plan"].compute_arrays(
+                sources, {"last_interaction_max": self.last_interaction_max})
+            matrix = np.column_stack([scaled, codes, *features.values()])[:, self._compiled["index"]]
+            return pd.DataFrame(matrix, columns=self.feature_names)
+
+        df = self._to_frame(customers)
+        df.columns = df.columns.str.strip().str.lower()
+        if self.preprocessor is not None:
+            df = self.preprocessor.transform(df)
+        df = DataTransformation.add_features(df, last_interaction_max=self.last_interaction_max)
+        if self.feature_names:
+            return df[self.feature_names]
+        return df.drop(columns=['customerid', 'churn'], errors='ignore')
+
+    def predict_proba(self, customers):
+        """
+        :param customers: one customer dict, a list of dicts, or a DataFrame
+        :return: numpy array of churn probabilities, one per customer
+        """
+        return self.model.predict_proba(self.features(customers))[:, 1]
+
+    def warmup(self, customers):
+        """Runs one throwaway prediction so lazy initialisation is not paid by the first request."""
+        self.predict_proba(customers)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-customer requests into micro-batches for ChurnScorer.
+
+    A batch is flushed when it reaches max_batch_size or max_wait_ms after its first
+    request. The wait adapts to load: while requests arrive further apart than
+    max_wait_ms there is nothing to coalesce, so each one is scored immediately.
+    """
+
+    def __init__(self, scorer: ChurnScorer, max_batch_size=None, max_wait_ms=None):
+        self.scorer = scorer
+        self.max_batch_size = max_batch_size or scorer.config.max_batch_size
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else scorer.config.max_wait_ms) / 1000
+        self._queue = queue.Queue()
+        self._interarrival = float("inf")
+        self._last_submit = None
+        self._lock = threading.Lock()
+        self._worker = None
+        self.batch_sizes = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        self._worker = threading.Thread(target=self._loop, daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def submit(self, customer) -> Future:
+        """Queues one customer dict; the Future resolves to its churn probability."""
+        now = time.perf_counter()
+        with self._lock:
+            if self._last_submit is not None:
+                gap = now - self._last_submit
+                self._interarrival = gap if self._interarrival == float("inf") else \
+                    0.8 * self._interarrival + 0.2 * gap
+            self._last_submit = now
+        future = Future()
+        self._queue.put((customer, future))
+        return future
+
+    def _collect(self, first):
+        batch = [first]
+        wait = self.max_wait if self._interarrival < self.max_wait else 0.0
+        deadline = time.perf_counter() + wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # re-queue the stop signal for the main loop
+                break
+            batch.append(item)
+        return batch
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            customers, futures = zip(*batch)
+            self.batch_sizes.append(len(batch))
+            try:
+                probabilities = self.scorer.predict_proba(list(customers))
+                for future, probability in zip(futures, probabilities):
+                    future.set_result(float(probability))
+            except Exception as e:
+                logging.error(f"Error scoring a batch of {len(batch)}: {e}")
+                for future in futures:
+                    future.set_exception(e)
+
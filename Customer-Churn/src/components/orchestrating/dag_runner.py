@@ -0,0 +1,299 @@
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Tuple
+from src.logger import logging
+from src.exception import CustomException
+from src.instrumentation import span, RSSSampler
+from src.components.orchestrating.stage_cache import StageCache, fingerprint_value
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable
+    # Names of the outputs this stage consumes; they are passed to fn positionally, in this order
+    inputs: Tuple[str, ...] = ()
+    # Names of the outputs fn produces (a tuple return value for more than one); defaults to (name,)
+    outputs: Tuple[str, ...] = ()
+    retries: int = 0
+    retry_delay_seconds: float = 0
+    # Cache key ingredients: the *Config dataclass, extra code whose source counts as the
+    # stage's version, and for stages reading external sources a fingerprint of that source
+    config: Any = None
+    version_of: Tuple[Any, ...] = ()
+    fingerprint: Optional[Callable[[], str]] = None
+    cache: bool = True
+    # Files the stage writes as a side effect; a cached result is only reused while they are unchanged
+    artifacts: Optional[Callable[[], list]] = None
+
+    def __post_init__(self):
+        if not self.outputs:
+            self.outputs = (self.name,)
+
+
+@dataclass
+class StageMetrics:
+    name: str
+    wall_seconds: float
+    # Peak RSS growth while the stage ran; includes overlapping thread-pool stages' allocations
+    peak_memory_mb: float
+    attempts: int = 1
+    status: str = "success"
+    cache: str = "off"
+
+
+def _execute_stage(stage_name, fn, args, retries, retry_delay_seconds, trace_heap=False):
+    """
+    Runs one stage with retries; module-level so process pools can pickle it.
+
+    :param trace_heap: fall back to tracemalloc where RSS is unavailable; only valid when no
+        other stage runs in this process at the same time, since the peak is process-wide
+    """
+    sampler = RSSSampler()
+    started_tracing = sampler.baseline is None and trace_heap and not tracemalloc.is_tracing()
+    if sampler.baseline is not None:
+        sampler.start()
+    elif started_tracing:
+        tracemalloc.start()
+    start = time.perf_counter()
+    peak, attempt = 0, 0
+    try:
+        with span(stage_name, kind="stage") as stage_span:
+            while True:
+                attempt += 1
+                try:
+                    output = fn(*args)
+                    break
+                except Exception as e:
+                    if attempt > retries:
+                        raise
+                    logging.error(f"Stage '{stage_name}' failed (attempt {attempt}), retrying: {e}")
+                    time.sleep(retry_delay_seconds)
+            first = output[0] if isinstance(output, tuple) and output else output
+            stage_span.set(attempts=attempt, rows=len(first) if hasattr(first, "columns") else None)
+        wall_seconds = time.perf_counter() - start
+    finally:
+        if sampler.baseline is not None:
+            peak = sampler.stop()
+        elif started_tracing:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return output, attempt, wall_seconds, max(peak, 0)
+
+
+@dataclass
+class DagRunner:
+    """
+    Runs pipeline stages in-process, exactly once each, as soon as their inputs exist.
+
+    Every stage receives its upstream outputs directly (DataFrames, artifact paths, ...)
+    instead of re-running or re-reading them, and its wall time and peak RSS growth
+    (sampled from /proc, so native buffers count) are recorded in `metrics`.
+    Stages with no path between them run concurrently on a pool of max_workers
+    threads (or processes, whose stage functions and outputs must be picklable).
+
+    With a StageCache, a stage whose key (inputs, code, config) was seen before is
+    skipped and its cached output reused.
+    """
+    stages: list
+    cache: Optional[StageCache] = None
+    max_workers: int = 4
+    executor: str = "thread"
+    metrics: list = field(default_factory=list)
+
+    def __post_init__(self):
+        names = [stage.name for stage in self.stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate stage names in {names}")
+        if self.executor not in ("thread", "process"):
+            raise ValueError(f"Unsupported executor: {self.executor}")
+
+        self.producers = {}
+        for stage in self.stages:
+            for output in stage.outputs:
+                if output in self.producers:
+                    raise ValueError(f"Output '{output}' is produced by both "
+                                     f"'{self.producers[output].name}' and '{stage.name}'")
+                self.producers[output] = stage
+        for stage in self.stages:
+            missing = [name for name in stage.inputs if name not in self.producers]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown outputs {missing}")
+        self.order = self._topological_order()
+        self.critical_path = []
+        self.elapsed_seconds = 0.0
+
+    def upstream(self, stage):
+        return list(dict.fromkeys(self.producers[name].name for name in stage.inputs))
+
+    def _topological_order(self):
+        by_name = {stage.name: stage for stage in self.stages}
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle detected at stage '{name}'")
+            visiting.add(name)
+            for upstream in self.upstream(by_name[name]):
+                visit(upstream)
+            visiting.discard(name)
+            done.add(name)
+            order.append(by_name[name])
+
+        for stage in self.stages:
+            visit(stage.name)
+        return order
+
+    def _cache_key(self, stage, fingerprints):
+        if self.cache is None or not stage.cache:
+            return None
+        if not stage.inputs and stage.fingerprint is None:
+            # Nothing describes what an external source currently holds, so always re-read it
+            return None
+        source_fingerprint = stage.fingerprint() if stage.fingerprint is not None else None
+        return self.cache.key(stage, [fingerprints[name] for name in stage.inputs], source_fingerprint)
+
+    def _store_outputs(self, stage, value, key, outputs, fingerprints):
+        values = value if len(stage.outputs) > 1 else (value,)
+        if len(values) != len(stage.outputs):
+            raise ValueError(f"Stage '{stage.name}' returned {len(values)} values for outputs {stage.outputs}")
+        consumed = {name for other in self.stages for name in other.inputs}
+        for name, output in zip(stage.outputs, values):
+            outputs[name] = output
+            # Content fingerprint of each output; a cached stage's key stands in for its outputs' hashes
+            if key is not None:
+                fingerprints[name] = f"{key}:{name}"
+            elif self.cache is not None and name in consumed:
+                fingerprints[name] = fingerprint_value(output)
+
+    def _submit_ready(self, pool, pending, running, outputs, fingerprints):
+        """Starts every pending stage whose inputs exist; cache hits complete immediately."""
+        progressed = True
+        while progressed:
+            progressed = False
+            for stage in [s for s in pending if all(name in outputs for name in s.inputs)]:
+                pending.remove(stage)
+                key = self._cache_key(stage, fingerprints)
+                if key is not None:
+                    hit, value = self.cache.get(key)
+                    if hit and stage.artifacts is not None and not self.cache.artifacts_match(key, stage.artifacts()):
+                        logging.info(f"Stage '{stage.name}' cache entry is stale: its output files changed")
+                        hit = False
+                    if hit:
+                        self._store_outputs(stage, value, key, outputs, fingerprints)
+                        self._record(StageMetrics(stage.name, 0.0, 0.0, attempts=0, cache="hit"))
+                        # A hit may unblock further stages without waiting on the pool
+                        progressed = True
+                        continue
+                args = [outputs[name] for name in stage.inputs]
+                # Worker processes run one stage each; threads share the process, so only trace alone
+                trace_heap = self.executor == "process" or self.max_workers <= 1
+                future = pool.submit(_execute_stage, stage.name, stage.fn, args,
+                                     stage.retries, stage.retry_delay_seconds, trace_heap)
+                running[future] = (stage, key)
+
+    def run(self):
+        """
+        Executes every stage once, overlapping independent stages.
+
+        :return: dict mapping output name to value
+        """
+        outputs, fingerprints = {}, {}
+        self.metrics = []
+        pending = list(self.order)
+        running = {}
+        failure = None
+        start = time.perf_counter()
+
+        pool_class = ThreadPoolExecutor if self.executor == "thread" else ProcessPoolExecutor
+        try:
+            with pool_class(max_workers=max(1, self.max_workers)) as pool:
+                self._submit_ready(pool, pending, running, outputs, fingerprints)
+                while running:
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, key = running.pop(future)
+                        cache_status = "off" if key is None else "miss"
+                        try:
+                            value, attempts, wall_seconds, peak_bytes = future.result()
+                        except Exception as e:
+                            logging.error(f"Stage '{stage.name}' failed: {e}")
+                            self._record(StageMetrics(stage.name, 0.0, 0.0, attempts=stage.retries + 1,
+                                                      status="failed", cache=cache_status))
+                            failure = failure or e
+                            continue
+                        self._store_outputs(stage, value, key, outputs, fingerprints)
+                        if key is not None:
+                            self.cache.put(key, value)
+                            if stage.artifacts is not None:
+                                self.cache.record_artifacts(key, stage.artifacts())
+                        self._record(StageMetrics(stage.name, round(wall_seconds, 3),
+                                                  round(peak_bytes / 1024 ** 2, 2),
+                                                  attempts=attempts, cache=cache_status))
+                    # After a failure, let running stages finish but start nothing new
+                    if failure is None:
+                        self._submit_ready(pool, pending, running, outputs, fingerprints)
+        finally:
+            self.elapsed_seconds = round(time.perf_counter() - start, 3)
+            self.log_summary()
+
+        if failure is not None:
+            # CustomException reads the active traceback, so wrap the stage's error while it is being handled
+            try:
+                raise failure
+            except Exception as e:
+                raise CustomException(e, sys) from e
+        return outputs
+
+    def _record(self, metrics):
+        self.metrics.append(metrics)
+        logging.info(f"Stage '{metrics.name}' {metrics.status} in {metrics.wall_seconds}s, "
+                     f"peak memory {metrics.peak_memory_mb} MB, cache {metrics.cache}")
+
+    def compute_critical_path(self):
+        """Longest chain of dependent stages by wall time: the floor on run time at unlimited workers."""
+        wall = {m.name: m.wall_seconds for m in self.metrics}
+        finish, previous = {}, {}
+        for stage in self.order:
+            if stage.name not in wall:
+                continue
+            upstream = [name for name in self.upstream(stage) if name in finish]
+            slowest = max(upstream, key=lambda name: finish[name], default=None)
+            finish[stage.name] = wall[stage.name] + (finish[slowest] if slowest else 0.0)
+            previous[stage.name] = slowest
+
+        path = []
+        node = max(finish, key=finish.get, default=None)
+        seconds = finish.get(node, 0.0)
+        while node is not None:
+            path.append(node)
+            node = previous[node]
+        self.critical_path = path[::-1]
+        return self.critical_path, round(seconds, 3)
+
+    def log_summary(self):
+        total = sum(m.wall_seconds for m in self.metrics)
+        critical_path, critical_seconds = self.compute_critical_path()
+        logging.info(f"Pipeline ran {len(self.metrics)} stages in {self.elapsed_seconds}s elapsed "
+                     f"({round(total, 3)}s of stage time, {self.max_workers} {self.executor} workers)")
+        logging.info(f"Critical path {critical_seconds}s: {' -> '.join(critical_path)}")
+        if self.cache is not None:
+            hits = sum(m.cache == "hit" for m in self.metrics)
+            misses = sum(m.cache == "miss" for m in self.metrics)
+            logging.info(f"Stage cache: {hits} hits, {misses} misses")
+        if resource is not None:
+            max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            logging.info(f"Process peak RSS {round(max_rss_mb, 1)} MB")
+        for m in self.metrics:
+            logging.info(f"  {m.name}: {m.wall_seconds}s, {m.peak_memory_mb} MB, {m.attempts} attempt(s), "
+                         f"{m.status}, cache {m.cache}")
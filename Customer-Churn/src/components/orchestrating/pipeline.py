@@ -1,100 +1,216 @@
-from prefect import flow, task
-import subprocess
+from prefect import flow
+import os
+import joblib
+from datetime import datetime
 from src.logger import logging
+from src.artifact_store import ArtifactStore
+from src import dtype_optimizer
+from src.dtype_optimizer import DtypeOptimizer
+from src.instrumentation import get_instrumentation
+from src.components.orchestrating.dag_runner import DagRunner, Stage
+from src.components.orchestrating.stage_cache import StageCache
+from src.components.data_ingestion.data_ingestion import DataIngestion, DataIngestionConfig
+from src.components.data_ingestion import incremental_ingestion
+from src.components.data_ingestion.incremental_ingestion import IncrementalIngestion, IncrementalIngestionConfig
+from src.components.rawdata import raw_data_Storage, raw_uploader
+from src.components.data_versioning.dataset_versioning import DatasetVersioning
+from src.components.rawdata.raw_data_Storage import upload_to_gcs
+from src.components.data_preparation.data_preparation import DataPreparation, DataPreparationConfig
+from src.components.data_preparation.preprocessor import ChurnPreprocessor
+from src.components.data_transformation.data_transformation import DataTransformation, DataTransformationConfig
+from src.components.data_transformation import feature_registry
+from src.components.data_validation import data_validation as data_validation_module
+from src.components.data_validation.data_validation import validate_data_quality, publish_data_quality_report
+from src.components.data_validation import quality_engine, validation_rules
+from src.components.data_validation.report_renderer import get_report_renderer
+from src.components.data_validation.drift_monitor import DriftMonitor
+from src.components.feature_store.materialized_store import MaterializedFeatureStore
+from src.components.visualization import visualization as visualization_module
+from src.components.visualization.visualization import DataVisualization, VisualizationConfig
+from src.components.model_building.model_trainer import modelBuilding, modelBuildingConfig
+from src.components.model_building import hyperparameter_tuning, training_engine
 
 
+BUCKET_NAME = "customer-churn-dataset-bucket"
+DESTINATION_FOLDER = "raw_data"
+MODEL_PATH = "customer_churn_model.pkl"
+
+
+def incremental_ingestion_frame():
+    """Appends only the rows that are new since the last run, then reads the store's latest row per customer."""
+    ingestion = IncrementalIngestion(IncrementalIngestionConfig(), DataIngestion())
+    ingestion.run()
+    latest = ingestion.latest_view()
+    if latest is None:
+        return None
+    raw_data = latest.to_pandas()
+    # Downstream stages (and Raw Data Storage's upload) read the same typed artifact call() writes
+    ArtifactStore().write(raw_data, ingestion.ingestion.ingestion_config.artifact_name)
+    return raw_data
+
+
+def streamed_ingestion_frame():
+    """Re-reads both sources batch by batch into the artifact, then loads it once, already typed."""
+    ingestion = DataIngestion()
+    for _ in ingestion.call_stream():
+        pass  # each batch is written to the artifact as it arrives
+    return ArtifactStore().read(ingestion.ingestion_config.artifact_name)
+
 
-@task(retries=3, retry_delay_seconds=5)
 def data_ingestion():
-    try:
-        flow_name="Data Ingestion"
-        result = subprocess.run(["python", r"D:\Ml-Projects\Customer-Churn\src\components\data_ingestion\data_ingestion.py"], capture_output=True, text=True, check=True)
-        logging.info(f"Successfully ran {flow_name}")
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error in {flow_name}:\n{e.stderr}")
-        raise e  # Ensures Prefect detects failure
-    return flow_name
-
-@task(retries=3, retry_delay_seconds=5)
-def raw_data_storage(flow_name):
-    try:
-        flow_name="Raw Data Storage"
-        result = subprocess.run(["python", r"D:\Ml-Projects\Customer-Churn\src\components\rawdata\raw_data_Storage.py"], capture_output=True, text=True, check=True)
-        logging.info(f"Successfully ran {flow_name}")
-        return f"Output of {flow_name}:\n{result.stdout}"
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error in {flow_name}:\n{e.stderr}")
-        raise e  # Ensures Prefect detects failure
-    
-@task(retries=3, retry_delay_seconds=5)
-def data_preparation(flow_name):
-    try:
-        flow_name="Data Preparation"
-        result = subprocess.run(["python", r"D:\Ml-Projects\Customer-Churn\src\components\datavalidation\data_validation.py"], capture_output=True, text=True, check=True)
-        logging.info(f"Successfully ran {flow_name}")
-        return f"Output of {flow_name}:\n{result.stdout}"
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error in {flow_name}:\n{e.stderr}")
-        raise e  # Ensures Prefect detects failure
-    
-@task(retries=3, retry_delay_seconds=5)
-def data_transformation(flow_name):
-    try:
-        flow_name="Data Transformation"
-        result = subprocess.run(["python", r"D:\Ml-Projects\Customer-Churn\src\components\datatransformation\data_transformation.py"], capture_output=True, text=True, check=True)
-        logging.info(f"Successfully ran {flow_name}")
-        return f"Output of {flow_name}:\n{result.stdout}"
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error in {flow_name}:\n{e.stderr}")
-        raise e  # Ensures Prefect detects failure 
-    
-@task(retries=3, retry_delay_seconds=5)
-def data_validation(flow_name):
-    try:
-        flow_name="Data Validation"
-        result = subprocess.run(["python", r"D:\Ml-Projects\Customer-Churn\src\components\datavalidation\data_validation.py"], capture_output=True, text=True, check=True)
-        logging.info(f"Successfully ran {flow_name}")
-        return f"Output of {flow_name}:\n{result.stdout}"
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error in {flow_name}:\n{e.stderr}")
-        raise e  # Ensures Prefect detects failure 
-
-@task(retries=3, retry_delay_seconds=5)
-def feature_store(flow_name):
-    try:
-        flow_name="Feature Store"
-        result = subprocess.run(["python", r"D:\Ml-Projects\Customer-Churn\src\components\featurestore\feature_store.py"], capture_output=True, text=True, check=True)
-        logging.info(f"Successfully ran {flow_name}")
-        return f"Output of {flow_name}:\n{result.stdout}"
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error in {flow_name}:\n{e.stderr}")
-        raise e  # Ensures Prefect detects failure 
+    mode = DataIngestionConfig().mode
+    if mode == "incremental":
+        raw_data = incremental_ingestion_frame()
+    elif mode == "stream":
+        raw_data = streamed_ingestion_frame()
+    elif mode == "full":
+        raw_data = DataIngestion().call()
+    else:
+        raise ValueError(f"Unsupported ingestion mode: {mode}")
+    if raw_data is None:
+        raise ValueError("Data ingestion failed.")
+    # Compact dtypes from here on: every later stage receives the downcast frames
+    raw_data = DtypeOptimizer().optimize(raw_data, stage="ingestion")
+    # The artifact is overwritten each run; keep a deduplicated version of it for retraining
+    DatasetVersioning().snapshot(raw_data, DataIngestionConfig().artifact_name)
+    return raw_data
+
+
+def raw_data_storage(raw_data):
+    # call() has already written the typed artifact; upload that file rather than re-serialising
+    source_file_path = ArtifactStore().path(DataIngestion().ingestion_config.artifact_name)
+    # Sharded, parallel and resumable: unchanged shards are skipped on retries and reruns
+    return upload_to_gcs(BUCKET_NAME, source_file_path, DESTINATION_FOLDER)["uri"]
+
+
+def data_preparation(raw_data):
+    preparation = DataPreparation()
+    prepared_data = DtypeOptimizer().optimize(preparation.prepare_data(raw_data), stage="preparation")
+    return prepared_data, preparation.preprocessor
+
+
+def data_visualization(prepared_data):
+    return DataVisualization().generate(prepared_data)
 
 
-@task(retries=3, retry_delay_seconds=5)
-def model_trainer(flow_name):
+def data_transformation(prepared_data):
+    # transformedData adds columns in place; keep the preparation output untouched
+    transformed_data = DataTransformation().transformedData(prepared_data.copy())
+    transformed_data = DtypeOptimizer().optimize(transformed_data, stage="transformation")
+    DatasetVersioning().snapshot(transformed_data, DataTransformationConfig().artifact_name)
+    return transformed_data
+
+
+def data_validation(raw_data):
+    report, result = validate_data_quality(raw_data)
+    # PDF/HTML render in the background; downstream stages only need the report itself
+    publish_data_quality_report(report)
+    # Published first so the report explains the rejection; a failed stage stops everything downstream
+    result.raise_for_blocking()
+    return report
+
+
+def feature_store(transformed_data):
+    # Snapshot to the offline history and refresh the online tier serving reads from
+    store = MaterializedFeatureStore()
     try:
-        flow_name="Model Trainer"
-        result = subprocess.run(["python", r"D:\Ml-Projects\Customer-Churn\src\components\modeltrainer\model_trainer.py"], capture_output=True, text=True, check=True)
-        logging.info(f"Successfully ran {flow_name}")
-        return f"Output of {flow_name}:\n{result.stdout}"
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error in {flow_name}:\n{e.stderr}")
-        raise e  # Ensures Prefect detects failure 
+        return store.materialize(transformed_data)
+    finally:
+        store.close()
+
+
+def model_trainer(transformed_data, preprocessor, quality_report):
+    # quality_report is only an input so training waits for (and requires) a passing validation
+    results_df, model = modelBuilding().train(transformed_data)
+    # Bundle the fitted preprocessor and the Recency Score reference so ChurnScorer reproduces training features
+    joblib.dump({"model": model, "preprocessor": preprocessor,
+                 "last_interaction_max": transformed_data["last interaction"].max()}, MODEL_PATH)
+    return results_df
+
+
+def drift_monitor(raw_data, model_metrics):
+    # Compare this ingestion with the previous training run, then make it the new reference
+    monitor = DriftMonitor()
+    record = monitor.check(raw_data, batch_id=datetime.utcnow().strftime('%Y%m%dT%H%M%S'))
+    monitor.save_reference(raw_data)
+    return record
+
+
+def ingestion_fingerprint():
+    """
+    The CSV's size/mtime plus the current day (the warehouse table is refreshed at most daily)
+    and, for incremental ingestion, the stored watermark and offset the next run starts from.
+    """
+    config = DataIngestionConfig()
+    stat = os.stat(config.csv_path) if os.path.exists(config.csv_path) else None
+    csv_state = f"{stat.st_size}:{stat.st_mtime_ns}" if stat else "missing"
+    fingerprint = f"{config.mode}:{csv_state}:{datetime.utcnow().strftime('%Y-%m-%d')}"
+    if config.mode == "incremental":
+        fingerprint += f":{IncrementalIngestion(IncrementalIngestionConfig()).fingerprint()}"
+    return fingerprint
+
+
+def ingestion_artifacts():
+    name = DataIngestionConfig().artifact_name
+    return [ArtifactStore().path(name), DatasetVersioning().index_path(name)]
+
+
+def transformation_artifacts():
+    name = DataTransformationConfig().artifact_name
+    return [ArtifactStore().path(name), DatasetVersioning().index_path(name)]
+
+
+def build_stages():
+    return [
+        # Stages calling DtypeOptimizer are versioned by it: its downcast rules shape their output frames
+        # Stages that write files list them in `artifacts`: a cache hit is only taken while those
+        # files are exactly as the cached run left them, otherwise the stage runs and rewrites them
+        Stage("Data Ingestion", data_ingestion, outputs=("raw_data",), retries=3, retry_delay_seconds=5,
+              config=DataIngestionConfig(), version_of=(DataIngestion, incremental_ingestion, dtype_optimizer),
+              fingerprint=ingestion_fingerprint,
+              artifacts=ingestion_artifacts),
+        # The bucket can change behind the cache; re-running only re-checks checksums for unchanged shards
+        Stage("Raw Data Storage", raw_data_storage, inputs=("raw_data",), outputs=("raw_data_uri",),
+              retries=3, retry_delay_seconds=5, version_of=(raw_data_Storage, raw_uploader), cache=False),
+        Stage("Data Preparation", data_preparation, inputs=("raw_data",), outputs=("prepared_data", "preprocessor"),
+              config=DataPreparationConfig(), version_of=(DataPreparation, ChurnPreprocessor, dtype_optimizer)),
+        Stage("Data Visualization", data_visualization, inputs=("prepared_data",), outputs=("plot_paths",),
+              config=VisualizationConfig(), version_of=(visualization_module,),
+              artifacts=lambda: [os.path.join(VisualizationConfig().output_dir, "latest.json")]),
+        Stage("Data Transformation", data_transformation, inputs=("prepared_data",), outputs=("transformed_data",),
+              # The feature expressions live in the registry, so its source versions this stage too
+              config=DataTransformationConfig(), version_of=(DataTransformation, feature_registry, dtype_optimizer),
+              artifacts=transformation_artifacts),
+        Stage("Data Validation", data_validation, inputs=("raw_data",), outputs=("quality_report",),
+              version_of=(data_validation_module, validation_rules, quality_engine),
+              artifacts=lambda: [data_validation_module.DataValidationConfig().report_json_path]),
+        # Writes the online/offline stores as a side effect, so always re-run
+        Stage("Feature Store", feature_store, inputs=("transformed_data",), outputs=("feature_snapshot",),
+              cache=False),
+        Stage("Model Trainer", model_trainer, inputs=("transformed_data", "preprocessor", "quality_report"),
+              outputs=("model_metrics",),
+              # Fitting runs in the training engine and the tuner, so their source versions the model too
+              config=modelBuildingConfig(), version_of=(modelBuilding, training_engine, hyperparameter_tuning),
+              artifacts=lambda: [MODEL_PATH]),
+        # Appends to the drift history and replaces the reference profile, so always re-run
+        Stage("Drift Monitor", drift_monitor, inputs=("raw_data", "model_metrics"), outputs=("drift_report",),
+              cache=False),
+    ]
 
 
 @flow
-def churn_prediction_pipeline():
-    df = data_ingestion()
-    df = raw_data_storage(df)
-    df = data_preparation(df)
-    df = data_transformation(df)
-    df = data_validation(df)
-    df = feature_store(df)
-    df = model_trainer(df)
-    logging.info(df)
-    
-    # You can add more tasks here, e.g., data transformation, model training, etc.
+def churn_prediction_pipeline(use_cache=True, max_workers=4):
+    # Every flow run gets its own run id, so per-run metrics never merge across calls in one process
+    run_id = get_instrumentation().start_run()
+    # Raw Data Storage and Data Validation only need raw_data, so they overlap with preparation/transformation
+    runner = DagRunner(build_stages(), cache=StageCache() if use_cache else None, max_workers=max_workers)
+    outputs = runner.run()
+    logging.info(outputs["model_metrics"])
+    # Report rendering ran alongside the later stages; only the flow's exit waits for it
+    get_report_renderer().wait()
+    # Spans are already in artifacts/metrics/spans.jsonl; summarise this run for Prometheus
+    get_instrumentation().write_prometheus(run_id)
+    return outputs
 
 if __name__ == "__main__":
     churn_prediction_pipeline()
@@ -0,0 +1,154 @@
+import os
+import sys
+import json
+import pickle
+import hashlib
+import inspect
+import dataclasses
+from dataclasses import dataclass
+import pandas as pd
+from src.logger import logging
+from src.exception import CustomException
+
+
+@dataclass
+class StageCacheConfig:
+    cache_dir: str = os.path.join('artifacts', "stage_cache")
+    max_size_mb: float = 2048.0
+
+
+def fingerprint_value(value):
+    """Content hash of a stage output; DataFrames are hashed column-wise without pickling."""
+    digest = hashlib.sha256()
+    if isinstance(value, pd.DataFrame):
+        digest.update(json.dumps([[str(c), str(t)] for c, t in value.dtypes.items()]).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    else:
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+def code_version(*objects):
+    """Hash of the source files that define objects (functions, classes or modules)."""
+    digest = hashlib.sha256()
+    for obj in objects:
+        try:
+            with open(inspect.getsourcefile(obj), "rb") as f:
+                digest.update(f.read())
+        except (TypeError, OSError):
+            digest.update(getattr(obj, "__qualname__", repr(obj)).encode())
+    return digest.hexdigest()
+
+
+def file_fingerprint(path):
+    """Size and modification time of a file a stage writes, or None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def config_version(config):
+    if config is None:
+        return ""
+    if dataclasses.is_dataclass(config):
+        config = dataclasses.asdict(config)
+    return json.dumps(config, sort_keys=True, default=str)
+
+
+class StageCache:
+    """
+    On-disk, content-addressed cache of stage outputs.
+
+    A stage's key hashes its name, code version, config and the fingerprints of its
+    inputs, so any upstream change produces a new key. Entries are pickles named by
+    key; the least recently used ones are evicted once the cache exceeds max_size_mb.
+
+    For stages that also write files (artifacts, the model bundle), the files' state
+    after the run is kept next to the entry; a hit is only valid while they still match.
+    """
+
+    def __init__(self, config: StageCacheConfig = None):
+        self.config = config or StageCacheConfig()
+        os.makedirs(self.config.cache_dir, exist_ok=True)
+
+    def key(self, stage, input_fingerprints, source_fingerprint=None):
+        digest = hashlib.sha256()
+        for part in (stage.name,
+                     code_version(stage.fn, *stage.version_of),
+                     config_version(stage.config),
+                     source_fingerprint or "",
+                     *input_fingerprints):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.config.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """
+        :return: (True, value) on a hit, (False, None) on a miss
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            return False, None
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)  # mark as recently used
+            return True, value
+        except Exception as e:
+            logging.error(f"Discarding unreadable cache entry {path}: {e}")
+            os.remove(path)
+            return False, None
+
+    def put(self, key, value):
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._evict()
+        except Exception as e:
+            logging.error(f"Error writing cache entry {path}: {e}")
+            raise CustomException(e, sys)
+
+    def _artifacts_path(self, key):
+        return os.path.join(self.config.cache_dir, f"{key}.artifacts.json")
+
+    def record_artifacts(self, key, paths):
+        """Remembers the state of the files the stage wrote for this entry."""
+        with open(self._artifacts_path(key), "w") as f:
+            json.dump({path: file_fingerprint(path) for path in paths}, f)
+
+    def artifacts_match(self, key, paths):
+        """:return: True if every file is as it was when the entry was stored"""
+        try:
+            with open(self._artifacts_path(key)) as f:
+                recorded = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return all(path in recorded and recorded[path] is not None and file_fingerprint(path) == recorded[path]
+                   for path in paths)
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.config.cache_dir):
+            if name.endswith(".pkl"):
+                stat = os.stat(os.path.join(self.config.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        max_bytes = self.config.max_size_mb * 1024 ** 2
+        for _, size, name in sorted(entries):
+            if total <= max_bytes:
+                break
+            os.remove(os.path.join(self.config.cache_dir, name))
+            artifacts_path = self._artifacts_path(name[:-len(".pkl")])
+            if os.path.exists(artifacts_path):
+                os.remove(artifacts_path)
+            total -= size
+            logging.info(f"Evicted stage cache entry {name}")
@@ -1,39 +1,29 @@
-from google.cloud import storage
-from datetime import datetime
 import os
-from prefect import flow
-from src.logger import logging
+from src.components.rawdata.raw_uploader import GCSBackend, RawDataUploader, RawUploaderConfig
 
 key=r'D:\Ml-Projects\Customer-Churn\notebook\data\key.json'
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"]=key
 
 
 
-def upload_to_gcs(bucket_name, source_file_path, destination_folder):
+def upload_to_gcs(bucket_name, source_file_path, destination_folder, config: RawUploaderConfig = None, backend=None):
     """
     Uploads a file to a Google Cloud Storage bucket under a partitioned folder structure.
+    Large files are sharded and sent in parallel through one shared client.
     
     Args:
         bucket_name (str): Name of the GCS bucket.
         source_file_path (str): Path to the local file to be uploaded.
         destination_folder (str): Base folder in the bucket (e.g., 'raw_data').
+        config (RawUploaderConfig): Shard size, worker count and resumable chunk size.
+        backend: Storage backend; defaults to GCS, LocalBackend(root) for offline runs.
+
+    Returns:
+        dict: Destination URI and transfer statistics, including MB/s.
     """
-    # Initialize the Google Cloud Storage client
-    client = storage.Client()
-    bucket = client.bucket(bucket_name)
-    
-    # Get the current date for partitioning
-    current_date = datetime.utcnow().strftime('%Y/%m/%d')
-    
-    # Construct the destination path in GCS
-    file_name = os.path.basename(source_file_path)
-    destination_blob_path = f"{destination_folder}/{current_date}/{file_name}"
-    
-    # Upload the file
-    blob = bucket.blob(destination_blob_path)
-    blob.upload_from_filename(source_file_path)
-    
-    logging.info(f"File {source_file_path} uploaded to gs://{bucket_name}/{destination_blob_path}")
+    config = config or RawUploaderConfig()
+    backend = backend or GCSBackend(bucket_name, chunk_size_mb=config.chunk_size_mb)
+    return RawDataUploader(backend, config).upload_file(source_file_path, destination_folder)
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,274 @@
+import os
+import sys
+import time
+import base64
+import hashlib
+import shutil
+import threading
+from datetime import datetime, timezone
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.logger import logging
+from src.exception import CustomException
+
+
+@dataclass
+class RawUploaderConfig:
+    staging_dir: str = os.path.join('artifacts', "upload_staging")
+    # Files larger than this are split into shards of about this size
+    shard_size_mb: float = 64
+    max_workers: int = 8
+    # Resumable upload chunk for each shard; GCS needs a multiple of 256 KB
+    chunk_size_mb: int = 8
+
+
+def md5_base64(path, block_size=8 * 1024 * 1024):
+    """:return: base64 MD5 of a file, the form GCS reports as blob.md5_hash"""
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return base64.b64encode(digest.digest()).decode()
+
+
+class LocalBackend:
+    """Bucket stand-in on the local filesystem, for tests and offline runs."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def uri(self, remote_path):
+        return os.path.join(self.root, *remote_path.split("/"))
+
+    def checksum(self, remote_path):
+        path = self.uri(remote_path)
+        return md5_base64(path) if os.path.exists(path) else None
+
+    def upload(self, local_path, remote_path, checksum):
+        path = self.uri(remote_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written aside and renamed, so an interrupted copy never looks complete
+        tmp_path = f"{path}.{threading.get_ident()}.partial"
+        shutil.copyfile(local_path, tmp_path)
+        if md5_base64(tmp_path) != checksum:
+            os.remove(tmp_path)
+            raise IOError(f"Checksum mismatch uploading {local_path}")
+        os.replace(tmp_path, path)
+
+    def compose(self, sources, remote_path, checksum):
+        path = self.uri(remote_path)
+        tmp_path = f"{path}.partial"
+        with open(tmp_path, "wb") as out:
+            for source in sources:
+                with open(self.uri(source), "rb") as f:
+                    shutil.copyfileobj(f, out)
+        os.replace(tmp_path, path)
+
+    def delete(self, remote_paths):
+        for remote_path in remote_paths:
+            if os.path.exists(self.uri(remote_path)):
+                os.remove(self.uri(remote_path))
+
+    def list(self, prefix):
+        """:return: remote paths of the objects under prefix/"""
+        root = self.uri(prefix)
+        return [f"{prefix}/{os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, '/')}"
+                for dirpath, _, files in os.walk(root) for name in files if not name.endswith(".partial")]
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_storage_client():
+    """One storage.Client per process; it is thread-safe and keeps its connection pool."""
+    from google.cloud import storage
+
+    with _clients_lock:
+        if "default" not in _clients:
+            # Honours STORAGE_EMULATOR_HOST, so the same code runs against an emulator
+            _clients["default"] = storage.Client()
+        return _clients["default"]
+
+
+class GCSBackend:
+    # GCS composes at most 32 objects per request
+    COMPOSE_LIMIT = 32
+
+    def __init__(self, bucket_name, client=None, chunk_size_mb=8):
+        self.bucket_name = bucket_name
+        self.bucket = (client or get_storage_client()).bucket(bucket_name)
+        self.chunk_size = int(chunk_size_mb) * 1024 * 1024
+
+    def uri(self, remote_path):
+        return f"gs://{self.bucket_name}/{remote_path}"
+
+    def checksum(self, remote_path):
+        blob = self.bucket.get_blob(remote_path)
+        if blob is None:
+            return None
+        # Composite objects carry no MD5, so compose() records the source's
+        return blob.md5_hash or (blob.metadata or {}).get("source-md5")
+
+    def upload(self, local_path, remote_path, checksum):
+        # A chunk size makes this a resumable upload, retried per chunk instead of per file
+        blob = self.bucket.blob(remote_path, chunk_size=self.chunk_size)
+        blob.upload_from_filename(local_path, checksum="md5")
+        if blob.md5_hash and blob.md5_hash != checksum:
+            raise IOError(f"Checksum mismatch uploading {local_path}")
+
+    def compose(self, sources, remote_path, checksum):
+        sources = [self.bucket.blob(path) for path in sources]
+        intermediates = []
+        while len(sources) > self.COMPOSE_LIMIT:
+            merged = []
+            for i in range(0, len(sources), self.COMPOSE_LIMIT):
+                blob = self.bucket.blob(f"{remote_path}.compose-{len(intermediates):05d}")
+                blob.compose(sources[i:i + self.COMPOSE_LIMIT])
+                intermediates.append(blob.name)
+                merged.append(blob)
+            sources = merged
+        destination = self.bucket.blob(remote_path)
+        destination.metadata = {"source-md5": checksum}
+        destination.compose(sources)
+        self.delete(intermediates)
+
+    def delete(self, remote_paths):
+        for remote_path in remote_paths:
+            self.bucket.blob(remote_path).delete()
+
+    def list(self, prefix):
+        return [blob.name for blob in self.bucket.list_blobs(prefix=f"{prefix}/")]
+
+
+def split_parquet(path, out_dir, shard_bytes):
+    """Re-writes a Parquet file as independent Parquet shards of roughly shard_bytes each."""
+    source = pq.ParquetFile(path)
+    rows = source.metadata.num_rows
+    rows_per_shard = max(1, int(rows * shard_bytes / max(os.path.getsize(path), 1)))
+    os.makedirs(out_dir, exist_ok=True)
+    shards = []
+    for i, batch in enumerate(source.iter_batches(batch_size=rows_per_shard)):
+        shard_path = os.path.join(out_dir, f"part-{i:05d}.parquet")
+        pq.write_table(pa.Table.from_batches([batch]), shard_path)
+        shards.append(shard_path)
+    return shards
+
+
+def split_bytes(path, out_dir, shard_bytes):
+    """Cuts any file into byte ranges, for composing back into one object."""
+    os.makedirs(out_dir, exist_ok=True)
+    shards = []
+    with open(path, "rb") as f:
+        for i, block in enumerate(iter(lambda: f.read(shard_bytes), b"")):
+            shard_path = os.path.join(out_dir, f"part-{i:05d}")
+            with open(shard_path, "wb") as out:
+                out.write(block)
+            shards.append(shard_path)
+    return shards
+
+
+class RawDataUploader:
+    """
+    Uploads raw files under destination_folder/YYYY/MM/DD/ on a bounded thread pool.
+
+    Large Parquet files become a partitioned dataset of Parquet shards
+    (<stem>/part-NNNNN.parquet); other large files are uploaded as byte-range shards
+    and composed into one object. Every object is checked against its MD5, and shards
+    whose remote checksum already matches are skipped, so a rerun after an
+    interruption only sends what is missing. Once a Parquet file's new objects are
+    all in place, shards (or the single object) left by an earlier upload of the
+    same file that day are deleted, so readers of the prefix never see stale rows.
+    """
+
+    def __init__(self, backend, config: RawUploaderConfig = None):
+        self.backend = backend
+        self.config = config or RawUploaderConfig()
+
+    def _upload_one(self, local_path, remote_path):
+        checksum = md5_base64(local_path)
+        if self.backend.checksum(remote_path) == checksum:
+            return 0
+        self.backend.upload(local_path, remote_path, checksum)
+        return os.path.getsize(local_path)
+
+    def _upload_many(self, pairs):
+        with ThreadPoolExecutor(max_workers=self.config.max_workers) as pool:
+            return list(pool.map(lambda pair: self._upload_one(*pair), pairs))
+
+    def _remove_stale(self, prefix, file_name, uploaded):
+        """Deletes what an earlier upload of this Parquet file left under prefix that this one did not write."""
+        stem = os.path.splitext(file_name)[0]
+        stale = [path for path in self.backend.list(f"{prefix}/{stem}")
+                 if os.path.basename(path).startswith("part-") and path not in uploaded]
+        single = f"{prefix}/{file_name}"
+        if single not in uploaded and self.backend.checksum(single) is not None:
+            stale.append(single)
+        if stale:
+            self.backend.delete(stale)
+            logging.info(f"Removed {len(stale)} stale objects of {file_name} under {prefix}")
+        return len(stale)
+
+    def upload_file(self, source_file_path, destination_folder, date=None):
+        """
+        :param date: partition date; defaults to today (UTC)
+        :return: dict with the destination URI and transfer statistics (MB/s over bytes sent)
+        """
+        try:
+            start = time.perf_counter()
+            date = date or datetime.now(timezone.utc)
+            prefix = f"{destination_folder}/{date.strftime('%Y/%m/%d')}"
+            file_name = os.path.basename(source_file_path)
+            size = os.path.getsize(source_file_path)
+            shard_bytes = int(self.config.shard_size_mb * 1024 * 1024)
+            staging = os.path.join(self.config.staging_dir, f"{file_name}.{os.getpid()}")
+            removed = 0
+
+            try:
+                if size <= shard_bytes:
+                    remote = f"{prefix}/{file_name}"
+                    sent = self._upload_many([(source_file_path, remote)])
+                    shards = 1
+                    if file_name.endswith(".parquet"):
+                        removed = self._remove_stale(prefix, file_name, {remote})
+                elif file_name.endswith(".parquet"):
+                    remote = f"{prefix}/{os.path.splitext(file_name)[0]}"
+                    local_shards = split_parquet(source_file_path, staging, shard_bytes)
+                    pairs = [(path, f"{remote}/{os.path.basename(path)}") for path in local_shards]
+                    sent = self._upload_many(pairs)
+                    shards = len(local_shards)
+                    removed = self._remove_stale(prefix, file_name, {p for _, p in pairs})
+                else:
+                    remote = f"{prefix}/{file_name}"
+                    checksum = md5_base64(source_file_path)
+                    sent = [0]
+                    shards = 0
+                    if self.backend.checksum(remote) != checksum:
+                        local_shards = split_bytes(source_file_path, staging, shard_bytes)
+                        pairs = [(path, f"{remote}.shards/{os.path.basename(path)}") for path in local_shards]
+                        sent = self._upload_many(pairs)
+                        self.backend.compose([p for _, p in pairs], remote, checksum)
+                        self.backend.delete([p for _, p in pairs])
+                        shards = len(local_shards)
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+
+            seconds = time.perf_counter() - start
+            bytes_sent = sum(sent)
+            stats = {
+                "uri": self.backend.uri(remote),
+                "shards": shards,
+                "skipped": sum(1 for b in sent if b == 0),
+                "removed": removed,
+                "mb_sent": round(bytes_sent / 1024 ** 2, 3),
+                "seconds": round(seconds, 3),
+                "mb_per_s": round(bytes_sent / 1024 ** 2 / seconds, 2) if seconds > 0 else 0.0,
+            }
+            logging.info(f"Uploaded {source_file_path}: {stats}")
+            return stats
+
+        except Exception as e:
+            logging.error(f"Error uploading {source_file_path}: {e}")
+            raise CustomException(e, sys)
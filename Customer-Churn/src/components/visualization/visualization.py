@@ -0,0 +1,158 @@
+import os
+import sys
+import json
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # headless: never open a window or block on show()
+import matplotlib.pyplot as plt
+from src.logger import logging
+from src.exception import CustomException
+
+
+@dataclass
+class VisualizationConfig:
+    output_dir: str = os.path.join('artifacts', "plots")
+    bins: int = 20
+    # Boxplot fliers are drawn from a churn-stratified sample instead of every row
+    sample_size: int = 5_000
+    stratify_column: str = "churn"
+    exclude_columns: tuple = ("customerid",)
+    max_workers: int = 3
+    random_state: int = 42
+
+
+def stratified_sample(df, column, n, random_state=42):
+    """Proportionate sample of about n rows that keeps the class balance of `column`."""
+    if len(df) <= n:
+        return df
+    if column not in df.columns:
+        return df.sample(n=n, random_state=random_state)
+    return df.groupby(column, group_keys=False, observed=True).sample(frac=n / len(df), random_state=random_state)
+
+
+def plot_aggregates(df, config: VisualizationConfig = None):
+    """
+    Reduces the data to what the plots need: per-column histogram counts, boxplot
+    statistics (one batched quantile call) with fliers from a stratified sample, and
+    churn class counts. Only these small aggregates are sent to the render workers.
+    """
+    config = config or VisualizationConfig()
+    numeric = df.select_dtypes(include=["number"]).drop(columns=list(config.exclude_columns), errors="ignore")
+
+    histograms = {}
+    for col in numeric.columns:
+        values = numeric[col].to_numpy(dtype=float)
+        counts, edges = np.histogram(values[~np.isnan(values)], bins=config.bins)
+        histograms[col] = {"counts": counts.tolist(), "edges": edges.tolist()}
+
+    quartiles = numeric.quantile([0.25, 0.5, 0.75])
+    sample = stratified_sample(df, config.stratify_column, config.sample_size, config.random_state)
+    boxes = []
+    for col in numeric.columns:
+        q1, med, q3 = quartiles[col]
+        low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        values = numeric[col]
+        inside = values[(values >= low) & (values <= high)]
+        sampled = sample[col]
+        boxes.append({
+            "label": col, "q1": q1, "med": med, "q3": q3,
+            "whislo": float(inside.min()) if len(inside) else q1,
+            "whishi": float(inside.max()) if len(inside) else q3,
+            "fliers": sampled[(sampled < low) | (sampled > high)].tolist(),
+        })
+
+    churn_counts = {}
+    if config.stratify_column in df.columns:
+        churn_counts = {str(k): int(v) for k, v in df[config.stratify_column].value_counts().sort_index().items()}
+
+    return {"histogram": histograms, "Outlier": boxes, "churn_distribution": churn_counts}
+
+
+def _render_histograms(histograms, path):
+    n = len(histograms)
+    cols = min(n, 3) or 1
+    rows = int(np.ceil(n / cols)) or 1
+    fig, axes = plt.subplots(rows, cols, figsize=(10, 6), squeeze=False)
+    for ax, (col, hist) in zip(axes.flat, histograms.items()):
+        edges = np.asarray(hist["edges"])
+        ax.bar(edges[:-1], hist["counts"], width=np.diff(edges), align="edge")
+        ax.set_title(col)
+    for ax in axes.flat[n:]:
+        ax.set_visible(False)
+    fig.suptitle("Feature Distributions")
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def _render_boxplot(boxes, path):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.bxp(boxes)
+    ax.tick_params(axis="x", labelrotation=90)
+    ax.set_title("Outlier Detection")
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def _render_countplot(counts, path):
+    fig, ax = plt.subplots(figsize=(5, 4))
+    ax.bar(list(counts), list(counts.values()))
+    ax.set_xlabel("churn")
+    ax.set_ylabel("count")
+    ax.set_title("Churn Distribution")
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+_RENDERERS = {"histogram": _render_histograms, "Outlier": _render_boxplot, "churn_distribution": _render_countplot}
+
+
+def _render(name, aggregate, path):
+    _RENDERERS[name](aggregate, path)
+    return name, path
+
+
+class DataVisualization:
+    """
+    Headless plot stage, decoupled from DataPreparation.
+
+    Plots are rendered in parallel worker processes from pre-computed aggregates and
+    written under output_dir/<version>/, where the version is a hash of those aggregates,
+    so unchanged data reuses the existing PNGs and older versions stay intact.
+    """
+
+    def __init__(self, config: VisualizationConfig = None):
+        self.config = config or VisualizationConfig()
+
+    def generate(self, df: pd.DataFrame):
+        """:return: dict of plot name -> PNG path"""
+        try:
+            aggregates = plot_aggregates(df, self.config)
+            payload = json.dumps(aggregates, sort_keys=True, default=float).encode()
+            version = hashlib.sha256(payload).hexdigest()[:12]
+            version_dir = os.path.join(self.config.output_dir, version)
+            os.makedirs(version_dir, exist_ok=True)
+
+            paths = {name: os.path.join(version_dir, f"{name}.png") for name in aggregates}
+            pending = {name: path for name, path in paths.items() if not os.path.exists(path)}
+            if pending:
+                # This runs on a DagRunner thread: fork would copy locks other threads hold, so spawn workers
+                with ProcessPoolExecutor(max_workers=min(self.config.max_workers, len(pending)),
+                                         mp_context=multiprocessing.get_context("spawn")) as pool:
+                    list(pool.map(_render, pending, [aggregates[name] for name in pending], pending.values()))
+
+            with open(os.path.join(self.config.output_dir, "latest.json"), "w") as f:
+                json.dump({"version": version, "plots": paths}, f, indent=2)
+            logging.info(f"Plots version {version}: rendered {len(pending)}, reused {len(paths) - len(pending)}")
+            return paths
+
+        except Exception as e:
+            logging.error(f"Error generating visualizations: {e}")
+            raise CustomException(e, sys)
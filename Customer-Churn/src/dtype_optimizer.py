@@ -0,0 +1,149 @@
+import os
+import sys
+import json
+import threading
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype, is_string_dtype
+from src.logger import logging
+from src.exception import CustomException
+
+
+# Narrowest first; a column only ever moves right along this order
+NUMERIC_ORDER = ["int8", "int16", "int32", "int64", "float32", "float64"]
+
+
+@dataclass
+class DtypeOptimizerConfig:
+    schema_path: str = os.path.join('artifacts', "dtype_schema.json")
+    # Strings with at most this many distinct values (and under half the rows) become categoricals
+    categorical_max_unique: int = 1000
+    # float64 -> float32 only if every value survives the round trip to this relative tolerance.
+    # Anything above 0 is lossy (float32 rounds at ~6e-8) and makes training features differ
+    # from the float64 ones computed at scoring time, so keep it exact unless that is acceptable
+    float32_rtol: float = 0.0
+
+
+def memory_usage_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def _integral(values):
+    return bool(np.all(np.mod(values, 1) == 0))
+
+
+def _fits(series, dtype, rtol):
+    """Whether series can be cast to dtype without losing values."""
+    if dtype in NUMERIC_ORDER and not is_numeric_dtype(series.dtype):
+        return False
+    values = series.to_numpy(dtype=float, na_value=np.nan) if dtype in NUMERIC_ORDER else None
+    if dtype.startswith("int"):
+        if np.isnan(values).any() or not _integral(values):
+            return False
+        info = np.iinfo(dtype)
+        return len(values) == 0 or (values.min() >= info.min and values.max() <= info.max)
+    if dtype == "float32":
+        finite = values[np.isfinite(values)]
+        if len(finite) and np.abs(finite).max() > np.finfo(np.float32).max:
+            return False
+        if rtol == 0:
+            return bool(np.array_equal(finite, finite.astype(np.float32)))
+        return bool(np.allclose(finite, finite.astype(np.float32), rtol=rtol, atol=0))
+    return True
+
+
+def infer_dtype(series, config: DtypeOptimizerConfig = None):
+    """:return: the smallest safe dtype name for series, or None to leave it as it is"""
+    config = config or DtypeOptimizerConfig()
+    if is_bool_dtype(series.dtype) or isinstance(series.dtype, pd.CategoricalDtype):
+        return None
+    if is_numeric_dtype(series.dtype):
+        for dtype in NUMERIC_ORDER:
+            if _fits(series, dtype, config.float32_rtol):
+                return dtype
+        return None
+    if is_string_dtype(series.dtype):
+        unique = series.nunique(dropna=True)
+        if unique <= config.categorical_max_unique and unique < 0.5 * max(len(series), 1):
+            return "category"
+    return None
+
+
+def _widen(old, new):
+    if old not in NUMERIC_ORDER or new not in NUMERIC_ORDER:
+        return new
+    widest = max(old, new, key=NUMERIC_ORDER.index)
+    # float32 holds integers exactly only up to 2**24
+    if widest == "float32" and old in ("int32", "int64"):
+        return "float64"
+    return widest
+
+
+class DtypeOptimizer:
+    """
+    Chooses compact dtypes (int8/16/32, float32, category) from observed values and
+    keeps the chosen schema per stage in a JSON file, so each run casts a stage's output
+    the same way and downstream stages receive compact frames. A column whose new
+    values no longer fit is widened, never truncated.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, config: DtypeOptimizerConfig = None):
+        self.config = config or DtypeOptimizerConfig()
+
+    def load_schema(self):
+        if not os.path.exists(self.config.schema_path):
+            return {}
+        with open(self.config.schema_path) as f:
+            return json.load(f)
+
+    def _save_schema(self, schema):
+        os.makedirs(os.path.dirname(self.config.schema_path) or ".", exist_ok=True)
+        tmp_path = f"{self.config.schema_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(schema, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.config.schema_path)
+
+    def optimize(self, df: pd.DataFrame, stage="default") -> pd.DataFrame:
+        """
+        Casts df to the stage's carried schema, inferring dtypes for columns it has not seen.
+
+        :param stage: schema namespace and label for the memory report in the log
+        :return: a compact copy of df
+        """
+        try:
+            before = memory_usage_mb(df)
+            with self._lock:
+                schemas = self.load_schema()
+                schema = schemas.setdefault(stage, {})
+                changed = False
+                casts = {}
+                for col in df.columns:
+                    key = str(col)
+                    series = df[col]
+                    dtype = schema.get(key)
+                    if dtype is None or not _fits(series, dtype, self.config.float32_rtol):
+                        inferred = infer_dtype(series, self.config)
+                        if inferred is None:
+                            continue
+                        if dtype is not None and dtype != inferred:
+                            logging.info(f"Widening {stage} '{key}' from {dtype} to {_widen(dtype, inferred)}")
+                        dtype = _widen(dtype, inferred) if dtype else inferred
+                        schema[key] = dtype
+                        changed = True
+                    if str(series.dtype) != dtype:
+                        casts[col] = dtype
+                if changed:
+                    self._save_schema(schemas)
+
+            df = df.astype(casts) if casts else df
+            after = memory_usage_mb(df)
+            logging.info(f"{stage} memory: {before:.2f} MB -> {after:.2f} MB "
+                         f"({len(casts)} columns recast)")
+            return df
+
+        except Exception as e:
+            logging.error(f"Error optimizing dtypes for {stage}: {e}")
+            raise CustomException(e, sys)
@@ -0,0 +1,293 @@
+import os
+import sys
+import json
+import time
+import uuid
+import cProfile
+import threading
+import functools
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from dataclasses import dataclass, field
+from src.logger import logging
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+@dataclass
+class InstrumentationConfig:
+    metrics_path: str = os.path.join('artifacts', "metrics", "spans.jsonl")
+    # Prometheus textfile-collector output, rewritten by write_prometheus() at the end of a run
+    prometheus_path: str = os.path.join('artifacts', "metrics", "churn_pipeline.prom")
+    profile_dir: str = os.path.join('artifacts', "metrics", "profiles")
+    enabled: bool = field(default_factory=lambda: os.environ.get("CHURN_METRICS", "1") != "0")
+    # cProfile every top-level span (e.g. each stage) into profile_dir; CHURN_PROFILE=1 turns it on
+    profile: bool = field(default_factory=lambda: os.environ.get("CHURN_PROFILE") == "1")
+
+
+def current_rss_bytes():
+    """Resident set size now, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_bytes():
+    """Process high-water mark of resident memory (ru_maxrss is KB on Linux, bytes on macOS)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RSSSampler(threading.Thread):
+    """Polls resident set size so native allocations (XGBoost, Arrow, BLAS) are counted too; Linux only."""
+
+    def __init__(self, interval=0.01):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.baseline = self.peak = current_rss_bytes()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, current_rss_bytes())
+
+    def stop(self):
+        """:return: peak RSS growth over the baseline, in bytes"""
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, current_rss_bytes())
+        return self.peak - self.baseline
+
+
+class Span:
+    """One timed unit of work; rows and byte counts can be set while it runs."""
+
+    def __init__(self, name, parent=None, **attrs):
+        self.name = name
+        self.parent = parent
+        self.rows = attrs.pop("rows", None)
+        self.bytes_read = attrs.pop("bytes_read", None)
+        self.bytes_written = attrs.pop("bytes_written", None)
+        self.attrs = attrs
+
+    def set(self, **values):
+        for key in ("rows", "bytes_read", "bytes_written"):
+            if key in values:
+                setattr(self, key, values.pop(key))
+        self.attrs.update(values)
+        return self
+
+
+class Instrumentation:
+    """
+    Structured timing spans for pipeline stages and their sub-steps.
+
+    Each span appends one JSON line (run id, pid, parent span, wall and CPU seconds,
+    rows, bytes read/written, current and peak RSS, status) to metrics_path, so runs can
+    be compared for regressions. write_prometheus() summarises the current run as a
+    Prometheus textfile. Spans nest per thread. start_run() begins a new run id; it is
+    also exported as CHURN_RUN_ID so worker processes started afterwards report under it.
+
+    Hooks are called as hook(event, record) with event "start" or "end", e.g. to
+    toggle an external sampler; the pid in every record lets py-spy attach to and
+    correlate with the same process.
+    """
+
+    def __init__(self, config: InstrumentationConfig = None):
+        self.config = config or InstrumentationConfig()
+        # A worker process picks up the run its parent started
+        self.run_id = os.environ.get("CHURN_RUN_ID") or self.start_run()
+        self.hooks = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def start_run(self, run_id=None):
+        """Starts a new run, e.g. at the beginning of each pipeline flow; :return: its id"""
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        os.environ["CHURN_RUN_ID"] = self.run_id
+        return self.run_id
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _emit(self, record):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.config.metrics_path) or ".", exist_ok=True)
+            with open(self.config.metrics_path, "a") as f:
+                f.write(line + "\n")
+
+    def _run_hooks(self, event, record):
+        for hook in self.hooks:
+            try:
+                hook(event, record)
+            except Exception as e:
+                logging.error(f"Instrumentation hook failed on {event} of '{record['span']}': {e}")
+
+    def _start_profiler(self):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler is active in this thread
+            return None
+        return profiler
+
+    def _stop_profiler(self, profiler, name):
+        profiler.disable()
+        os.makedirs(os.path.join(self.config.profile_dir, self.run_id), exist_ok=True)
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+        path = os.path.join(self.config.profile_dir, self.run_id, f"{safe_name}.{os.getpid()}.prof")
+        profiler.dump_stats(path)  # pstats format: snakeviz, gprof2dot, python -m pstats
+        return path
+
+    @contextmanager
+    def span(self, name, profile=None, **attrs):
+        """
+        Times the enclosed block.
+
+        :param profile: cProfile this span; defaults to config.profile for top-level spans
+        :param attrs: rows/bytes_read/bytes_written plus any extra labels for the record
+        """
+        if not self.config.enabled:
+            yield Span(name, **attrs)
+            return
+
+        stack = self._stack()
+        span = Span(name, parent=stack[-1].name if stack else None, **attrs)
+        started_at = datetime.now(timezone.utc).isoformat()
+        self._run_hooks("start", {"span": name, "run_id": self.run_id, "pid": os.getpid(), "start": started_at})
+        profiler = None
+        if profile or (profile is None and self.config.profile and not stack):
+            profiler = self._start_profiler()
+        stack.append(span)
+        status, error = "ok", None
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield span
+        except BaseException as e:
+            status, error = "error", f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            wall_seconds, cpu_seconds = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+            stack.pop()
+            profile_path = self._stop_profiler(profiler, name) if profiler is not None else None
+            rss, peak = current_rss_bytes(), peak_rss_bytes()
+            record = {
+                "run_id": self.run_id,
+                "pid": os.getpid(),
+                "thread": threading.current_thread().name,
+                "span": name,
+                "parent": span.parent,
+                "start": started_at,
+                "wall_seconds": round(wall_seconds, 6),
+                "cpu_seconds": round(cpu_seconds, 6),
+                "rows": span.rows,
+                "bytes_read": span.bytes_read,
+                "bytes_written": span.bytes_written,
+                "rss_mb": round(rss / 1024 ** 2, 2) if rss is not None else None,
+                "peak_rss_mb": round(peak / 1024 ** 2, 2) if peak is not None else None,
+                "status": status,
+                "error": error,
+                "attrs": span.attrs,
+                "profile": profile_path,
+            }
+            try:
+                self._emit(record)
+            except OSError as e:
+                logging.error(f"Could not write span '{name}': {e}")
+            self._run_hooks("end", record)
+
+    def instrument(self, name=None, **attrs):
+        """Decorator form of span(); the name defaults to the function's qualified name."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name or fn.__qualname__, **attrs):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def records(self, run_id=None):
+        """:return: span records of run_id (default: this run) from metrics_path"""
+        run_id = run_id or self.run_id
+        if not os.path.exists(self.config.metrics_path):
+            return []
+        with open(self.config.metrics_path) as f:
+            return [record for record in map(json.loads, filter(str.strip, f)) if record["run_id"] == run_id]
+
+    def summary(self, run_id=None):
+        """:return: per-span totals for the run: count, errors, seconds, rows, bytes and peak RSS"""
+        totals = {}
+        for record in self.records(run_id):
+            entry = totals.setdefault(record["span"], {"count": 0, "errors": 0, "wall_seconds": 0.0,
+                                                       "cpu_seconds": 0.0, "rows": 0, "bytes_read": 0,
+                                                       "bytes_written": 0, "peak_rss_mb": 0.0})
+            entry["count"] += 1
+            entry["errors"] += record["status"] != "ok"
+            for key in ("wall_seconds", "cpu_seconds", "rows", "bytes_read", "bytes_written"):
+                entry[key] += record[key] or 0
+            entry["peak_rss_mb"] = max(entry["peak_rss_mb"], record["peak_rss_mb"] or 0.0)
+        return totals
+
+    def write_prometheus(self, run_id=None):
+        """Writes the run's summary in Prometheus text exposition format; :return: the file path."""
+        totals = self.summary(run_id)
+        run_id = run_id or self.run_id
+
+        def label(value):
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        # Counters carry the _total suffix. The run id goes on its own info metric rather than
+        # on every series, so each run does not start a fresh set of series in Prometheus
+        metrics = [
+            ("churn_spans_total", "count", "counter", "Spans completed"),
+            ("churn_span_errors_total", "errors", "counter", "Spans that raised"),
+            ("churn_span_wall_seconds_total", "wall_seconds", "counter", "Wall-clock seconds spent in the span"),
+            ("churn_span_cpu_seconds_total", "cpu_seconds", "counter", "CPU seconds of the span's thread"),
+            ("churn_span_rows_total", "rows", "counter", "Rows processed"),
+            ("churn_span_bytes_read_total", "bytes_read", "counter", "Bytes read"),
+            ("churn_span_bytes_written_total", "bytes_written", "counter", "Bytes written"),
+            ("churn_span_peak_rss_megabytes", "peak_rss_mb", "gauge", "Process peak RSS when the span ended"),
+        ]
+        lines = ["# HELP churn_run_info Run the span metrics below were summarised from",
+                 "# TYPE churn_run_info gauge",
+                 f'churn_run_info{{run_id="{label(run_id)}"}} 1']
+        for metric, key, kind, help_text in metrics:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            lines += [f'{metric}{{span="{label(name)}"}} {entry[key]}' for name, entry in sorted(totals.items())]
+
+        path = self.config.prometheus_path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # node_exporter may read at any time, so replace the file atomically
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+        logging.info(f"Metrics for run {run_id} written to {path}")
+        return path
+
+
+_instrumentation = None
+_instrumentation_lock = threading.Lock()
+
+
+def get_instrumentation():
+    """Process-wide Instrumentation shared by all components."""
+    global _instrumentation
+    with _instrumentation_lock:
+        if _instrumentation is None:
+            _instrumentation = Instrumentation()
+        return _instrumentation
+
+
+def span(name, profile=None, **attrs):
+    """Shortcut for get_instrumentation().span(...)."""
+    return get_instrumentation().span(name, profile=profile, **attrs)
@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_artifacts(tmp_path, monkeypatch):
+    # Components write under the relative 'artifacts' directory; keep each test's files apart
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CHURN_METRICS", "0")
@@ -0,0 +1,20 @@
+import pandas as pd
+import pytest
+from src.artifact_store import ArtifactStore
+
+
+@pytest.mark.parametrize("fmt,row_groups", [("parquet", None), ("parquet", [0, 1]), ("arrow", None), ("csv", None)])
+def test_filters_may_use_columns_outside_the_projection(fmt, row_groups):
+    store = ArtifactStore()
+    store.config.row_group_size = 2
+    df = pd.DataFrame({"customerid": [1, 2, 3, 4], "age": [30, 40, 50, 60], "churn": [0, 1, 1, 0]})
+    store.write(df, "customers", fmt=fmt)
+
+    read = store.read("customers", columns=["customerid"], filters=[("churn", "==", 1)],
+                      row_groups=row_groups, fmt=fmt)
+    assert list(read.columns) == ["customerid"]
+    assert read["customerid"].tolist() == [2, 3]
+
+    dnf = store.read("customers", columns=["age"], filters=[[("customerid", "<", 2)], [("churn", "==", 1)]],
+                     row_groups=row_groups, fmt=fmt)
+    assert dnf["age"].tolist() == [30, 40, 50]
@@ -0,0 +1,26 @@
+import sqlite3
+from src.components.data_preparation.preprocessor import ChurnPreprocessor
+from src.components.data_transformation.data_transformation import DataTransformation
+from test_scoring_parity import raw_customers
+
+
+def test_datastore_loads_transformed_frame_in_chunks():
+    transformed = DataTransformation().transformedData(ChurnPreprocessor().fit_transform(raw_customers(500)))
+    conn = sqlite3.connect("warehouse.db")
+
+    stats = DataTransformation().datastore(transformed, conn=conn, chunk_size=128)
+    assert stats["rows"] == len(transformed) and stats["chunks"] == -(-len(transformed) // 128)
+
+    assert conn.execute("SELECT COUNT(*) FROM CustomerChurnData").fetchone()[0] == len(transformed)
+    types = dict(conn.execute("""SELECT 'CustomerID', GROUP_CONCAT(DISTINCT typeof(CustomerID)) FROM CustomerChurnData
+        UNION ALL SELECT 'Gender', GROUP_CONCAT(DISTINCT typeof(Gender)) FROM CustomerChurnData
+        UNION ALL SELECT 'Total_Spend', GROUP_CONCAT(DISTINCT typeof(Total_Spend)) FROM CustomerChurnData
+        UNION ALL SELECT 'CLV', GROUP_CONCAT(DISTINCT typeof(CLV)) FROM CustomerChurnData
+        UNION ALL SELECT 'Churn', GROUP_CONCAT(DISTINCT typeof(Churn)) FROM CustomerChurnData""").fetchall())
+    assert types == {"CustomerID": "integer", "Gender": "integer", "Total_Spend": "real", "CLV": "real",
+                     "Churn": "text"}
+
+    churn = conn.execute("SELECT Churn FROM CustomerChurnData ORDER BY CustomerID").fetchall()
+    assert {value for (value,) in churn} == {"True", "False"}
+    assert [value for (value,) in churn] == transformed.sort_values("customerid")["churn"].tolist()
+    conn.close()
@@ -0,0 +1,82 @@
+import tracemalloc
+import numpy as np
+import pytest
+from src.exception import CustomException
+from src.components.orchestrating.dag_runner import DagRunner, Stage
+
+
+def _fail(value):
+    raise KeyError("churn")
+
+
+def test_stage_failure_reaches_caller():
+    runner = DagRunner([
+        Stage("load", lambda: 1, outputs=("value",)),
+        Stage("train", _fail, inputs=("value",), outputs=("model",)),
+    ])
+    with pytest.raises(CustomException) as info:
+        runner.run()
+    assert isinstance(info.value.__cause__, KeyError)
+    assert "'churn'" in str(info.value)
+    assert [m.status for m in runner.metrics if m.name == "train"] == ["failed"]
+
+
+def test_failure_stops_downstream_stages():
+    calls = []
+    runner = DagRunner([
+        Stage("load", lambda: 1, outputs=("value",)),
+        Stage("train", _fail, inputs=("value",), outputs=("model",)),
+        Stage("report", lambda model: calls.append(model), inputs=("model",)),
+    ])
+    with pytest.raises(CustomException):
+        runner.run()
+    assert calls == []
+
+
+def test_stages_run_after_their_inputs():
+    order = []
+
+    def stage(name, *values):
+        order.append(name)
+        return name
+
+    runner = DagRunner([
+        Stage("c", lambda a, b: stage("c", a, b), inputs=("a", "b")),
+        Stage("b", lambda a: stage("b", a), inputs=("a",)),
+        Stage("a", lambda: stage("a")),
+    ])
+    outputs = runner.run()
+    assert outputs == {"a": "a", "b": "b", "c": "c"}
+    assert order == ["a", "b", "c"]
+
+
+def test_retries_before_failing():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("transient")
+        return "ok"
+
+    runner = DagRunner([Stage("flaky", flaky, retries=2)])
+    assert runner.run() == {"flaky": "ok"}
+    assert runner.metrics[0].attempts == 3
+
+
+def test_stage_memory_is_measured_without_tracing():
+    runner = DagRunner([
+        # Returned, so the buffer is still resident when the stage's sampler stops
+        Stage("allocate", lambda: np.ones(32 * 1024 ** 2 // 8), outputs=("buffer",)),
+    ], max_workers=2)
+    runner.run()
+    assert not tracemalloc.is_tracing()
+    assert runner.metrics[0].peak_memory_mb >= 16
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="Cycle"):
+        DagRunner([
+            Stage("a", lambda b: b, inputs=("b",), outputs=("a",)),
+            Stage("b", lambda a: a, inputs=("a",), outputs=("b",)),
+        ])
@@ -0,0 +1,113 @@
+import sqlite3
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+import pytest
+from src.artifact_store import ArtifactStore
+from src.exception import CustomException
+from src.components.data_ingestion import data_ingestion as data_ingestion_module
+from src.components.data_ingestion.data_ingestion import DataIngestion, DataIngestionConfig
+from src.components.orchestrating import pipeline
+
+
+class RecordingConnection:
+    """sqlite3 connection whose cursors record every fetchmany size."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.fetch_sizes = []
+
+    def cursor(self):
+        outer = self
+        cursor = self.conn.cursor()
+
+        class Cursor:
+            description = property(lambda self: cursor.description)
+
+            def execute(self, query):
+                cursor.execute(query)
+
+            def fetchmany(self, size):
+                outer.fetch_sizes.append(size)
+                return cursor.fetchmany(size)
+
+            def close(self):
+                cursor.close()
+
+        return Cursor()
+
+    def close(self):
+        self.conn.close()
+
+
+def warehouse(n=5000):
+    conn = sqlite3.connect(":memory:")
+    pd.DataFrame({"CustomerID": np.arange(n), "Notes": ["x" * 200] * n,
+                  "Total Spend": np.arange(n) * 1.5}).to_sql("CUSTOMERCHURN", conn, index=False)
+    return conn
+
+
+def test_first_fetch_is_a_probe_and_batches_stay_under_ceiling():
+    ingestion = DataIngestion()
+    ingestion.ingestion_config.batch_size = 4000
+    ingestion.ingestion_config.probe_rows = 100
+    ingestion.ingestion_config.max_batch_memory_mb = 0.25
+    conn = RecordingConnection(warehouse())
+
+    batches = list(ingestion.stream_data_from_snowflake("SELECT * FROM CUSTOMERCHURN", conn=conn))
+
+    assert conn.fetch_sizes[0] == 100
+    assert max(conn.fetch_sizes) < 4000
+    assert sum(len(b) for b in batches) == 5000
+    assert all(b.memory_usage(deep=True, index=False).sum() <= 0.25 * 1024 ** 2 for b in batches)
+
+
+def test_oversized_row_raises_readable_error():
+    ingestion = DataIngestion()
+    ingestion.ingestion_config.max_batch_memory_mb = 0.0001
+    conn = sqlite3.connect(":memory:")
+    pd.DataFrame({"Notes": ["x" * 10_000]}).to_sql("CUSTOMERCHURN", conn, index=False)
+
+    with pytest.raises(CustomException, match="exceeds"):
+        list(ingestion.stream_data_from_snowflake("SELECT * FROM CUSTOMERCHURN", conn=conn))
+
+
+def test_call_stream_writes_the_artifact(tmp_path):
+    csv_path = tmp_path / "customers.csv"
+    pd.DataFrame({"CustomerID": [1, 2], "Age": [30, 40]}).to_csv(csv_path, index=False)
+    conn = sqlite3.connect(":memory:")
+    pd.DataFrame({"CustomerID": [3], "Age": [50], "Gender": ["Female"]}).to_sql("CUSTOMERCHURN", conn, index=False)
+
+    ingestion = DataIngestion()
+    ingestion.ingestion_config.csv_path = str(csv_path)
+    streamed = pd.concat(list(ingestion.call_stream(conn=conn)), ignore_index=True)
+
+    # gender is all-null in the CSV batch and only typed by the warehouse batch
+    stored = ArtifactStore().read(ingestion.ingestion_config.artifact_name)
+    assert list(stored["customerid"]) == [1, 2, 3]
+    assert stored["gender"].isna().tolist() == [True, True, False]
+    assert stored["gender"].iloc[2] == "Female"
+    assert len(streamed) == 3
+
+
+@dataclass
+class StreamIngestionConfig(DataIngestionConfig):
+    csv_path: str = "customers.csv"
+    mode: str = "stream"
+
+
+def test_pipeline_stream_mode_reads_through_call_stream(monkeypatch):
+    monkeypatch.setattr(data_ingestion_module, "DataIngestionConfig", StreamIngestionConfig)
+    monkeypatch.setattr(pipeline, "DataIngestionConfig", StreamIngestionConfig)
+    monkeypatch.setattr(DataIngestion, "get_snowflake_connection", lambda self: sqlite3.connect("warehouse.db"))
+    streamed = []
+    call_stream = DataIngestion.call_stream
+    monkeypatch.setattr(DataIngestion, "call_stream",
+                        lambda self, conn=None: (streamed.append(b) or b for b in call_stream(self, conn)))
+    pd.DataFrame({"CustomerID": [1, 2], "Age": [30, 40]}).to_csv("customers.csv", index=False)
+    with sqlite3.connect("warehouse.db") as conn:
+        pd.DataFrame({"CustomerID": [3], "Age": [50]}).to_sql("CUSTOMERCHURN", conn, index=False)
+
+    raw = pipeline.data_ingestion()
+    assert sorted(raw["customerid"]) == [1, 2, 3]
+    assert len(streamed) == 2
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from src.components.data_versioning.dataset_versioning import DatasetVersioning, DatasetVersioningConfig
+
+
+def customers(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "customerid": np.arange(n),
+        "age": rng.integers(18, 70, n).astype(float),
+        "plan": rng.choice(["Basic", "Standard", "Premium"], n),
+    })
+
+
+def versioning():
+    return DatasetVersioning(DatasetVersioningConfig(avg_chunk_rows=256, min_chunk_rows=64, max_chunk_rows=1024))
+
+
+def test_checkout_returns_each_version_as_snapshotted():
+    store = versioning()
+    old = customers()
+    first = store.snapshot(old, "raw")
+    new = old.copy()
+    new.loc[100, "age"] = 99.0
+    second = store.snapshot(new, "raw")
+
+    assert store.snapshot(new, "raw")["version"] == second["version"]  # unchanged frame
+    pd.testing.assert_frame_equal(store.checkout("raw", first["version"][:8]), old)
+    pd.testing.assert_frame_equal(store.checkout("raw"), new)
+    pd.testing.assert_frame_equal(store.checkout("raw", columns=["plan"]), new[["plan"]])
+
+
+def test_diff_reports_keys_and_shares_unchanged_chunks():
+    store = versioning()
+    old = customers()
+    first = store.snapshot(old, "raw")["version"]
+    new = pd.concat([old.drop(index=[10]), customers(1, seed=1).assign(customerid=5000)], ignore_index=True)
+    new.loc[new["customerid"] == 3000, "age"] = 1.0
+    store.snapshot(new, "raw")
+
+    diff = store.diff("raw", first, key="customerid")
+    assert diff["keys_added"] == [5000]
+    assert diff["keys_removed"] == [10]
+    assert diff["keys_modified"] == [3000]
+    assert diff["rows_added"] == 2 and diff["rows_removed"] == 2
+    assert diff["chunks_shared"] > diff["chunks_added"]
+    assert not diff["schema_changed"]
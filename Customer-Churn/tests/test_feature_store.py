@@ -0,0 +1,105 @@
+import threading
+import pytest
+from src import caching
+from src.exception import CustomException
+from src.components.feature_store.feature_store import FeatureStoreClient
+
+TABLE = {1: (1, 0.5), 2: (2, 0.9), 3: (3, 0.1)}
+
+
+class FakeBackend:
+    """Hands out fake connections that serve TABLE and count what they are asked."""
+    placeholder = "?"
+
+    def __init__(self, fail_next=False):
+        self.connections = []
+        self.fail_next = fail_next
+
+    def connect(self):
+        backend = self
+
+        class Connection:
+            def __init__(self):
+                self.closed = False
+                self.queries = []
+
+            def cursor(self):
+                conn = self
+
+                class Cursor:
+                    description = [("CustomerID",), ("CLV",)]
+
+                    def execute(self, query, params):
+                        if backend.fail_next:
+                            backend.fail_next = False
+                            raise ConnectionError("connection reset")
+                        conn.queries.append(params)
+                        self.rows = [TABLE[int(p)] for p in params if int(p) in TABLE]
+
+                    def fetchall(self):
+                        return self.rows
+
+                    def close(self):
+                        pass
+
+                return Cursor()
+
+            def close(self):
+                self.closed = True
+
+        conn = Connection()
+        self.connections.append(conn)
+        return conn
+
+
+def test_repeat_lookups_are_served_from_the_cache():
+    client = FeatureStoreClient(FakeBackend(), batch_size=2)
+    first = client.get_features([1, 2, 4])
+    assert first[1] == [{"CustomerID": 1, "CLV": 0.5}] and first[4] == []
+    assert client.queries == 2  # three misses in batches of two
+
+    # '2' and 2.0 address the same cached customer; unknown ids are cached as empty too
+    again = client.get_features(["2", 2.0, 4])
+    assert again["2"] == first[2] and again[4] == []
+    assert client.queries == 2
+    assert client.metrics()["cache_hits"] == 3 and client.metrics()["cache_misses"] == 3
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(caching.time, "monotonic", lambda: now[0])
+    client = FeatureStoreClient(FakeBackend(), ttl_seconds=60)
+    client.get_customer_features(1)
+    now[0] += 59
+    client.get_customer_features(1)
+    assert client.queries == 1
+    now[0] += 2
+    client.get_customer_features(1)
+    assert client.queries == 2
+
+
+def test_pool_reuses_connections_and_replaces_broken_ones():
+    backend = FakeBackend()
+    client = FeatureStoreClient(backend, pool_size=2, cache_size=0)
+    for customer_id in [1, 2, 3, 1]:
+        client.get_customer_features(customer_id)
+    assert client.queries == 4 and len(backend.connections) == 1
+    assert len(backend.connections[0].queries) == 4
+
+    threads = [threading.Thread(target=client.get_features, args=([i % 3 + 1],)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert client.metrics()["connections_created"] <= 2
+
+    backend.fail_next = True
+    with pytest.raises(CustomException):
+        client.get_customer_features(1)
+    assert any(conn.closed for conn in backend.connections)
+    assert client.get_customer_features(2) == [{"CustomerID": 2, "CLV": 0.9}]
+    assert client.metrics()["connections_created"] <= 2
+
+    client.close()
+    assert all(conn.closed for conn in backend.connections)
+    assert client.metrics()["connections_created"] == 0
@@ -0,0 +1,47 @@
+import math
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+from xgboost import XGBClassifier
+from src.components.model_building.hyperparameter_tuning import HyperparameterTuner, HyperparameterTuningConfig
+
+
+def xor_customers(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({"tenure": rng.normal(size=n), "support calls": rng.normal(size=n),
+                      "noise": rng.normal(size=n)})
+    y = pd.Series(((X["tenure"] > 0) ^ (X["support calls"] > 0)).astype(int))
+    return X, y
+
+
+def test_successive_halving_keeps_the_best_candidates():
+    # Depth-1 models cannot learn an XOR, so they should all be dropped along the way
+    config = HyperparameterTuningConfig(
+        scoring="accuracy", n_splits=3, n_candidates=4, eta=2, min_resource=0.25, n_jobs=1,
+        search_spaces={
+            "Decision Tree": (DecisionTreeClassifier(random_state=0), {"max_depth": [1, 2, 4, 6]}),
+            "XGBoost": (XGBClassifier(eval_metric="logloss", n_estimators=300),
+                        {"max_depth": [1, 3], "learning_rate": [0.1, 0.3]}),
+        })
+    X, y = xor_customers()
+    result = HyperparameterTuner(config).fit(X, y)
+    history = result.history
+
+    assert sorted(history["resource"].unique()) == [0.25, 0.5, 1.0]
+    for rung in range(1, history["rung"].max() + 1):
+        previous = history[history["rung"] == rung - 1].sort_values("mean_score", ascending=False, kind="stable")
+        kept = previous.head(max(1, math.ceil(len(previous) / config.eta)))
+        current = history[history["rung"] == rung]
+        key = lambda row: (row["model"], row["params"]["max_depth"], row["params"].get("learning_rate"))
+        assert sorted(map(key, current.to_dict("records"))) == sorted(map(key, kept.to_dict("records")))
+
+    final = history[history["rung"] == history["rung"].max()]
+    assert result.best_score == final["mean_score"].max()
+    assert result.best_params["max_depth"] > 1
+    assert result.best_score > 0.9
+    assert result.best_estimator.score(X, y) > 0.9
+    # The refit uses the tree count early stopping found on full folds, not a count from a smaller slice
+    assert result.best_name == "XGBoost"
+    best = final.loc[final["mean_score"].idxmax(), "params"]
+    assert result.best_params == best and best["n_estimators"] < 300
+    assert result.best_estimator.get_params()["n_estimators"] == best["n_estimators"]
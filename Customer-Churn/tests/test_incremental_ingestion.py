@@ -0,0 +1,151 @@
+import sqlite3
+from dataclasses import dataclass
+import pandas as pd
+from src.components.data_ingestion import data_ingestion as data_ingestion_module
+from src.components.data_ingestion.data_ingestion import DataIngestion, DataIngestionConfig
+from src.components.data_ingestion.incremental_ingestion import IncrementalIngestion, IncrementalIngestionConfig
+from src.components.orchestrating import pipeline
+
+
+class QueryLog:
+    """sqlite3 connection that records every query and its bound parameters."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.queries = []
+
+    def cursor(self):
+        outer = self
+        cursor = self.conn.cursor()
+
+        class Cursor:
+            description = property(lambda self: cursor.description)
+
+            def execute(self, query, params=None):
+                outer.queries.append((query, params))
+                return cursor.execute(query) if params is None else cursor.execute(query, params)
+
+            def fetchmany(self, size):
+                return cursor.fetchmany(size)
+
+            def close(self):
+                cursor.close()
+
+        return Cursor()
+
+
+def incremental(csv_path):
+    ingestion = DataIngestion()
+    ingestion.ingestion_config.csv_path = str(csv_path)
+    return IncrementalIngestion(IncrementalIngestionConfig(paramstyle="qmark"), ingestion)
+
+
+def test_watermark_is_a_bound_parameter(tmp_path):
+    csv_path = tmp_path / "customers.csv"
+    pd.DataFrame({"CustomerID": [], "Age": []}).to_csv(csv_path, index=False)
+    conn = sqlite3.connect(":memory:")
+    pd.DataFrame({"CustomerID": [1, 2], "Age": [30, 40]}).to_sql("CUSTOMERCHURN", conn, index=False)
+    log = QueryLog(conn)
+    obj = incremental(csv_path)
+
+    assert obj.run(conn=log)["snowflake"] == 2
+    pd.DataFrame({"CustomerID": [3], "Age": [50]}).to_sql("CUSTOMERCHURN", conn, index=False, if_exists="append")
+    assert obj.run(conn=log)["snowflake"] == 1
+
+    query, params = log.queries[-1]
+    assert "customerid > ?" in query and params == (2,)
+
+
+def test_column_types_widen_instead_of_locking_to_the_first_batch(tmp_path):
+    csv_path = tmp_path / "customers.csv"
+    # gender is empty and plan is numeric in the CSV; the warehouse has text in both
+    pd.DataFrame({"CustomerID": [1, 2], "Gender": [None, None], "Plan": [1, 2]}).to_csv(csv_path, index=False)
+    conn = sqlite3.connect(":memory:")
+    pd.DataFrame({"CustomerID": [3], "Gender": ["Female"], "Plan": ["Premium"]}).to_sql(
+        "CUSTOMERCHURN", conn, index=False)
+    obj = incremental(csv_path)
+    obj.run(conn=conn)
+
+    table = obj.merged_view().to_table().to_pandas().sort_values("customerid")
+    assert table["gender"].isna().tolist() == [True, True, False] and table["gender"].iloc[2] == "Female"
+    assert table["plan"].tolist() == ["1", "2", "Premium"]
+
+
+def test_latest_view_keeps_the_most_recent_row_per_customer(tmp_path):
+    csv_path = tmp_path / "customers.csv"
+    pd.DataFrame({"CustomerID": [1, 2], "Age": [30, 40]}).to_csv(csv_path, index=False)
+    conn = sqlite3.connect(":memory:")
+    pd.DataFrame({"CustomerID": [2, 3], "Age": [41, 50]}).to_sql("CUSTOMERCHURN", conn, index=False)
+    obj = incremental(csv_path)
+    obj.run(conn=conn)
+
+    # Appended to the CSV in a later run, so it supersedes the warehouse row
+    with open(csv_path, "a") as f:
+        f.write("3,51\n")
+    obj.run(conn=conn)
+
+    assert obj.merged_view().count_rows() == 5
+    latest = obj.latest_view(columns=["age"]).to_pandas()
+    assert list(latest.columns) == ["age"]
+    rows = obj.latest_view().to_pandas().sort_values("customerid")
+    assert rows["customerid"].tolist() == [1, 2, 3]
+    assert rows["age"].tolist() == [30, 41, 51]
+
+
+def test_rows_appended_during_a_read_are_ingested_once(tmp_path):
+    csv_path = tmp_path / "customers.csv"
+    pd.DataFrame({"CustomerID": [1, 2], "Age": [30, 40]}).to_csv(csv_path, index=False)
+    with open(csv_path, "a") as f:
+        f.write("3,5")  # a line still being written
+    conn = sqlite3.connect(":memory:")
+    pd.DataFrame({"CustomerID": [], "Age": []}).to_sql("CUSTOMERCHURN", conn, index=False)
+    obj = incremental(csv_path)
+    split = obj.ingestion._split_to_ceiling
+
+    def append_while_reading(batch):
+        with open(csv_path, "a") as f:
+            f.write("0\n4,60\n")
+        obj.ingestion._split_to_ceiling = split
+        return split(batch)
+
+    obj.ingestion._split_to_ceiling = append_while_reading
+    assert obj.run(conn=conn)["csv"] == 2
+    assert obj.run(conn=conn)["csv"] == 2
+    assert sorted(obj.merged_view().to_table()["customerid"].to_pylist()) == [1, 2, 3, 4]
+
+
+@dataclass
+class LocalIngestionConfig(DataIngestionConfig):
+    csv_path: str = "customers.csv"
+
+
+@dataclass
+class SqliteIncrementalConfig(IncrementalIngestionConfig):
+    paramstyle: str = "qmark"
+
+
+def test_pipeline_ingestion_only_appends_new_rows(monkeypatch):
+    monkeypatch.setattr(data_ingestion_module, "DataIngestionConfig", LocalIngestionConfig)
+    monkeypatch.setattr(pipeline, "DataIngestionConfig", LocalIngestionConfig)
+    monkeypatch.setattr(pipeline, "IncrementalIngestionConfig", SqliteIncrementalConfig)
+    monkeypatch.setattr(DataIngestion, "get_snowflake_connection", lambda self: sqlite3.connect("warehouse.db"))
+    pd.DataFrame({"CustomerID": [1, 2], "Age": [30, 40]}).to_csv("customers.csv", index=False)
+    with sqlite3.connect("warehouse.db") as conn:
+        pd.DataFrame({"CustomerID": [3], "Age": [50]}).to_sql("CUSTOMERCHURN", conn, index=False)
+
+    assert sorted(pipeline.data_ingestion()["customerid"]) == [1, 2, 3]
+    fingerprint = pipeline.ingestion_fingerprint()
+    assert pipeline.ingestion_fingerprint() == fingerprint
+
+    with sqlite3.connect("warehouse.db") as conn:
+        pd.DataFrame({"CustomerID": [4, 5], "Age": [60, 70]}).to_sql(
+            "CUSTOMERCHURN", conn, index=False, if_exists="append")
+    with open("customers.csv", "a") as f:
+        f.write("2,41\n")  # an updated row for customer 2
+    raw = pipeline.data_ingestion().sort_values("customerid")
+    assert raw["customerid"].tolist() == [1, 2, 3, 4, 5]
+    assert raw["age"].tolist() == [30, 41, 50, 60, 70]
+    assert list(raw.columns) == ["customerid", "age"]
+    # Only the new CSV line and warehouse rows were appended, and the high-water marks moved
+    assert IncrementalIngestion(SqliteIncrementalConfig()).merged_view().count_rows() == 6
+    assert pipeline.ingestion_fingerprint() != fingerprint
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from src.components.data_transformation.data_transformation import DataTransformation
+from src.components.data_transformation.incremental_transform import IncrementalTransformer, IncrementalTransformConfig
+
+
+def prepared(ids, seed):
+    rng = np.random.default_rng(seed)
+    n = len(ids)
+    return pd.DataFrame({
+        "customerid": np.asarray(ids, dtype=float),
+        "tenure": rng.integers(0, 60, n).astype(float),
+        "support calls": rng.integers(0, 10, n).astype(float),
+        "payment delay": rng.integers(0, 30, n).astype(float),
+        "total spend": rng.uniform(100, 1000, n),
+        "last interaction": rng.integers(1, 30, n).astype(float),
+        "churn": rng.choice(["True", "False"], n),
+    })
+
+
+def assert_matches_full_transform(transformer, table):
+    expected = DataTransformation().transformedData(table.copy()).sort_values("customerid").reset_index(drop=True)
+    actual = transformer.read().sort_values("customerid").reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_deltas_match_transformed_data_through_rescans_and_compaction():
+    transformer = IncrementalTransformer(IncrementalTransformConfig(max_parts=3))
+    table = prepared(range(1, 201), seed=0)
+    table.loc[7, "last interaction"] = 40.0  # sole holder of max(last interaction)
+    transformer.apply_delta(table)
+    assert_matches_full_transform(transformer, table)
+
+    # Lowering the sole holder forces a rescan of the column
+    update = table.iloc[[7]].copy()
+    update["last interaction"] = 2.0
+    stats = transformer.apply_delta(update)
+    assert stats["rescanned"] == ["last_interaction_max"]
+    table.loc[7, "last interaction"] = 2.0
+    assert_matches_full_transform(transformer, table)
+
+    compacted = False
+    for seed, ids in enumerate([range(201, 251), range(100, 130), range(251, 260)], start=1):
+        delta = prepared(ids, seed)
+        compacted |= transformer.apply_delta(delta)["compacted"]
+        table = pd.concat([table.set_index("customerid").drop(delta["customerid"], errors="ignore"),
+                           delta.set_index("customerid")]).reset_index()
+        assert_matches_full_transform(transformer, table)
+    assert compacted
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+from src import instrumentation
+from src.instrumentation import Instrumentation, InstrumentationConfig
+from src.components.data_preparation.preprocessor import ChurnPreprocessor
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    # start_run() exports the id; monkeypatch restores the environment afterwards
+    monkeypatch.setenv("CHURN_RUN_ID", "test")
+    inst = Instrumentation(InstrumentationConfig(enabled=True, profile=False))
+    monkeypatch.setattr(instrumentation, "_instrumentation", inst)
+    return inst
+
+
+def test_each_run_gets_its_own_summary(metrics):
+    first = metrics.start_run()
+    with metrics.span("stage", rows=10):
+        pass
+    second = metrics.start_run()
+    with metrics.span("stage", rows=5):
+        pass
+    assert first != second
+    assert metrics.summary(first)["stage"]["rows"] == 10
+    assert metrics.summary(second)["stage"] == metrics.summary()["stage"]
+    assert metrics.summary(second)["stage"]["count"] == 1
+
+    exported = open(metrics.write_prometheus(second)).read().splitlines()
+    assert f'churn_run_info{{run_id="{second}"}} 1' in exported
+    assert 'churn_span_rows_total{span="stage"} 5' in exported
+    assert "# TYPE churn_spans_total counter" in exported
+    samples = [line for line in exported if not line.startswith("#")]
+    assert all("run_id" not in line for line in samples if not line.startswith("churn_run_info"))
+    counters = [line.split()[2] for line in exported if line.startswith("# TYPE") and line.endswith(" counter")]
+    assert counters and all(name.endswith("_total") for name in counters)
+
+
+def test_nested_spans_and_errors(metrics):
+    with pytest.raises(ValueError):
+        with metrics.span("outer"):
+            with metrics.span("inner"):
+                raise ValueError("boom")
+    records = {r["span"]: r for r in metrics.records()}
+    assert records["inner"]["parent"] == "outer"
+    assert records["outer"]["status"] == "error"
+    assert "boom" in records["inner"]["error"]
+
+
+def test_transform_emits_no_spans(metrics):
+    df = pd.DataFrame({"customerid": [1, 2, 3], "age": [20.5, None, 40.5],
+                       "gender": ["M", "F", None], "churn": [0, 1, 0]})
+    preprocessor = ChurnPreprocessor()
+    preprocessor.fit_transform(df)
+    fitted = len(metrics.records())
+    assert fitted > 0
+
+    preprocessor.transform(df.drop(columns=["churn"]).head(1))
+    assert len(metrics.records()) == fitted
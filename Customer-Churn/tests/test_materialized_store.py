@@ -0,0 +1,46 @@
+import pandas as pd
+from src.components.feature_store.materialized_store import MaterializedFeatureStore
+
+T1, T2 = pd.Timestamp("2024-01-01 00:00", tz="UTC"), pd.Timestamp("2024-01-02 00:00", tz="UTC")
+
+
+def snapshot(spend, **extra):
+    return pd.DataFrame({"customerid": [1, 2], "total spend": spend, **extra})
+
+
+def test_point_in_time_join_never_uses_later_snapshots():
+    store = MaterializedFeatureStore()
+    # Integer spend and no tenure column first, then floats and a new column
+    store.materialize(snapshot([100, 200]), timestamp=T1)
+    store.materialize(snapshot([150.5, 250.5], tenure=[3.0, 4.0]), timestamp=T2)
+
+    events = pd.DataFrame({
+        "customerid": [1, 1, 2, 2],
+        "event_timestamp": [T1 - pd.Timedelta(hours=1), T1 + pd.Timedelta(hours=12), T2, T2 + pd.Timedelta(days=5)],
+    })
+    joined = store.get_historical_features(events)
+    store.close()
+
+    assert joined["total spend"].tolist()[1:] == [100.0, 250.5, 250.5]
+    assert pd.isna(joined["total spend"].iloc[0])  # no snapshot existed yet
+    assert joined["tenure"].isna().tolist() == [True, True, False, False]
+    matched = joined.dropna(subset=["feature_timestamp"])
+    assert (matched["feature_timestamp"] <= matched["event_timestamp"]).all()
+
+
+def test_online_upsert_keeps_the_newest_snapshot_per_customer():
+    store = MaterializedFeatureStore()
+    store.materialize(snapshot([150.0, 250.0]), timestamp=T2)
+    assert store.online.get(1)["total spend"] == 150.0  # cached from here on
+
+    # A late, older snapshot must not overwrite newer rows, but new customers are added
+    late = pd.DataFrame({"customerid": [1, 3], "total spend": [100.0, 300.0]})
+    assert store.materialize(late, timestamp=T1)["rows"] == 2
+    features = store.get_online_features([1, 3, 4])
+    assert features[1]["total spend"] == 150.0
+    assert features[3]["total spend"] == 300.0
+    assert features[4] is None
+
+    store.materialize(snapshot([175.0, 275.0]), timestamp=T2 + pd.Timedelta(days=1))
+    assert store.online.get(1.0)["total spend"] == 175.0  # float ids hit the same key
+    store.close()
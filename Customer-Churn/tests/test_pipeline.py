@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from src import dtype_optimizer
+from src.components.orchestrating.pipeline import build_stages, data_validation
+from src.components.data_transformation import feature_registry
+from src.components.data_validation import quality_engine, validation_rules
+from src.components.data_validation.report_renderer import get_report_renderer
+from src.components.model_building import hyperparameter_tuning, training_engine
+from test_scoring_parity import raw_customers
+
+
+def stages():
+    return {stage.name: stage for stage in build_stages()}
+
+
+def test_transformation_is_versioned_by_the_feature_registry():
+    assert feature_registry in stages()["Data Transformation"].version_of
+
+
+def test_downcasting_stages_are_versioned_by_the_dtype_optimizer():
+    for name in ("Data Ingestion", "Data Preparation", "Data Transformation"):
+        assert dtype_optimizer in stages()[name].version_of
+
+
+def test_trainer_is_versioned_by_the_engine_and_tuner():
+    version_of = stages()["Model Trainer"].version_of
+    assert training_engine in version_of and hyperparameter_tuning in version_of
+
+
+def test_validation_is_versioned_by_its_rules_and_checks():
+    version_of = stages()["Data Validation"].version_of
+    assert validation_rules in version_of and quality_engine in version_of
+
+
+def test_blocking_violation_fails_validation_before_training():
+    assert "quality_report" in stages()["Model Trainer"].inputs
+    raw = raw_customers()
+    raw["age"] = raw["age"].fillna(30.0)
+    data_validation(raw)
+
+    raw.loc[:5, "customerid"] = np.nan  # customerid has a zero null budget
+    with pytest.raises(ValueError, match="customerid nulls"):
+        data_validation(raw)
+    # Rendering runs in the background; finish it while this test's directory is current
+    get_report_renderer().wait()
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.components.data_preparation.preprocessor import ChurnPreprocessor
+from test_scoring_parity import raw_customers
+
+
+def chunked_fit(df, size, **kwargs):
+    preprocessor = ChurnPreprocessor(**kwargs)
+    for start in range(0, len(df), size):
+        chunk = df.iloc[start:start + size]
+        if chunk["gender"].isna().all():
+            chunk = chunk.astype({"gender": float})  # as a CSV reader types an empty column
+        preprocessor.partial_fit(chunk)
+    return preprocessor.finalize()
+
+
+def test_partial_fit_over_chunks_matches_a_single_fit():
+    df = raw_customers(2000)
+    df.loc[df.index[150:300], "gender"] = np.nan  # one chunk has no gender at all
+    full = ChurnPreprocessor()
+    expected = full.fit_transform(df, drop_duplicates=False)
+    chunked = chunked_fit(df, 150, sketch_k=4000)  # sketches large enough to stay exact
+
+    assert chunked.num_cols_ == full.num_cols_ and chunked.cat_cols_ == full.cat_cols_
+    assert chunked.modes_ == full.modes_
+    for col in full.cat_cols_:
+        pd.testing.assert_index_equal(chunked.categories_[col], full.categories_[col])
+    # The sketch returns the lower middle value where pandas averages the two
+    np.testing.assert_allclose(chunked.medians_, full.medians_, atol=0.5)
+    np.testing.assert_allclose(chunked.mean_, full.mean_, rtol=1e-3)
+    np.testing.assert_allclose(chunked.scale_, full.scale_, rtol=1e-3)
+    np.testing.assert_allclose(chunked.transform(df)[full.num_cols_], expected[full.num_cols_], atol=0.02)
+    pd.testing.assert_frame_equal(chunked.transform(df)[full.cat_cols_], expected[full.cat_cols_])
+
+
+def test_partial_fit_rejects_chunks_with_other_columns():
+    df = raw_customers(200)
+    preprocessor = ChurnPreprocessor().partial_fit(df.iloc[:100])
+    with pytest.raises(ValueError, match="missing \\['tenure'\\]"):
+        preprocessor.partial_fit(df.iloc[100:].drop(columns=["tenure"]))
+    with pytest.raises(ValueError, match="unexpected \\['region'\\]"):
+        preprocessor.partial_fit(df.iloc[100:].assign(region="EU"))
+    with pytest.raises(ValueError, match="changed \\['age'\\]"):
+        preprocessor.partial_fit(df.iloc[100:].assign(age="unknown"))
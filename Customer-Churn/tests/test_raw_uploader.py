@@ -0,0 +1,60 @@
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.components.rawdata.raw_uploader import LocalBackend, RawDataUploader, RawUploaderConfig, md5_base64
+
+DATE = datetime(2024, 1, 2)
+
+
+def write_customers(path, n, row_group_size=500):
+    rng = np.random.default_rng(n)
+    df = pd.DataFrame({"customerid": np.arange(n), "total spend": rng.uniform(100, 1000, n)})
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path, row_group_size=row_group_size)
+    return df
+
+
+def uploader(tmp_path):
+    return RawDataUploader(LocalBackend(str(tmp_path / "bucket")), RawUploaderConfig(shard_size_mb=0.02))
+
+
+def shards(tmp_path):
+    folder = tmp_path / "bucket" / "raw" / "2024" / "01" / "02" / "customers"
+    return sorted(os.listdir(folder)) if folder.exists() else []
+
+
+def test_reupload_with_fewer_shards_removes_stale_ones(tmp_path):
+    obj = uploader(tmp_path)
+    write_customers("customers.parquet", 8000)
+    first = obj.upload_file("customers.parquet", "raw", date=DATE)
+    assert first["shards"] > 2 and len(shards(tmp_path)) == first["shards"]
+    assert obj.upload_file("customers.parquet", "raw", date=DATE)["skipped"] == first["shards"]
+
+    smaller = write_customers("customers.parquet", 3000)
+    second = obj.upload_file("customers.parquet", "raw", date=DATE)
+    assert 1 < second["shards"] < first["shards"]
+    assert second["removed"] == first["shards"] - second["shards"]
+    assert len(shards(tmp_path)) == second["shards"]
+    folder = tmp_path / "bucket" / "raw" / "2024" / "01" / "02" / "customers"
+    read = pq.read_table(folder).to_pandas().sort_values("customerid").reset_index(drop=True)
+    pd.testing.assert_frame_equal(read, smaller)
+
+    # Small enough for one object now, so the shard folder goes away entirely
+    write_customers("customers.parquet", 50)
+    assert obj.upload_file("customers.parquet", "raw", date=DATE)["shards"] == 1
+    assert shards(tmp_path) == []
+    assert (folder.parent / "customers.parquet").exists()
+
+
+def test_large_non_parquet_files_are_composed_from_byte_shards(tmp_path):
+    obj = uploader(tmp_path)
+    write_customers("customers.parquet", 8000)
+    pd.read_parquet("customers.parquet").to_csv("customers.csv", index=False)
+    stats = obj.upload_file("customers.csv", "raw", date=DATE)
+    remote = tmp_path / "bucket" / "raw" / "2024" / "01" / "02" / "customers.csv"
+    assert stats["shards"] > 1
+    assert md5_base64(str(remote)) == md5_base64("customers.csv")
+    assert not os.listdir(remote.parent / "customers.csv.shards")
+    assert obj.upload_file("customers.csv", "raw", date=DATE)["shards"] == 0
@@ -0,0 +1,83 @@
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from src.dtype_optimizer import DtypeOptimizer
+from src.components.orchestrating.pipeline import data_preparation, data_transformation
+from src.components.model_serving.churn_scorer import ChurnScorer, ChurnScorerConfig
+
+
+def raw_customers(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "customerid": np.arange(1, n + 1, dtype=float),
+        "age": rng.integers(18, 70, n).astype(float),
+        "gender": rng.choice(["Male", "Female"], n),
+        "tenure": rng.integers(0, 60, n).astype(float),
+        "usage frequency": rng.integers(1, 30, n).astype(float),
+        "support calls": rng.integers(0, 10, n).astype(float),
+        "payment delay": rng.integers(0, 30, n).astype(float),
+        "subscription type": rng.choice(["Basic", "Standard", "Premium"], n),
+        "contract length": rng.choice(["Monthly", "Quarterly", "Annual"], n),
+        # Not representable in float32, so a lossy downcast would show up in the features
+        "total spend": np.round(rng.uniform(100, 1000, n), 2),
+        "last interaction": rng.integers(1, 30, n).astype(float),
+        "churn": rng.integers(0, 2, n).astype(float),
+    })
+    df.loc[::17, "age"] = np.nan
+    return df
+
+
+def test_float_downcast_is_exact():
+    values = pd.DataFrame({"exact": [0.5, 1.25, np.nan], "inexact": [0.1, 123.45, 2.0]})
+    optimized = DtypeOptimizer().optimize(values, stage="test")
+    assert optimized["exact"].dtype == np.float32
+    assert optimized["inexact"].dtype == np.float64
+
+
+def test_scorer_features_match_training_features():
+    raw = raw_customers()
+    ingested = DtypeOptimizer().optimize(raw, stage="ingestion")
+    prepared, preprocessor = data_preparation(ingested)
+    transformed = data_transformation(prepared)
+
+    X = transformed.drop(columns=["customerid", "churn"])
+    y = transformed["churn"].map({"True": 1, "False": 0})
+    model = LogisticRegression(max_iter=1000).fit(X, y)
+    joblib.dump({"model": model, "preprocessor": preprocessor,
+                 "last_interaction_max": transformed["last interaction"].max()}, "model.pkl")
+
+    scorer = ChurnScorer(ChurnScorerConfig(model_path="model.pkl"))
+    # Duplicates are dropped in training; score the same customers
+    records = raw.drop(columns=["churn"]).set_index("customerid").loc[
+        transformed["customerid"].to_numpy(dtype=float)].reset_index().to_dict("records")
+
+    served = scorer.features(records)
+    np.testing.assert_allclose(served.to_numpy(dtype=float), X.to_numpy(dtype=float), rtol=1e-12, atol=0)
+    np.testing.assert_allclose(scorer.predict_proba(records), model.predict_proba(X)[:, 1], rtol=1e-9, atol=0)
+
+
+def test_compiled_features_match_frame_path():
+    raw = raw_customers()
+    prepared, preprocessor = data_preparation(DtypeOptimizer().optimize(raw, stage="ingestion"))
+    transformed = data_transformation(prepared)
+    X = transformed.drop(columns=["customerid", "churn"])
+    model = LogisticRegression(max_iter=1000).fit(X, transformed["churn"].map({"True": 1, "False": 0}))
+    joblib.dump({"model": model, "preprocessor": preprocessor,
+                 "last_interaction_max": transformed["last interaction"].max()}, "model.pkl")
+    scorer = ChurnScorer(ChurnScorerConfig(model_path="model.pkl"))
+    assert scorer._compiled is not None
+
+    records = raw.drop(columns=["churn"]).head(20).to_dict("records")
+    records[0]["gender"] = None  # imputed with the mode
+    records[1]["subscription type"] = "Enterprise"  # unseen in training
+    records[2]["tenure"] = None
+    compiled = scorer.features(records)
+    single = scorer.features({key.title(): value for key, value in records[4].items()})
+    scorer._compiled = None
+    frame = scorer.features(records)
+
+    assert list(compiled.columns) == list(frame.columns)
+    np.testing.assert_allclose(compiled.to_numpy(dtype=float), frame.to_numpy(dtype=float), rtol=1e-12, atol=0)
+    np.testing.assert_allclose(single.to_numpy(dtype=float), frame.iloc[[4]].to_numpy(dtype=float),
+                               rtol=1e-12, atol=0)
@@ -0,0 +1,64 @@
+import os
+import pandas as pd
+from src.components.orchestrating.dag_runner import DagRunner, Stage
+from src.components.orchestrating.stage_cache import StageCache
+
+
+def pipeline(calls, value=1, model_path="model.bin"):
+    def load():
+        calls.append("load")
+        return pd.DataFrame({"x": [value, value + 1]})
+
+    def train(df):
+        calls.append("train")
+        with open(model_path, "w") as f:
+            f.write(str(df["x"].sum()))
+        return int(df["x"].sum())
+
+    return [
+        Stage("load", load, outputs=("data",), fingerprint=lambda: str(value)),
+        Stage("train", train, inputs=("data",), outputs=("model",), artifacts=lambda: [model_path]),
+    ]
+
+
+def run(stages):
+    runner = DagRunner(stages, cache=StageCache())
+    outputs = runner.run()
+    return outputs, {m.name: m.cache for m in runner.metrics}
+
+
+def test_second_run_hits_cache():
+    calls = []
+    run(pipeline(calls))
+    outputs, cache = run(pipeline(calls))
+    assert outputs["model"] == 3
+    assert cache == {"load": "hit", "train": "hit"}
+    assert calls == ["load", "train"]
+
+
+def test_changed_source_misses_downstream():
+    calls = []
+    run(pipeline(calls, value=1))
+    outputs, cache = run(pipeline(calls, value=5))
+    assert outputs["model"] == 11
+    assert cache == {"load": "miss", "train": "miss"}
+
+
+def test_missing_side_effect_file_reruns_stage():
+    calls = []
+    run(pipeline(calls))
+    os.remove("model.bin")
+    _, cache = run(pipeline(calls))
+    assert cache == {"load": "hit", "train": "miss"}
+    assert os.path.exists("model.bin")
+
+
+def test_replaced_side_effect_file_reruns_stage():
+    calls = []
+    run(pipeline(calls))
+    with open("model.bin", "w") as f:
+        f.write("another deployment")
+    _, cache = run(pipeline(calls))
+    assert cache["train"] == "miss"
+    with open("model.bin") as f:
+        assert f.read() == "3"
@@ -0,0 +1,33 @@
+import tracemalloc
+import numpy as np
+from src.components.model_building import training_engine
+
+
+class NoRSS:
+    """RSSSampler where /proc is unavailable, so measure() falls back to tracemalloc."""
+    baseline = None
+
+
+def allocate(mb):
+    return np.ones(mb * 1024 ** 2 // 8).sum()
+
+
+def test_measure_leaves_an_outer_heap_trace_running(monkeypatch):
+    monkeypatch.setattr(training_engine, "RSSSampler", NoRSS)
+
+    _, stats = training_engine.measure(allocate, 8)
+    assert not tracemalloc.is_tracing()
+    assert stats["Peak Memory (MB)"] >= 8
+
+    tracemalloc.start()
+    try:
+        _, stats = training_engine.measure(allocate, 16)
+        assert tracemalloc.is_tracing()
+        assert stats["Peak Memory (MB)"] >= 16
+        # Below the outer peak now, so only the call's own growth is reported
+        _, stats = training_engine.measure(allocate, 4)
+        assert tracemalloc.is_tracing()
+        assert stats["Peak Memory (MB)"] < 16
+        assert tracemalloc.get_traced_memory()[1] >= 16 * 1024 ** 2  # the outer peak is intact
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from src.components.data_validation.validation_rules import RuleValidator
+
+
+RULES = [
+    {"column": "customerid", "unique": True, "max_null_fraction": 0.0},
+    {"column": "age", "max_null_fraction": 0.2},
+]
+
+
+def chunks(df, size):
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+def test_null_budget_is_judged_on_the_whole_load():
+    df = pd.DataFrame({"customerid": np.arange(100), "age": [np.nan] * 15 + [30.0] * 85})
+    # The first chunk is 75% null, the load only 15%
+    result = RuleValidator(RULES).validate_stream(chunks(df, 20), fail_fast=True)
+    assert result.passed and not result.stopped_early and result.rows_checked == 100
+
+    df.loc[20:30, "age"] = np.nan
+    result = RuleValidator(RULES).validate_stream(chunks(df, 20), fail_fast=True)
+    assert [(v["column"], v["check"], v["violations"]) for v in result.blocking] == [("age", "nulls", 26)]
+
+
+def test_zero_null_budget_still_fails_fast():
+    df = pd.DataFrame({"customerid": [1.0, np.nan] + list(range(2, 100)), "age": 30.0})
+    result = RuleValidator(RULES).validate_stream(chunks(df, 10), fail_fast=True)
+    assert result.stopped_early and result.rows_checked == 10
+
+
+def test_unique_check_counts_repeats_across_chunks():
+    ids = np.concatenate([np.arange(50), [3, 3, 7], np.arange(45, 60)])
+    df = pd.DataFrame({"customerid": ids, "age": 30.0})
+    expected = int(pd.Series(ids).duplicated().sum())
+    for size in (len(df), 7, 1):
+        result = RuleValidator(RULES).validate_stream(chunks(df, size), fail_fast=False)
+        assert result.violations[("customerid", "unique")]["violations"] == expected